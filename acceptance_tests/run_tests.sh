@@ -26,6 +26,23 @@ test_html_output()
     return $exit_code
 }
 
+test_several_outputs()
+{
+    ignore='Час створення протоколу'
+    empty_line='^ *$'
+    python -m petro test.split -o csv:actual.csv -o html:tmp.html --concurrent-writers && \
+        diff actual.csv expected.csv && \
+        grep -v "$ignore" tmp.html | grep -v "$empty_line" > actual.html && \
+        grep -v "$ignore" expected.html | grep -v "$empty_line" | \
+        diff -w actual.html -
+    exit_code=$?
+    if [ $exit_code -eq 0 ]
+    then
+        rm actual.csv actual.html tmp.html
+    fi
+    return $exit_code
+}
+
 test_returns_zero_on_empty_input()
 {
     input_path=$(mktemp)
@@ -0,0 +1,61 @@
+import contextlib
+import io
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import batch
+from event_generator import generate
+
+EVENTS = 12
+
+_SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+
+
+def _season(season_dir):
+    # Every event of a season shares the same reglist.
+    for seed in range(EVENTS):
+        split_path, __, __ = generate(
+            season_dir, categories=5, riders=100, laps=3, seed=seed)
+        os.rename(split_path, os.path.join(season_dir, 'event{:02}.split'.format(seed)))
+
+
+def _per_event(season_dir):
+    env = dict(os.environ, PYTHONPATH=_SRC_DIR)
+    for name in sorted(os.listdir(season_dir)):
+        if name.endswith('.split'):
+            input_path = os.path.join(season_dir, name)
+            subprocess.run(
+                [sys.executable, '-m', 'petro', input_path, 'html', input_path + '.html'],
+                env=env, check=True, stdout=subprocess.DEVNULL)
+
+
+def _batch(season_dir, jobs):
+    with contextlib.redirect_stdout(io.StringIO()):
+        assert batch._main(season_dir, 'html', jobs=jobs) == 0
+
+
+def main():
+    season_dir = tempfile.mkdtemp()
+    try:
+        _season(season_dir)
+        cases = [
+            ('petro per event', lambda: _per_event(season_dir)),
+            ('batch', lambda: _batch(season_dir, 1)),
+            ('batch --jobs 2', lambda: _batch(season_dir, 2)),
+        ]
+        print('{} events, {} CPUs'.format(EVENTS, os.cpu_count()))
+        print('{:<18} {:>10}'.format('case', 'ms'))
+        for name, run in cases:
+            started = time.perf_counter()
+            run()
+            print('{:<18} {:>10.1f}'.format(name, (time.perf_counter() - started) * 1000))
+    finally:
+        shutil.rmtree(season_dir)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+from concurrent.futures import ProcessPoolExecutor
+import os
+import shutil
+import tempfile
+import time
+
+from event_generator import generate
+import splitfile
+
+# 20 categories of 3000 riders, 5 laps: 300k lines, like an audit replay.
+_FAST_RIDERS = 3000
+_PARSLEY_RIDERS = 500
+
+
+def _seconds(parse):
+    started = time.perf_counter()
+    for __ in parse():
+        pass
+    return time.perf_counter() - started
+
+
+def _bench(split_path, engine):
+    sequential = _seconds(lambda: splitfile.open_split(split_path, engine=engine))
+    print('{:<10} {:>6} {:>10.2f} {:>8}'.format(engine, 'seq', sequential, '1.00x'))
+    for jobs in (2, 4):
+        with ProcessPoolExecutor(jobs) as executor:
+            # Warm up the workers, they import the grammar once.
+            list(executor.map(abs, range(jobs)))
+            parallel = _seconds(lambda: splitfile.parse_chunks(
+                split_path, executor, engine=engine))
+        print('{:<10} {:>6} {:>10.2f} {:>7.2f}x'.format(
+            engine, jobs, parallel, sequential / parallel))
+
+
+def main():
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        print('{} CPUs'.format(os.cpu_count()))
+        print('{:<10} {:>6} {:>10} {:>8}'.format('parser', 'jobs', 'time, s', 'speedup'))
+        for engine, riders in ((splitfile.FAST, _FAST_RIDERS),
+                               (splitfile.PARSLEY, _PARSLEY_RIDERS)):
+            split_path, __, stats = generate(
+                os.path.join(tmp_dir, engine), categories=20, riders=riders, laps=5)
+            print('{} lines, {:.1f} MiB'.format(
+                stats['lines'], os.path.getsize(split_path) / (1 << 20)))
+            _bench(split_path, engine)
+    finally:
+        shutil.rmtree(tmp_dir)
+
+
+if __name__ == '__main__':
+    main()
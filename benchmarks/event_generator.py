@@ -0,0 +1,162 @@
+"""
+Generates synthetic events: a bikeportal reglist and a split file.
+
+    python benchmarks/event_generator.py output_dir --categories 20 --riders 500
+"""
+import argparse
+import os
+import random
+
+_START = 10 * 3600
+_BAD_LINES = [
+    '{bib} 25:00:00',
+    '{bib} 12:00',
+    'dnf',
+    'laps {bib}',
+    'start 10:00:00',
+    '{bib} x',
+]
+
+
+def generate(output_dir, categories=10, riders=100, laps=5, dnf_rate=0.02,
+             group_rate=0.1, error_rate=0.0, seed=1):
+    """
+    Writes reglist.csv and event.split to output_dir.
+
+    :param riders: riders per category.
+    :param dnf_rate: share of riders who do not finish.
+    :param group_rate: share of splits recorded together with the previous
+                       one on a single line.
+    :param error_rate: share of extra lines with syntax errors.
+    :returns: (split_path, reglist_path, stats) where stats is a dict with
+              the number of lines, splits, dnfs and syntax errors.
+    """
+    rnd = random.Random(seed)
+    os.makedirs(output_dir, exist_ok=True)
+    reglist_path = os.path.join(output_dir, 'reglist.csv')
+    split_path = os.path.join(output_dir, 'event.split')
+
+    bibs_by_category = {
+        cid: list(range(cid * 10000 + 1, cid * 10000 + riders + 1))
+        for cid in range(1, categories + 1)}
+    _write_reglist(reglist_path, bibs_by_category, rnd)
+
+    starts = {cid: _START + (cid - 1) % 4 * 120 for cid in bibs_by_category}
+    events = []
+    for cid, bibs in bibs_by_category.items():
+        for bib in bibs:
+            lap_seconds = rnd.uniform(900, 1500)
+            t = starts[cid]
+            dnf_lap = rnd.randrange(laps) if rnd.random() < dnf_rate else None
+            for lap in range(laps):
+                t += int(lap_seconds * rnd.uniform(0.95, 1.05))
+                if lap == dnf_lap:
+                    events.append((t, 'dnf', cid, bib))
+                    break
+                events.append((t, 'split', cid, bib))
+    events.sort()
+
+    lines, stats = _split_lines(events, laps, group_rate, error_rate, rnd)
+    with open(split_path, mode='wt', encoding='utf-8') as f:
+        f.write('reglist reglist.csv\n')
+        for cid in bibs_by_category:
+            f.write('laps {} {}\n'.format(cid, laps))
+        for cid, start in starts.items():
+            f.write('start {} {}\n'.format(cid, _time_str(start)))
+        for line in lines:
+            f.write(line + '\n')
+    stats['lines'] = len(lines) + 1 + 2 * categories
+    return split_path, reglist_path, stats
+
+
+def _write_reglist(path, bibs_by_category, rnd):
+    with open(path, mode='wt', encoding='cp1251', newline='') as f:
+        f.write('"Номер";"Имя";"Ник";"Команда";"Откуда";"Возраст";"Велосипед";'
+                '"Ком";"rfid";"Год рождения";"Эффективность";;;\r\n')
+        f.write(';;;;;;;;;;;;;\r\n')
+        for cid, bibs in bibs_by_category.items():
+            f.write('"{}. Категорія {}";;;;;;;;;;;;;\r\n'.format(cid, cid))
+            for bib in bibs:
+                age = rnd.randrange(18, 60)
+                f.write(
+                    '{};"Учасник {}";"Нік {}";"Команда {}";"Київ";{};;1;;{};"{},{}";;;\r\n'.format(
+                        bib, bib, bib, bib % 37, age, 2018 - age,
+                        rnd.randrange(50, 100), rnd.randrange(10)))
+
+
+def _split_lines(events, laps, group_rate, error_rate, rnd):
+    # Drops what the race rules would reject: splits after a rider has
+    # finished, either by doing all the laps or by crossing the line
+    # after the leader has finished.
+    laps_done = {}
+    done = set()
+    leader_finish = {}
+    lines = []
+    stats = {'splits': 0, 'dnfs': 0, 'syntax_errors': 0}
+    group = []
+    group_time = None
+
+    def flush():
+        if group:
+            lines.append('{} {}'.format(' '.join(map(str, group)), _time_str(group_time)))
+            del group[:]
+
+    for t, kind, cid, bib in events:
+        if bib in done:
+            continue
+        if error_rate and rnd.random() < error_rate:
+            flush()
+            lines.append(rnd.choice(_BAD_LINES).format(bib=bib))
+            stats['syntax_errors'] += 1
+        if kind == 'dnf':
+            flush()
+            lines.append('dnf {}'.format(bib))
+            done.add(bib)
+            stats['dnfs'] += 1
+            continue
+
+        if group and bib not in group and rnd.random() < group_rate:
+            # Recorded together with the previous rider.
+            group.append(bib)
+        else:
+            flush()
+            group.append(bib)
+            group_time = t
+        stats['splits'] += 1
+
+        laps_done[bib] = laps_done.get(bib, 0) + 1
+        if laps_done[bib] == laps:
+            done.add(bib)
+            leader_finish.setdefault(cid, group_time)
+        elif cid in leader_finish and group_time >= leader_finish[cid]:
+            done.add(bib)
+    flush()
+    return lines, stats
+
+
+def _time_str(seconds):
+    return '{:02}:{:02}:{:02}'.format(seconds // 3600, seconds // 60 % 60, seconds % 60)
+
+
+def main():
+    args_parser = argparse.ArgumentParser(description='Generates a synthetic event.')
+    args_parser.add_argument('output_dir')
+    args_parser.add_argument('--categories', type=int, default=10)
+    args_parser.add_argument('--riders', type=int, default=100, help='riders per category')
+    args_parser.add_argument('--laps', type=int, default=5)
+    args_parser.add_argument('--dnf-rate', type=float, default=0.02)
+    args_parser.add_argument('--group-rate', type=float, default=0.1)
+    args_parser.add_argument('--error-rate', type=float, default=0.0)
+    args_parser.add_argument('--seed', type=int, default=1)
+    args = args_parser.parse_args()
+
+    split_path, reglist_path, stats = generate(
+        args.output_dir, args.categories, args.riders, args.laps, args.dnf_rate,
+        args.group_rate, args.error_rate, args.seed)
+    print(split_path)
+    print(reglist_path)
+    print(stats)
+
+
+if __name__ == '__main__':
+    main()
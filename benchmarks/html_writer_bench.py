@@ -0,0 +1,77 @@
+import io
+import os
+import shutil
+import tempfile
+import timeit
+
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader
+
+import html_writer
+import petro
+
+_SPLIT_PATH = os.path.join(
+    os.path.dirname(__file__), '..', 'acceptance_tests', 'test.split')
+_TEMPLATES = os.path.dirname(html_writer.__file__)
+
+
+def _load_template(bytecode_cache=None):
+    env = Environment(
+        loader=FileSystemLoader(_TEMPLATES),
+        bytecode_cache=bytecode_cache)
+    return env.get_template('petro.html')
+
+
+def _legacy_write(output_path, races, reglist, banner_url):
+    # What html_writer.write did before: a new environment per call.
+    buffer = io.StringIO()
+    html_writer._env = Environment(loader=FileSystemLoader(_TEMPLATES))
+    html_writer.render(buffer, races, reglist, banner_url)
+    with open(output_path, mode='wt', encoding='utf-8') as f:
+        f.write(buffer.getvalue())
+
+
+def _ms(f, number):
+    return min(timeit.repeat(f, number=number, repeat=5)) / number * 1000
+
+
+def main():
+    races, reglist, banner_url = petro._results(_SPLIT_PATH, on_error=print)
+    cache_dir = tempfile.mkdtemp()
+    output_dir = tempfile.mkdtemp()
+    output_path = os.path.join(output_dir, 'petro.html')
+    try:
+        bytecode_cache = FileSystemBytecodeCache(cache_dir)
+        _load_template(bytecode_cache)
+
+        print('{:<40} {:>8}'.format('template load', 'ms'))
+        print('{:<40} {:>8.2f}'.format(
+            'compile from source', _ms(_load_template, 20)))
+        print('{:<40} {:>8.2f}'.format(
+            'load from bytecode cache', _ms(lambda: _load_template(bytecode_cache), 20)))
+
+        cached_env = html_writer._env
+        buffer = io.StringIO()
+
+        def render_into_buffer():
+            buffer.seek(0)
+            buffer.truncate()
+            html_writer.render(buffer, races, reglist, banner_url)
+
+        print()
+        print('{:<40} {:>8}'.format('render', 'ms'))
+        print('{:<40} {:>8.2f}'.format(
+            'new environment per write',
+            _ms(lambda: _legacy_write(output_path, races, reglist, banner_url), 20)))
+        html_writer._env = cached_env
+        print('{:<40} {:>8.2f}'.format(
+            'cached environment, write',
+            _ms(lambda: html_writer.write(output_path, races, reglist, banner_url), 20)))
+        print('{:<40} {:>8.2f}'.format(
+            'cached environment, reused buffer', _ms(render_into_buffer, 20)))
+    finally:
+        shutil.rmtree(cache_dir)
+        shutil.rmtree(output_dir)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+_SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+_ACCEPTANCE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'acceptance_tests')
+
+# Modules whose cumulative import time is reported when imported. The
+# writers are not, as modules imported with importlib.import_module are
+# missing from the report, but their jinja2 and numpy are.
+_MODULES = ('petro', 'splitfile', 'event', 'jinja2', 'numpy', 'parsley')
+
+
+def _import_times(args, cwd):
+    """
+    :returns: a dict of the cumulative import time in microseconds by
+              top-level module name, as reported by python -X importtime,
+              and the wall time of the whole run in microseconds under
+              None.
+    """
+    env = dict(os.environ, PYTHONPATH=os.path.abspath(_SRC_DIR))
+    start = time.perf_counter()
+    stderr = subprocess.run(
+        [sys.executable, '-X', 'importtime'] + args, cwd=cwd, env=env,
+        stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, universal_newlines=True).stderr
+    times = {None: int((time.perf_counter() - start) * 1e6)}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        __, cumulative, name = line[len('import time:'):].split('|')
+        name = name.strip()
+        times.setdefault(name, int(cumulative))
+    return times
+
+
+def main():
+    args_parser = argparse.ArgumentParser(
+        description='Reports the import time of petro with python -X importtime.')
+    args_parser.add_argument('--repeat', type=int, default=5)
+    args = args_parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        commands = [('import petro', ['-c', 'import petro'])]
+        for output_format in ('csv', 'html', 'npy'):
+            commands.append((
+                'petro ' + output_format,
+                ['-m', 'petro', 'test.split', output_format,
+                 os.path.join(tmp_dir, 'out.' + output_format)]))
+        commands.append((
+            'petro --parser parsley',
+            ['-m', 'petro', 'test.split', 'csv', os.path.join(tmp_dir, 'out.csv'),
+             '--parser', 'parsley']))
+
+        print('{:<24} '.format('command') +
+              ' '.join('{:>11}'.format(m) for m in _MODULES + ('total',)))
+        for name, command in commands:
+            runs = [_import_times(command, _ACCEPTANCE_DIR) for __ in range(args.repeat)]
+            cells = []
+            for module in _MODULES + (None,):
+                if module in runs[0]:
+                    cells.append('{:>8.1f} ms'.format(min(r[module] for r in runs) / 1000))
+                else:
+                    cells.append('{:>11}'.format('-'))
+            print('{:<24} '.format(name) + ' '.join(cells))
+        print('Times are cumulative, "-" is not imported. For "petro", the times of the')
+        print('modules imported by running it are recorded under their own names.')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+from concurrent.futures import ProcessPoolExecutor
+import io
+import os
+import tempfile
+import time
+
+import csv_writer
+import html_writer
+from race import Race
+from reglist import Reglist, Participant
+
+CATEGORIES = 50
+RIDERS = 200
+LAPS = 5
+
+
+def _synthetic_event():
+    categories = [(cid, 'Category {}'.format(cid)) for cid in range(1, CATEGORIES + 1)]
+    participants = []
+    races = {}
+    for cid, __ in categories:
+        bibs = range(cid * 1000, cid * 1000 + RIDERS)
+        participants += [
+            Participant(bib, cid, 'Rider {}'.format(bib), '', 'Team', 'City', '30')
+            for bib in bibs]
+        race = Race(laps=LAPS, bibs=bibs)
+        race.start('10:00:00')
+        for lap in range(LAPS):
+            for i, bib in enumerate(bibs):
+                seconds = 10 * 3600 + (lap + 1) * 1200 + i
+                race.split(bib, '{:02}:{:02}:{:02}'.format(
+                    seconds // 3600, seconds // 60 % 60, seconds % 60))
+        races[cid] = race
+    return races, Reglist(categories, participants)
+
+
+def _html(races, reglist, executor):
+    buffer = io.StringIO()
+    html_writer.render(buffer, races, reglist, None, executor=executor)
+    # Leaves out the line with the current time.
+    return [
+        line for line in buffer.getvalue().splitlines()
+        if 'Час створення протоколу' not in line]
+
+
+def _csv(races, reglist, executor, output_path):
+    csv_writer.write(output_path, races, reglist, None, executor=executor)
+    with open(output_path, mode='rb') as f:
+        return f.read()
+
+
+def main():
+    races, reglist = _synthetic_event()
+    fd, output_path = tempfile.mkstemp(suffix='.csv')
+    os.close(fd)
+    writers = [
+        ('html', lambda executor: _html(races, reglist, executor)),
+        ('csv', lambda executor: _csv(races, reglist, executor, output_path)),
+    ]
+    try:
+        print('{} categories x {} riders x {} laps, {} CPUs'.format(
+            CATEGORIES, RIDERS, LAPS, os.cpu_count()))
+        print('{:<6} {:>6} {:>10} {:>8}'.format('writer', 'jobs', 'ms', 'speedup'))
+        for name, write in writers:
+            serial_output = write(None)
+            serial_ms = None
+            for jobs in [1, 2, 4, 8]:
+                executor = ProcessPoolExecutor(jobs) if jobs > 1 else None
+                try:
+                    write(executor)
+                    started = time.perf_counter()
+                    output = write(executor)
+                    ms = (time.perf_counter() - started) * 1000
+                finally:
+                    if executor is not None:
+                        executor.shutdown()
+                assert output == serial_output, 'Output differs from the serial one.'
+                serial_ms = serial_ms or ms
+                print('{:<6} {:>6} {:>10.1f} {:>7.2f}x'.format(
+                    name, jobs, ms, serial_ms / ms))
+    finally:
+        os.remove(output_path)
+
+
+if __name__ == '__main__':
+    main()
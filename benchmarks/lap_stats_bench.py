@@ -0,0 +1,62 @@
+import random
+import timeit
+
+import lap_stats
+from race import errors, Race
+from race.time_str import ms_to_time_str
+
+_LAPS = 8
+
+
+def _race(riders, rnd):
+    race = Race(laps=_LAPS, bibs=range(1, riders + 1))
+    race.start('10:00:00')
+    splits = []
+    for bib in range(1, riders + 1):
+        lap_ms = rnd.randrange(900000, 1500000)
+        t = 10 * 3600 * 1000
+        for lap in range(rnd.randrange(_LAPS + 1)):
+            t += lap_ms + rnd.randrange(-30000, 30000)
+            splits.append((t, bib))
+    for t, bib in sorted(splits):
+        try:
+            race.split(bib, ms_to_time_str(t))
+        except errors.BibHasAlreadyFinished:
+            # Finished on a lap behind the leader.
+            pass
+    return race
+
+
+def _per_rider(race):
+    # What a template would do: parse the lap time strings of every row.
+    stats = {}
+    leader = race.results[0]
+    for result in race.results:
+        laps = [
+            sum(int(x) * f for x, f in zip(t.split('.')[0].split(':'), (3600, 60, 1)))
+            for t in result.lap_times]
+        if laps:
+            mean = sum(laps) / len(laps)
+            stdev = (sum((x - mean) ** 2 for x in laps) / len(laps)) ** 0.5
+            gap = sum(laps) - sum(
+                int(x) * f for t in leader.lap_times[:len(laps)]
+                for x, f in zip(t.split('.')[0].split(':'), (3600, 60, 1)))
+            stats[result.bib] = (min(laps), mean, stdev, gap)
+    return stats
+
+
+def main():
+    rnd = random.Random(1)
+    print('{:<8} {:>14} {:>14} {:>14}'.format('riders', 'compute, ms', 'formatted, ms',
+                                              'per rider, ms'))
+    for riders in (100, 1000, 5000):
+        race = _race(riders, rnd)
+        race.results
+        times = [
+            min(timeit.repeat(lambda: fn(race), number=1, repeat=5)) * 1000
+            for fn in (lap_stats.compute, lap_stats.formatted, _per_rider)]
+        print('{:<8} {:>14.2f} {:>14.2f} {:>14.2f}'.format(riders, *times))
+
+
+if __name__ == '__main__':
+    main()
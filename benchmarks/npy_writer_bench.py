@@ -0,0 +1,48 @@
+import csv
+import os
+import shutil
+import tempfile
+import timeit
+
+import numpy as np
+
+from csv_writer import write as write_csv
+from event_generator import generate
+from npy_writer import write as write_npy
+import petro
+
+
+def _load_csv(path):
+    # What analytics scripts do: parse the rows and the lap times back.
+    with open(path, mode='rt', encoding='cp1251') as f:
+        rows = list(csv.reader(f, delimiter=';'))[1:]
+    return [
+        [int(h) * 3600 + int(m) * 60 + int(s)
+         for h, m, s in (t.split(':') for t in row[15:] if t)]
+        for row in rows]
+
+
+def main():
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        split_path, __, __ = generate(tmp_dir, categories=20, riders=500, laps=5)
+        races, reglist, banner_url = petro._results(split_path, on_error=print)
+        csv_path = os.path.join(tmp_dir, 'results.csv')
+        npy_path = os.path.join(tmp_dir, 'results.npy')
+
+        print('{} riders'.format(sum(len(race.results) for race in races.values())))
+        print('{:<8} {:>10} {:>10} {:>10}'.format('format', 'write, ms', 'load, ms', 'size, KiB'))
+        for name, path, write, load in (
+                ('csv', csv_path, write_csv, _load_csv),
+                ('npy', npy_path, write_npy, lambda p: np.load(p, mmap_mode='r'))):
+            write_s = min(timeit.repeat(
+                lambda: write(path, races, reglist, banner_url), number=1, repeat=5))
+            load_s = min(timeit.repeat(lambda: load(path), number=1, repeat=5))
+            print('{:<8} {:>10.1f} {:>10.2f} {:>10.1f}'.format(
+                name, write_s * 1000, load_s * 1000, os.path.getsize(path) / 1024))
+    finally:
+        shutil.rmtree(tmp_dir)
+
+
+if __name__ == '__main__':
+    main()
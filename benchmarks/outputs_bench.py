@@ -0,0 +1,43 @@
+import contextlib
+import io
+import os
+import shutil
+import tempfile
+import timeit
+
+from event_generator import generate
+import petro
+
+
+def main():
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        split_path, __, stats = generate(tmp_dir, categories=10, riders=300, laps=5)
+        csv_path = os.path.join(tmp_dir, 'results.csv')
+        html_path = os.path.join(tmp_dir, 'results.html')
+
+        def run(*args, **kwargs):
+            with contextlib.redirect_stdout(io.StringIO()):
+                petro._main(split_path, *args, **kwargs)
+
+        runs = {
+            'csv': lambda: run('csv', csv_path),
+            'html': lambda: run('html', html_path),
+            'csv, then html': lambda: (run('csv', csv_path), run('html', html_path)),
+            'csv + html': lambda: run(
+                'csv', csv_path, extra_outputs=[('html', html_path)]),
+            'csv + html, concurrent': lambda: run(
+                'csv', csv_path, extra_outputs=[('html', html_path)],
+                concurrent_writers=True),
+        }
+        print('{} lines'.format(stats['lines']))
+        print('{:<24} {:>10}'.format('outputs', 'time, ms'))
+        for name, fn in runs.items():
+            seconds = min(timeit.repeat(fn, number=1, repeat=5))
+            print('{:<24} {:>10.1f}'.format(name, seconds * 1000))
+    finally:
+        shutil.rmtree(tmp_dir)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,42 @@
+import os
+import timeit
+
+from splitfile.parser import parse, FAST, PARSLEY
+
+_SPLIT_PATH = os.path.join(
+    os.path.dirname(__file__), '..', 'acceptance_tests', 'test.split')
+
+
+def _lines():
+    with open(_SPLIT_PATH, encoding='utf-8') as f:
+        return f.readlines()
+
+
+def _syntax_errors():
+    return ['1 12:00:0{}\n'.format(c) for c in 'abcdefghij']
+
+
+def _lines_per_second(engine, lines, repeat=3):
+    seconds = min(timeit.repeat(
+        lambda: sum(1 for _ in parse(lines, engine)),
+        number=1,
+        repeat=repeat))
+    return len(lines) / seconds
+
+
+def main():
+    workloads = [
+        ('test.split', _lines() * 20),
+        ('syntax errors', _syntax_errors() * 200),
+    ]
+    print('{:<15} {:>10} {:>14} {:>14} {:>8}'.format(
+        'workload', 'lines', 'parsley l/s', 'fast l/s', 'speedup'))
+    for name, lines in workloads:
+        slow = _lines_per_second(PARSLEY, lines)
+        fast = _lines_per_second(FAST, lines)
+        print('{:<15} {:>10} {:>14.0f} {:>14.0f} {:>7.1f}x'.format(
+            name, len(lines), slow, fast, fast / slow))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,135 @@
+"""
+Times every processing phase on a synthetic event.
+
+    python benchmarks/phases_bench.py --riders 1000 --json phases.json
+
+Compare the saved JSON files of two commits to spot regressions.
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import tempfile
+import time
+
+import csv_writer
+from event_generator import generate
+import html_writer
+import petro
+from reglist import Reglist
+from reglist import cache
+import splitfile
+
+
+def _time(f, repeat):
+    runs = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        f()
+        runs.append((time.perf_counter() - started) * 1000)
+    return {
+        'min_ms': round(min(runs), 3),
+        'median_ms': round(statistics.median(runs), 3),
+        'runs': repeat,
+    }
+
+
+def _commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', 'HEAD'], cwd=os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(params, repeat):
+    """
+    :returns: a JSON serializable dict with the timings of every phase.
+    """
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        split_path, reglist_path, stats = generate(tmp_dir, **params)
+        cache_dir = os.path.join(tmp_dir, 'reglist-cache')
+        output_path = os.path.join(tmp_dir, 'output')
+
+        with open(split_path, mode='rt', encoding='utf-8') as f:
+            lines = f.readlines()
+
+        errors = []
+
+        def on_error(line_number, message):
+            errors.append(line_number)
+
+        races, reglist, banner_url = petro._results(split_path, on_error)
+        assert len(errors) == stats['syntax_errors'], 'Unexpected errors: {}'.format(errors)
+        Reglist.open(reglist_path, cache_dir=cache_dir)
+
+        def reglist_cached():
+            # As in a new process, which reads the entry from the disk.
+            cache._loaded.clear()
+            Reglist.open(reglist_path, cache_dir=cache_dir)
+
+        phases = {
+            'parse': lambda: list(splitfile.parse(lines)),
+            'reglist': lambda: Reglist.open(reglist_path, cache_dir=None),
+            'reglist_cached': reglist_cached,
+            'reglist_lazy': lambda: Reglist.open(reglist_path, lazy=True),
+            'replay': lambda: petro._results(split_path, on_error),
+            'csv': lambda: csv_writer.write(output_path, races, reglist, banner_url),
+            'html': lambda: html_writer.write(output_path, races, reglist, banner_url),
+        }
+        return {
+            'commit': _commit(),
+            'python': platform.python_version(),
+            'params': params,
+            'stats': stats,
+            'phases': {name: _time(f, repeat) for name, f in phases.items()},
+        }
+    finally:
+        shutil.rmtree(tmp_dir)
+
+
+def main():
+    args_parser = argparse.ArgumentParser(description='Times every processing phase.')
+    args_parser.add_argument('--categories', type=int, default=10)
+    args_parser.add_argument('--riders', type=int, default=200, help='riders per category')
+    args_parser.add_argument('--laps', type=int, default=5)
+    args_parser.add_argument('--dnf-rate', type=float, default=0.02)
+    args_parser.add_argument('--group-rate', type=float, default=0.1)
+    args_parser.add_argument('--error-rate', type=float, default=0.0)
+    args_parser.add_argument('--seed', type=int, default=1)
+    args_parser.add_argument('--repeat', type=int, default=5)
+    args_parser.add_argument('--json', help='save the results to this file')
+    args = args_parser.parse_args()
+
+    params = {
+        'categories': args.categories,
+        'riders': args.riders,
+        'laps': args.laps,
+        'dnf_rate': args.dnf_rate,
+        'group_rate': args.group_rate,
+        'error_rate': args.error_rate,
+        'seed': args.seed,
+    }
+    results = run(params, args.repeat)
+
+    print('{} lines, {} splits, {} participants'.format(
+        results['stats']['lines'], results['stats']['splits'],
+        args.categories * args.riders))
+    print('{:<16} {:>10} {:>10}'.format('phase', 'min ms', 'median ms'))
+    for name, timing in results['phases'].items():
+        print('{:<16} {:>10.1f} {:>10.1f}'.format(
+            name, timing['min_ms'], timing['median_ms']))
+
+    if args.json:
+        with open(args.json, mode='wt', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+            f.write('\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+from array import array
+from datetime import datetime, timedelta
+import tracemalloc
+
+from race import Race, ParticipantState
+from race.participant import Participant
+
+RIDERS = 20000
+LAPS = 5
+
+
+class _LegacyParticipant(object):
+    # The dict-based record with a list of datetime splits Race used to keep.
+    def __init__(self, bib, splits, state):
+        self._bib = bib
+        self._splits = splits
+        self._state = state
+
+
+def _legacy_participants():
+    start = datetime(1900, 1, 1, 10)
+    participants = {}
+    for bib in range(RIDERS):
+        p = _LegacyParticipant(bib, [], ParticipantState.RACING)
+        for lap in range(LAPS):
+            p._splits.append(start + timedelta(seconds=bib + lap * 1800))
+        participants[bib] = p
+    return participants
+
+
+def _participants():
+    start = 10 * 3600 * 1000
+    participants = {}
+    split_times = array('l', [0]) * (RIDERS * LAPS)
+    for bib in range(RIDERS):
+        p = Participant(bib, ParticipantState.RACING, bib)
+        for lap in range(LAPS):
+            split_times[bib * LAPS + lap] = start + (bib + lap * 1800) * 1000
+            p.laps_done += 1
+        participants[bib] = p
+    return participants, split_times
+
+
+def _race():
+    race = Race(laps=LAPS, bibs=range(RIDERS))
+    race.start('10:00:00')
+    for lap in range(LAPS):
+        for bib in range(RIDERS):
+            seconds = 10 * 3600 + lap * 1800 + 600 + bib // 20
+            race.split(bib, '{:02}:{:02}:{:02}'.format(
+                seconds // 3600, seconds // 60 % 60, seconds % 60))
+    return race
+
+
+def _bytes_per_rider(factory):
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        result = factory()
+        after = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    del result
+    return (after - before) / RIDERS
+
+
+def main():
+    print('{} riders, {} laps each'.format(RIDERS, LAPS))
+    print('{:<28} {:>12}'.format('storage', 'bytes/rider'))
+    for name, factory in [
+            ('legacy participant records', _legacy_participants),
+            ('compact participant records', _participants),
+            ('whole Race, compact', _race)]:
+        print('{:<28} {:>12.0f}'.format(name, _bytes_per_rider(factory)))
+
+
+if __name__ == '__main__':
+    main()
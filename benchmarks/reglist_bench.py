@@ -0,0 +1,95 @@
+import os
+import shutil
+import tempfile
+import timeit
+import tracemalloc
+
+from reglist import Reglist
+from reglist import cache
+
+_CATEGORIES = 20
+_RIDERS_PER_CATEGORY = 1000
+_LOOKUPS = 1000
+
+
+def _memory(open_reglist):
+    tracemalloc.start()
+    reglist = open_reglist()
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del reglist
+    return retained, peak
+
+
+def _write_reglist(path):
+    with open(path, mode='wt', encoding='cp1251', newline='') as f:
+        bib = 1
+        for c in range(1, _CATEGORIES + 1):
+            f.write('{}. Категорія;;;;;;\r\n'.format(c))
+            for r in range(_RIDERS_PER_CATEGORY):
+                f.write('{};Учасник {};Нік;Команда {};Київ;{};\r\n'.format(
+                    bib, bib, r % 50, 20 + r % 40))
+                bib += 1
+
+
+def main():
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        path = os.path.join(tmp_dir, 'reglist.csv')
+        cache_dir = os.path.join(tmp_dir, 'cache')
+        _write_reglist(path)
+
+        parse_s = min(timeit.repeat(
+            lambda: Reglist.open(path, cache_dir=None), number=1, repeat=5))
+
+        def cold():
+            shutil.rmtree(cache_dir, ignore_errors=True)
+            cache._loaded.clear()
+            Reglist.open(path, cache_dir=cache_dir)
+        cold_s = min(timeit.repeat(cold, number=1, repeat=5))
+
+        def warm():
+            # As in a new process, which reads the entry from the disk.
+            cache._loaded.clear()
+            Reglist.open(path, cache_dir=cache_dir)
+        warm_s = min(timeit.repeat(warm, number=1, repeat=5))
+
+        loaded_s = min(timeit.repeat(
+            lambda: Reglist.open(path, cache_dir=cache_dir), number=1, repeat=5))
+
+        lazy_s = min(timeit.repeat(
+            lambda: Reglist.open(path, lazy=True), number=1, repeat=5))
+
+        # What the writers do: a lookup per result row.
+        lazy = Reglist.open(path, lazy=True)
+        bibs = list(range(1, _LOOKUPS + 1))
+        lookups_s = min(timeit.repeat(
+            lambda: [lazy.participant(bib) for bib in bibs], number=1, repeat=5))
+        lazy.close()
+
+        print('reglist: {} participants, {} KiB'.format(
+            _CATEGORIES * _RIDERS_PER_CATEGORY, os.path.getsize(path) // 1024))
+        print('{:<22} {:>10}'.format('case', 'ms'))
+        for name, seconds in [
+                ('parse, no cache', parse_s),
+                ('parse and save', cold_s),
+                ('cached', warm_s),
+                ('cached, same process', loaded_s),
+                ('lazy index', lazy_s),
+                ('lazy, {} lookups'.format(_LOOKUPS), lookups_s)]:
+            print('{:<22} {:>10.1f}'.format(name, seconds * 1000))
+        print('speedup {:.1f}x cached, {:.1f}x lazy'.format(
+            parse_s / warm_s, parse_s / lazy_s))
+
+        print('{:<22} {:>10} {:>10}'.format('memory', 'kept KiB', 'peak KiB'))
+        for name, open_reglist in [
+                ('eager', lambda: Reglist.open(path, cache_dir=None)),
+                ('lazy', lambda: Reglist.open(path, lazy=True))]:
+            retained, peak = _memory(open_reglist)
+            print('{:<22} {:>10} {:>10}'.format(name, retained // 1024, peak // 1024))
+    finally:
+        shutil.rmtree(tmp_dir)
+
+
+if __name__ == '__main__':
+    main()
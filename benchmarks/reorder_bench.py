@@ -0,0 +1,38 @@
+import random
+import time
+
+import splitfile
+
+SPLITS = 200000
+
+
+def _time_str(ms):
+    s = ms // 1000
+    return '{:02}:{:02}:{:02}'.format(s // 3600, s // 60 % 60, s % 60)
+
+
+def main():
+    rnd = random.Random(1)
+    # 50 splits a second, typed up to 5 seconds late.
+    times = [10 * 3600 * 1000 + i * 20 + rnd.randrange(0, 5000) for i in range(SPLITS)]
+    expressions = [
+        (i + 1, splitfile.expression.SPLIT, [i % 1000], _time_str(t))
+        for i, t in enumerate(times)]
+
+    print('{} splits, 50/s, up to 5 s out of order'.format(SPLITS))
+    print('{:<10} {:>12} {:>8} {:>10}'.format('window, s', 'splits/s', 'late', 'max held'))
+    for window in [0, 5, 30]:
+        late = []
+        buffer = splitfile.ReorderBuffer(window, late.append)
+        held = 0
+        started = time.perf_counter()
+        for e in expressions:
+            buffer.push((e,))
+            held = max(held, len(buffer))
+        buffer.flush()
+        elapsed = time.perf_counter() - started
+        print('{:<10} {:>12.0f} {:>8} {:>10}'.format(window, SPLITS / elapsed, len(late), held))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,102 @@
+import contextlib
+import io
+import os
+import random
+import shutil
+import tempfile
+import time
+import tracemalloc
+
+import rfid
+from reglist import Reglist
+
+_CATEGORIES = 4
+_RIDERS_PER_CATEGORY = 250
+_LAPS = 5
+_READS_PER_PASSAGE = 15
+_START = 10 * 3600
+
+
+def _time_str(ms):
+    s = ms // 1000
+    return '{:02}:{:02}:{:02}.{:03}'.format(s // 3600, s // 60 % 60, s % 60, ms % 1000)
+
+
+def _write_event(tmp_dir):
+    with open(os.path.join(tmp_dir, 'reglist.csv'), mode='wt', encoding='cp1251',
+              newline='') as f:
+        f.write('Номер;Имя;Ник;Команда;Откуда;Возраст;Велосипед;Ком;rfid\r\n')
+        bib = 1
+        for c in range(1, _CATEGORIES + 1):
+            f.write('{}. Категорія;;;;;;;;\r\n'.format(c))
+            for r in range(_RIDERS_PER_CATEGORY):
+                f.write('{};Учасник {};;;Київ;30;;1;E28011{:06X}\r\n'.format(bib, bib, bib))
+                bib += 1
+    categories = ' '.join(str(c) for c in range(1, _CATEGORIES + 1))
+    with open(os.path.join(tmp_dir, 'event.split'), mode='wt', encoding='utf-8') as f:
+        f.write('reglist reglist.csv\nlaps {} {}\nstart {} 10:00:00\n'.format(
+            categories, _LAPS, categories))
+
+
+def _reads(rnd):
+    """
+    :returns: reader output lines, every passage read many times within
+              a second, with a share of tags of marshals.
+    """
+    reads = []
+    for bib in range(1, _CATEGORIES * _RIDERS_PER_CATEGORY + 1):
+        lap_ms = rnd.randrange(900000, 1500000)
+        t = _START * 1000
+        for lap in range(_LAPS):
+            t += lap_ms + rnd.randrange(-30000, 30000)
+            for i in range(_READS_PER_PASSAGE):
+                reads.append((t + i * 60, 'E28011{:06X}'.format(bib)))
+            if rnd.random() < 0.1:
+                reads.append((t, 'FFFF{:06X}'.format(bib)))
+    reads.sort()
+    return ['{} {}\n'.format(tag, _time_str(ms)) for ms, tag in reads]
+
+
+def _measure(run):
+    started = time.perf_counter()
+    run()
+    elapsed = time.perf_counter() - started
+    tracemalloc.start()
+    run()
+    __, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main():
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        _write_event(tmp_dir)
+        lines = _reads(random.Random(1))
+        reads_path = os.path.join(tmp_dir, 'reads.txt')
+        with open(reads_path, mode='wt', encoding='ascii') as f:
+            f.writelines(lines)
+        reglist = Reglist.open(os.path.join(tmp_dir, 'reglist.csv'), cache_dir=None)
+
+        print('{} riders, {} laps, {} reads'.format(
+            _CATEGORIES * _RIDERS_PER_CATEGORY, _LAPS, len(lines)))
+        print('{:<24} {:>12} {:>14}'.format('', 'reads/s', 'peak memory'))
+
+        def debounce():
+            return rfid.TagReads(reglist, 10, print).splits(lines)
+
+        def file_to_results():
+            with contextlib.redirect_stdout(io.StringIO()):
+                rfid._main(
+                    os.path.join(tmp_dir, 'event.split'), reads_path, 'csv',
+                    os.path.join(tmp_dir, 'result.csv'), 10)
+
+        for name, run in [('debounce', debounce), ('file to results', file_to_results)]:
+            elapsed, peak = _measure(run)
+            print('{:<24} {:>12.0f} {:>13.1f}K'.format(name, len(lines) / elapsed, peak / 1024))
+    finally:
+        shutil.rmtree(tmp_dir)
+
+
+if __name__ == '__main__':
+    main()
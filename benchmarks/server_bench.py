@@ -0,0 +1,94 @@
+import asyncio
+import contextlib
+import io
+import os
+import shutil
+import tempfile
+import time
+
+from event_generator import generate
+from server import LiveResults, LiveServer
+
+SPECTATORS = 300
+REQUESTS = 2000
+UPDATES = 10
+
+
+async def _get(port, path):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    writer.write('GET {} HTTP/1.1\r\nConnection: close\r\n\r\n'.format(path).encode())
+    response = await reader.read()
+    writer.close()
+    assert response.startswith(b'HTTP/1.1 200'), response[:100]
+
+
+async def _spectator(port, updates, ready):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    writer.write(b'GET /events HTTP/1.1\r\n\r\n')
+    await reader.readuntil(b'\r\n\r\n')
+    await reader.readuntil(b'\n\n')
+    ready.append(True)
+    for _ in range(UPDATES):
+        await reader.readuntil(b'\n\n')
+        updates.append(time.perf_counter())
+    writer.close()
+
+
+async def _main(split_path, lines):
+    with contextlib.redirect_stdout(io.StringIO()):
+        results = LiveResults(split_path)
+        server = LiveServer(results, interval=0.05)
+        port = (await server.start('127.0.0.1', 0)).sockets[0].getsockname()[1]
+        await asyncio.sleep(0.1)
+
+        updates = []
+        ready = []
+        spectators = [
+            asyncio.ensure_future(_spectator(port, updates, ready))
+            for _ in range(SPECTATORS)]
+        while len(ready) < SPECTATORS:
+            await asyncio.sleep(0.01)
+
+        # Requests while lines are being appended and ingested.
+        started = time.perf_counter()
+        paths = ['/', '/categories.json', '/categories/1', '/categories/2.json']
+        requests = asyncio.gather(*[
+            _get(port, paths[i % len(paths)]) for i in range(REQUESTS)])
+        fan_out = []
+        with open(split_path, mode='at', encoding='utf-8') as f:
+            for line in lines[:UPDATES]:
+                f.write(line)
+                f.flush()
+                appended = time.perf_counter()
+                count = len(updates)
+                while len(updates) < count + SPECTATORS:
+                    await asyncio.sleep(0.001)
+                fan_out.append(updates[-1] - appended)
+        await requests
+        elapsed = time.perf_counter() - started
+        await asyncio.gather(*spectators)
+        await server.close()
+    return elapsed, fan_out
+
+
+def main():
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        split_path, __, __ = generate(tmp_dir, categories=10, riders=200)
+        with open(split_path, encoding='utf-8') as f:
+            lines = f.readlines()
+        # Every update is one more line of splits.
+        with open(split_path, mode='wt', encoding='utf-8') as f:
+            f.writelines(lines[:-UPDATES])
+        elapsed, fan_out = asyncio.run(_main(split_path, lines[-UPDATES:]))
+        print('{} spectators on /events, {} requests, {} updates, {} CPUs'.format(
+            SPECTATORS, REQUESTS, UPDATES, os.cpu_count()))
+        print('requests/s: {:.0f}'.format(REQUESTS / elapsed))
+        print('update to all spectators, ms: max {:.1f}, mean {:.1f}'.format(
+            max(fan_out) * 1000, sum(fan_out) / len(fan_out) * 1000))
+    finally:
+        shutil.rmtree(tmp_dir)
+
+
+if __name__ == '__main__':
+    main()
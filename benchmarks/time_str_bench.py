@@ -0,0 +1,65 @@
+from datetime import datetime, timedelta
+import random
+import timeit
+
+from race.time_str import time_str_to_ms, ms_to_time_str
+
+
+def _legacy_time_str_to_datetime(time_str):
+    return datetime.strptime(time_str, '%H:%M:%S')
+
+
+def _legacy_timedelta_to_time_str(td):
+    return '{:02}:{:02}:{:02}'.format(
+        td.days * 24 + td.seconds // 3600,
+        (td.seconds % 3600) // 60,
+        (td.seconds % 3600) % 60)
+
+
+def _legacy_laps(time_strs):
+    splits = [_legacy_time_str_to_datetime(t) for t in time_strs]
+    prev = splits[0]
+    for split in splits[1:]:
+        _legacy_timedelta_to_time_str(split - prev)
+        prev = split
+
+
+def _laps(time_strs):
+    splits = [time_str_to_ms(t) for t in time_strs]
+    prev = splits[0]
+    for split in splits[1:]:
+        ms_to_time_str(split - prev)
+        prev = split
+
+
+def main():
+    rnd = random.Random(1)
+    seconds = sorted(rnd.randrange(10 * 3600, 16 * 3600) for _ in range(10000))
+    time_strs = [
+        '{:02}:{:02}:{:02}'.format(s // 3600, s // 60 % 60, s % 60)
+        for s in seconds]
+    durations_ms = [(b - a) * 1000 for a, b in zip(seconds, seconds[1:])]
+    durations_td = [timedelta(milliseconds=d) for d in durations_ms]
+
+    cases = [
+        ('parse',
+         lambda: [_legacy_time_str_to_datetime(t) for t in time_strs],
+         lambda: [time_str_to_ms(t) for t in time_strs]),
+        ('format',
+         lambda: [_legacy_timedelta_to_time_str(d) for d in durations_td],
+         lambda: [ms_to_time_str(d) for d in durations_ms]),
+        ('laps',
+         lambda: _legacy_laps(time_strs),
+         lambda: _laps(time_strs)),
+    ]
+    print('{:<8} {:>14} {:>14} {:>8}'.format(
+        'case', 'datetime ops/s', 'int ms ops/s', 'speedup'))
+    for name, legacy, new in cases:
+        legacy_s = min(timeit.repeat(legacy, number=1, repeat=5))
+        new_s = min(timeit.repeat(new, number=1, repeat=5))
+        print('{:<8} {:>14.0f} {:>14.0f} {:>7.1f}x'.format(
+            name, len(time_strs) / legacy_s, len(time_strs) / new_s, legacy_s / new_s))
+
+
+if __name__ == '__main__':
+    main()
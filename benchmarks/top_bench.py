@@ -0,0 +1,41 @@
+import copy
+import os
+import shutil
+import tempfile
+import time
+
+from event_generator import generate
+from html_writer import write as write_html
+import petro
+
+
+def _write_s(races, reglist, banner_url, path, top, repeat=5):
+    best = None
+    for __ in range(repeat):
+        # Deep copies drop the rows computed by the previous repeat.
+        fresh = copy.deepcopy(races)
+        start = time.perf_counter()
+        write_html(path, fresh, reglist, banner_url, top=top)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        split_path, __, __ = generate(tmp_dir, categories=20, riders=500, laps=5)
+        races, reglist, banner_url = petro._results(split_path, on_error=print)
+        path = os.path.join(tmp_dir, 'results.html')
+
+        print('{:<8} {:>10} {:>10}'.format('top', 'write, ms', 'size, KiB'))
+        for top in (None, 100, 10):
+            write_s = _write_s(races, reglist, banner_url, path, top)
+            print('{:<8} {:>10.1f} {:>10.1f}'.format(
+                'all' if top is None else top, write_s * 1000, os.path.getsize(path) / 1024))
+    finally:
+        shutil.rmtree(tmp_dir)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,140 @@
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+import contextlib
+import glob
+import io
+import os
+import sys
+import traceback
+
+import petro
+import splitfile
+
+
+def _main(source, output_format=None, output_dir=None, engine=splitfile.FAST, jobs=1,
+          lazy_reglist=False):
+    """
+    Processes many split files in one process or in a pool of jobs
+    worker processes. Every process keeps its parsed reglists, templates
+    and grammar between the events.
+
+    :param source: a directory with *.split files or a manifest file.
+    :returns: 0 if all events were processed without errors, otherwise
+              the highest exit code of an event.
+    """
+    events = _events(source, output_format, output_dir)
+    args = [event + (engine, lazy_reglist) for event in events]
+    if jobs > 1:
+        with ProcessPoolExecutor(jobs) as executor:
+            outcomes = list(executor.map(_process, *zip(*args)))
+    else:
+        outcomes = [_process(*a) for a in args]
+
+    exit_code = 0
+    for (input_path, __, __), (code, output) in zip(events, outcomes):
+        print('* {}: exit code {}'.format(input_path, code))
+        if output:
+            print(output, end='')
+        exit_code = max(exit_code, code)
+    return exit_code
+
+
+def _events(source, output_format, output_dir):
+    """
+    :returns: a list of (input_path, output_format, output_path).
+    """
+    if os.path.isdir(source):
+        if output_format is None:
+            raise ValueError('Output format is required for a directory.')
+        if output_dir is not None:
+            os.makedirs(output_dir, exist_ok=True)
+        events = []
+        for input_path in sorted(glob.glob(os.path.join(source, '*.split'))):
+            name = os.path.splitext(os.path.basename(input_path))[0]
+            output_path = os.path.join(
+                output_dir or source, '{}.{}'.format(name, output_format))
+            events.append((input_path, output_format, output_path))
+        return events
+    return _manifest(source)
+
+
+def _manifest(manifest_path):
+    """
+    Reads a manifest file. Every line has petro's arguments:
+
+        path_to_split_file output_format path_to_output_file
+
+    Relative paths are relative to the manifest. Empty lines and lines
+    starting with # are skipped.
+    """
+    base_dir = os.path.dirname(os.path.abspath(manifest_path))
+    events = []
+    with open(manifest_path, mode='rt', encoding='utf-8') as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            fields = line.split()
+            if len(fields) != 3 or fields[1] not in petro._writers:
+                raise ValueError('Manifest line {}: expected "{}".'.format(
+                    line_number, 'path_to_split_file output_format path_to_output_file'))
+            input_path, output_format, output_path = fields
+            events.append((
+                os.path.join(base_dir, input_path),
+                output_format,
+                os.path.join(base_dir, output_path)))
+    return events
+
+
+def _process(input_path, output_format, output_path, engine, lazy_reglist):
+    """
+    Runs petro on one event.
+
+    :returns: (exit code, what petro printed).
+    """
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        try:
+            code = petro._main(
+                input_path, output_format, output_path, engine, lazy_reglist=lazy_reglist)
+        except Exception:
+            traceback.print_exc(file=output)
+            code = 1
+    return code or 0, output.getvalue()
+
+
+if __name__ == '__main__':
+    args_parser = argparse.ArgumentParser(
+        description="""
+            Processes many *.split files in one run, e.g. a season archive.
+            Takes a directory with *.split files or a manifest file with
+            a "path_to_split_file output_format path_to_output_file" line
+            per event.
+            """
+        )
+    args_parser.add_argument('directory_or_manifest')
+    args_parser.add_argument(
+        '--format',
+        choices=sorted(petro._writers),
+        help='output format for the events of a directory')
+    args_parser.add_argument(
+        '--output-dir',
+        help='where to put the outputs of a directory, next to the split files by default')
+    petro._add_input_arguments(args_parser)
+    args_parser.add_argument(
+        '--jobs',
+        type=int,
+        default=1,
+        help='number of worker processes, each processing whole events')
+
+    args = args_parser.parse_args()
+    if os.path.isdir(args.directory_or_manifest) and args.format is None:
+        args_parser.error('--format is required for a directory')
+
+    sys.exit(_main(
+        args.directory_or_manifest,
+        args.format,
+        args.output_dir,
+        args.parser,
+        args.jobs,
+        args.lazy_reglist))
@@ -0,0 +1,69 @@
+import hashlib
+import os
+import pickle
+
+from event import Event
+import splitfile
+
+# Bump whenever the pickled Event or Race state changes its layout.
+_FORMAT = 2
+
+
+def checkpoint_path(input_path):
+    return input_path + '.checkpoint'
+
+
+def save(input_path, event, tail):
+    """
+    Saves the event state together with the split file position it was
+    read up to. The checkpoint file is replaced atomically.
+    """
+    checkpoint = {
+        'format': _FORMAT,
+        'position': tail.position,
+        'reglist_hash': _file_hash(event.reglist_path),
+        'event': event.snapshot(),
+    }
+    path = checkpoint_path(input_path)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, mode='wb') as f:
+        pickle.dump(checkpoint, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+
+
+def load(input_path, on_error, engine=splitfile.FAST):
+    """
+    Restores the event state from the checkpoint of a split file.
+
+    The split file content before the checkpoint position is verified
+    by the first read of the returned tail, which raises
+    SplitFileRewritten if the content has changed.
+
+    :returns: (event, tail) or None if there is no valid checkpoint.
+    """
+    try:
+        with open(checkpoint_path(input_path), mode='rb') as f:
+            checkpoint = pickle.load(f)
+    except Exception:
+        # No checkpoint, a damaged one or one of an older petro version.
+        return None
+
+    if checkpoint.get('format') != _FORMAT:
+        return None
+    snapshot = checkpoint['event']
+    if _file_hash(snapshot['reglist_path']) != checkpoint['reglist_hash']:
+        return None
+
+    event = Event.restore(input_path, on_error, snapshot)
+    tail = splitfile.SplitTail(input_path, engine=engine, position=checkpoint['position'])
+    return event, tail
+
+
+def _file_hash(path):
+    if path is None:
+        return None
+    try:
+        with open(path, mode='rb') as f:
+            return hashlib.sha256(f.read()).hexdigest()
+    except OSError:
+        return None
@@ -1,9 +1,25 @@
 import csv
+from functools import partial
+import io
 
+from lap_stats import rows as lap_stats_rows
 from race import ParticipantState
+from render_cache import RenderCache
 
 
-def write(output_path, races, reglist, banner_url):
+def write(output_path, races, reglist, banner_url, cache=None, executor=None,
+          lap_stats=False, top=None):
+    """
+    :param cache: a RenderCache to reuse the rows of categories whose
+                  races have not changed since the previous call.
+    :param executor: an optional process pool to compute results and
+                     format the rows of categories in parallel.
+    :param lap_stats: add the best and average lap, lap consistency and
+                      gap to the leader columns, see lap_stats.
+    :param top: write only this many first rows of every category.
+    """
+    if cache is None:
+        cache = RenderCache()
     with open(output_path, mode='wt', encoding='cp1251') as f:
         writer = csv.writer(f, delimiter=';')
 
@@ -29,31 +45,60 @@ def write(output_path, races, reglist, banner_url):
         ]
         for i in range(1, laps + 1):
             header.append('Круг{}'.format(i))
+        if lap_stats:
+            header += ['Лучший круг', 'Средний круг', 'Стабильность', 'Отставание']
         writer.writerow(header)
 
-        for category_id, category_name in reglist.categories:
-            if category_id not in races:
-                continue
-            for result in races[category_id].results:
-                participant = reglist.participant(result.bib)
-                row = [
-                    result.position if result.state != ParticipantState.DNF else 'Сход',
-                    participant.bib,
-                    category_name,
-                    '',
-                    '',
-                    participant.name,
-                    '',
-                    '',
-                    participant.nickname,
-                    participant.team,
-                    participant.age,
-                    '',
-                    participant.city,
-                    result.laps_done,
-                    ''
-                ]
-                row += result.lap_times
-                row += [''] * (laps - result.laps_done)
-
-                writer.writerow(row)
+        fragments = cache.fragments(
+            _render_race,
+            [
+                (category_id,
+                 races[category_id],
+                 (reglist, category_name, laps, lap_stats, top),
+                 partial(_render_race_args, races[category_id], category_name, reglist,
+                         category_id, laps, lap_stats, top))
+                for category_id, category_name in reglist.categories
+                if category_id in races
+            ],
+            executor)
+        for fragment in fragments:
+            f.write(fragment)
+
+
+def _render_race_args(race, category_name, reglist, category_id, laps, lap_stats, top):
+    participants = {
+        p.bib: p for p in reglist.participants(category_id) if p.bib is not None}
+    return race, category_name, participants, laps, lap_stats, top
+
+
+def _render_race(race, category_name, participants, laps, lap_stats=False, top=None):
+    f = io.StringIO()
+    writer = csv.writer(f, delimiter=';')
+    results = race.results if top is None else race.top(top)
+    rider_stats = lap_stats_rows(race, results) if lap_stats else None
+    for result in results:
+        participant = participants[result.bib]
+        row = [
+            result.position if result.state != ParticipantState.DNF else 'Сход',
+            participant.bib,
+            category_name,
+            '',
+            '',
+            participant.name,
+            '',
+            '',
+            participant.nickname,
+            participant.team,
+            participant.age,
+            '',
+            participant.city,
+            result.laps_done,
+            ''
+        ]
+        row += result.lap_times
+        row += [''] * (laps - result.laps_done)
+        if rider_stats is not None:
+            row += rider_stats[result.bib]
+
+        writer.writerow(row)
+    return f.getvalue()
@@ -0,0 +1,153 @@
+import os
+
+from race import Race
+from reglist import Reglist
+import splitfile
+
+
+class Event(object):
+    def __init__(self, input_path, on_error, lazy_reglist=False):
+        self._input_path = input_path
+        self._on_error = on_error
+        self._lazy_reglist = lazy_reglist
+        self._reglist = None
+        self._reglist_path = None
+        self._banner_url = None
+        self._races = {}
+        self._split_calls = 0
+
+    @property
+    def races(self):
+        return self._races
+
+    @property
+    def reglist(self):
+        return self._reglist
+
+    @property
+    def reglist_path(self):
+        return self._reglist_path
+
+    @property
+    def banner_url(self):
+        return self._banner_url
+
+    @property
+    def split_calls(self):
+        """
+        The number of Race.split calls made by this object, rejected ones
+        included. Splits restored from a checkpoint are not counted.
+        """
+        return self._split_calls
+
+    def snapshot(self):
+        """
+        :returns: a picklable copy of the state to pass to Event.restore.
+        """
+        return {
+            'reglist': self._reglist,
+            'reglist_path': self._reglist_path,
+            'banner_url': self._banner_url,
+            'races': self._races,
+        }
+
+    @staticmethod
+    def restore(input_path, on_error, snapshot):
+        event = Event(input_path, on_error)
+        event._reglist = snapshot['reglist']
+        event._reglist_path = snapshot['reglist_path']
+        event._banner_url = snapshot['banner_url']
+        event._races = snapshot['races']
+        return event
+
+    def apply(self, expression):
+        """
+        Applies a parsed split file expression.
+
+        :returns: True if the expression changed the event state.
+        """
+        line_number, etype, *params = expression
+        on_error = self._on_error
+        reglist = self._reglist
+        races = self._races
+        changed = False
+
+        if etype == splitfile.expression.SYNTAX_ERROR:
+            on_error(line_number, 'Syntax error.')
+        elif etype == splitfile.expression.REGLIST:
+            path = params[0]
+            if not os.path.isabs(path):
+                path = os.path.abspath(
+                    os.path.join(
+                        os.path.abspath(
+                            os.path.dirname(self._input_path)),
+                        path))
+            if reglist is None:
+                self._reglist = Reglist.open(path, lazy=self._lazy_reglist)
+                self._reglist_path = path
+                changed = True
+            else:
+                on_error(line_number, 'Duplicate reglist statement.')
+        elif etype == splitfile.expression.BANNER:
+            if self._banner_url is None:
+                self._banner_url = params[0]
+                changed = True
+            else:
+                on_error(line_number, 'Duplicate banner statement.')
+        elif etype == splitfile.expression.LAPS:
+            if reglist is None:
+                on_error(line_number, 'Reglist is not specified.')
+            else:
+                category_ids, laps = params
+                for id in category_ids:
+                    if id in races:
+                        on_error(line_number, 'Duplicate laps statement.')
+                    elif reglist.bibs(id) is None:
+                        on_error(line_number, 'Category not found.')
+                    else:
+                        races[id] = Race(laps=laps, bibs=list(reglist.bibs(id)))
+                        changed = True
+        elif etype == splitfile.expression.START:
+            if reglist is None:
+                on_error(line_number, 'Reglist is not specified.')
+            else:
+                category_ids, time_tuple = params
+                for id in category_ids:
+                    if id not in races:
+                        on_error(line_number, 'Category not found or laps are not specified.')
+                    elif races[id].started:
+                        on_error(line_number, 'Duplicate start statement.')
+                    else:
+                        races[id].start(time_tuple)
+                        changed = True
+        elif etype == splitfile.expression.DNF:
+            if reglist is None:
+                on_error(line_number, 'Reglist is not specified.')
+            else:
+                bibs = params[0]
+                for bib in bibs:
+                    category_id = reglist.category_of(bib)
+                    if category_id is None:
+                        on_error(line_number, 'Participant not found.')
+                    elif category_id not in races:
+                        on_error(line_number, 'Laps are not specified.')
+                    else:
+                        races[category_id].dnf(bib)
+                        changed = True
+        elif etype == splitfile.expression.SPLIT:
+            if reglist is None:
+                on_error(line_number, 'Reglist is not specified.')
+            else:
+                bibs, time_tuple = params
+                for bib in bibs:
+                    category_id = reglist.category_of(bib)
+                    if category_id is None:
+                        on_error(line_number, 'Participant not found.')
+                    elif category_id not in races:
+                        on_error(line_number, 'Laps are not specified.')
+                    else:
+                        self._split_calls += 1
+                        races[category_id].split(bib, time_tuple)
+                        changed = True
+
+        return changed
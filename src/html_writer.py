@@ -1,47 +1,101 @@
 import datetime
+from functools import partial
 import os
 
-from jinja2 import Environment, FileSystemLoader
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader
 
+from lap_stats import rows as lap_stats_rows
 from race import ParticipantState
+from render_cache import RenderCache
 
+# Compiled templates are kept in memory by the environment and on disk by
+# the bytecode cache, so only the first run after a template change
+# compiles the templates.
+_env = Environment(
+    loader=FileSystemLoader(os.path.dirname(__file__)),
+    bytecode_cache=FileSystemBytecodeCache(),
+    auto_reload=False)
 
-def write(output_path, races, reglist, banner_url):
+
+def write(output_path, races, reglist, banner_url, cache=None, executor=None,
+          lap_stats=False, top=None):
+    with open(output_path, mode='wt', encoding='utf-8', newline='') as f:
+        render(f, races, reglist, banner_url, cache, executor, lap_stats=lap_stats, top=top)
+
+
+def render(stream, races, reglist, banner_url, cache=None, executor=None, live_url=None,
+           lap_stats=False, top=None):
+    """
+    Writes the HTML results into a text stream, e.g. an open file or a
+    reusable io.StringIO buffer.
+
+    :param cache: a RenderCache to reuse the sections of categories
+                  whose races have not changed since the previous call.
+    :param executor: an optional process pool to compute results and
+                     render the sections of categories in parallel.
+    :param live_url: a Server-Sent Events URL. The page reloads itself on
+                     every update event from it.
+    :param lap_stats: add the best and average lap, lap consistency and
+                      gap to the leader columns, see lap_stats.
+    :param top: show only this many first rows of every category.
+    """
+    if cache is None:
+        cache = RenderCache()
+    sections = cache.fragments(
+        _render_race,
+        [
+            (category_id,
+             races[category_id],
+             (reglist, category_name, lap_stats, top),
+             partial(_render_race_args, races[category_id], category_name, reglist, category_id,
+                     lap_stats, top))
+            for category_id, category_name in reglist.categories
+            if category_id in races
+        ],
+        executor)
     context = {
         'banner_url': banner_url,
         'current_time': datetime.datetime.now().strftime('%H:%M:%S'),
-        'races': [],
+        'sections': sections,
+        'live_url': live_url,
+    }
+    _env.get_template('petro.html').stream(context).dump(stream)
+
+
+def _render_race_args(race, category_name, reglist, category_id, lap_stats, top):
+    participants = {
+        p.bib: p for p in reglist.participants(category_id) if p.bib is not None}
+    return race, category_name, participants, lap_stats, top
+
+
+def _render_race(race, category_name, participants, lap_stats=False, top=None):
+    r = {
+        'category_name': category_name,
+        'laps': race.laps,
+        'start_time': race.start_time if race.started else 'очікується',
+        'results': [],
+        'riders_on_course': race.riders_on_course,
+        'lap_stats': lap_stats,
     }
-    for category_id, category_name in reglist.categories:
-        if category_id not in races:
-            continue
-        race = races[category_id]
-        r = {
-            'category_name': category_name,
-            'laps': race.laps,
-            'start_time': race.start_time if race.started else 'очікується',
-            'results': [],
-            'riders_on_course': race.riders_on_course
-        }
-
-        for result in race.results:
-            participant = reglist.participant(result.bib)
-            r['results'].append({
-                'state': _state_ua_str(result.state),
-                'position': result.position,
-                'bib': participant.bib,
-                'name': participant.name,
-                'team': participant.team,
-                'city': participant.city,
-                'age': participant.age,
-                'laps_done': result.laps_done,
-                'total_time': result.total_time,
-                'lap_times': result.lap_times
-            })
-        context['races'].append(r)
-    env = Environment(loader=FileSystemLoader(os.path.dirname(__file__)))
-    tpl = env.get_template('petro.html')
-    tpl.stream(context).dump(output_path, encoding='utf-8')
+    results = race.results if top is None else race.top(top)
+    rider_stats = lap_stats_rows(race, results) if lap_stats else None
+
+    for result in results:
+        participant = participants[result.bib]
+        r['results'].append({
+            'state': _state_ua_str(result.state),
+            'position': result.position,
+            'bib': participant.bib,
+            'name': participant.name,
+            'team': participant.team,
+            'city': participant.city,
+            'age': participant.age,
+            'laps_done': result.laps_done,
+            'total_time': result.total_time,
+            'lap_times': result.lap_times,
+            'stats': rider_stats[result.bib] if rider_stats is not None else None,
+        })
+    return _env.get_template('petro_race.html').render(race=r)
 
 
 def _state_ua_str(state):
@@ -0,0 +1,99 @@
+from collections import namedtuple
+
+from race.time_str import ms_to_time_str
+
+# Times in milliseconds, None if the rider has not done a lap yet.
+LapStats = namedtuple('LapStats', ['best_lap', 'average_lap', 'lap_stdev', 'gap'])
+
+# Formatted LapStats, empty strings for missing values.
+LapStatsRow = namedtuple('LapStatsRow', ['best_lap', 'average_lap', 'lap_stdev', 'gap'])
+
+
+def compute(race):
+    """
+    Computes the lap statistics of every rider of a race at once from a
+    rider by lap matrix of split times.
+
+    The gap is the time between the last split of a rider and the split
+    of the leader on the same lap, negative if the rider was there
+    first. Lap consistency is the standard deviation of the lap times.
+
+    :returns: a dict of LapStats by bib.
+    """
+    # Imported here as numpy is slow to import, and the writers import
+    # this module even without lap statistics.
+    import numpy as np
+
+    start, bibs, laps_done, split_times = race.split_table()
+    if start is None or not bibs:
+        return {bib: LapStats(None, None, None, None) for bib in bibs}
+    n, laps = len(bibs), race.laps
+    splits = np.frombuffer(split_times, dtype=split_times.typecode).reshape(n, laps)
+    done = np.array(laps_done)
+    mask = np.arange(laps) < done[:, None]
+    counts = np.maximum(done, 1)
+
+    previous = np.empty_like(splits)
+    previous[:, 0] = start
+    previous[:, 1:] = splits[:, :-1]
+    lap_times = np.where(mask, splits - previous, 0)
+    best = np.where(mask, lap_times, np.iinfo(lap_times.dtype).max).min(axis=1)
+    average = lap_times.sum(axis=1) / counts
+    deviations = np.where(mask, lap_times - average[:, None], 0.0)
+    stdev = np.sqrt((deviations ** 2).sum(axis=1) / counts)
+
+    leader = bibs.index(race.top(1)[0].bib)
+    last = np.maximum(done - 1, 0)
+    gap = splits[np.arange(n), last] - splits[leader, last]
+    has_gap = (done > 0) & (done <= done[leader])
+
+    stats = {}
+    rows = zip(
+        bibs, laps_done, best.tolist(), np.rint(average).astype(int).tolist(),
+        np.rint(stdev).astype(int).tolist(), gap.tolist(), has_gap.tolist())
+    for bib, laps_done, best_lap, average_lap, lap_stdev, gap_ms, has in rows:
+        if laps_done:
+            stats[bib] = LapStats(best_lap, average_lap, lap_stdev, gap_ms if has else None)
+        else:
+            stats[bib] = LapStats(None, None, None, None)
+    return stats
+
+
+def formatted(race, bibs=None):
+    """
+    :param bibs: the bibs to format, all if None.
+    :returns: a dict of LapStatsRow by bib, as compute but formatted
+              the way lap times are.
+    """
+    computed = compute(race)
+    if bibs is None:
+        bibs = computed.keys()
+    return {
+        bib: LapStatsRow(
+            _time(stats.best_lap),
+            _time(stats.average_lap),
+            _time(stats.lap_stdev),
+            _gap(stats.gap))
+        for bib, stats in ((bib, computed[bib]) for bib in bibs)}
+
+
+def rows(race, results):
+    """
+    :param results: the result rows of the race a writer renders.
+    :returns: a dict of LapStatsRow by bib of those riders.
+    """
+    return formatted(race, [result.bib for result in results])
+
+
+def _time(ms):
+    return '' if ms is None else ms_to_time_str(ms)
+
+
+def _gap(ms):
+    """
+    >>> _gap(0), _gap(1500), _gap(-1500), _gap(None)
+    ('', '+00:00:01.500', '-00:00:01.500', '')
+    """
+    if not ms:
+        return ''
+    return ('+' if ms > 0 else '-') + ms_to_time_str(abs(ms))
@@ -0,0 +1,120 @@
+from functools import partial
+
+import numpy as np
+
+import lap_stats as stats
+from race import ParticipantState
+from render_cache import RenderCache
+
+# The state column holds the index of the state in this tuple.
+STATES = (
+    ParticipantState.WARMING_UP,
+    ParticipantState.RACING,
+    ParticipantState.FINISHED,
+    ParticipantState.DNF,
+)
+
+_STATE_CODES = {state: code for code, state in enumerate(STATES)}
+
+# The gap of a rider without laps, as -1 is a valid gap.
+NO_GAP = np.iinfo('<i4').min
+
+
+def dtype(laps, lap_stats=False):
+    """
+    :param laps: the number of laps of the longest race.
+    :param lap_stats: add the lap statistics fields, see lap_stats.
+    :returns: the dtype of a row. Times are in milliseconds, laps not
+              done yet are -1, as are the statistics of riders without
+              laps, but their gap is NO_GAP.
+    """
+    fields = [
+        ('bib', '<i4'),
+        ('category_id', '<i2'),
+        ('state', 'u1'),
+        ('position', '<i4'),
+        ('laps_done', '<i2'),
+        ('total_time_ms', '<i4'),
+        ('lap_times_ms', '<i4', (laps,)),
+    ]
+    if lap_stats:
+        fields += [
+            ('best_lap_ms', '<i4'),
+            ('average_lap_ms', '<i4'),
+            ('lap_stdev_ms', '<i4'),
+            ('gap_ms', '<i4'),
+        ]
+    return np.dtype(fields)
+
+
+def write(output_path, races, reglist, banner_url, cache=None, executor=None,
+          lap_stats=False, top=None):
+    """
+    Writes the results of all categories as a NumPy structured array in
+    the .npy format, see `dtype`. Rows go in the order of the reglist
+    categories and of the positions within a category.
+
+    The file can be memory-mapped with numpy.load(path, mmap_mode='r').
+
+    :param cache: a RenderCache to reuse the rows of categories whose
+                  races have not changed since the previous call.
+    :param executor: an optional process pool to compute results and
+                     fill the rows of categories in parallel.
+    :param lap_stats: add the lap statistics fields.
+    :param top: write only this many first rows of every category.
+    """
+    if cache is None:
+        cache = RenderCache()
+    laps = max((race.laps for race in races.values()), default=0)
+    columns = cache.fragments(
+        _render_race,
+        [
+            (category_id,
+             races[category_id],
+             (laps, lap_stats, top),
+             partial(_render_race_args, races[category_id], category_id, laps, lap_stats, top))
+            for category_id, __ in reglist.categories
+            if category_id in races
+        ],
+        executor)
+    rows = np.concatenate(columns) if columns else np.empty(0, dtype(laps, lap_stats))
+    with open(output_path, mode='wb') as f:
+        np.save(f, rows, allow_pickle=False)
+
+
+def _render_race_args(race, category_id, laps, lap_stats, top):
+    return race, category_id, laps, lap_stats, top
+
+
+def _render_race(race, category_id, laps, lap_stats=False, top=None):
+    ranking = race.ranking(top)
+    start, bibs, laps_done, split_times = race.split_table()
+    indexes = {bib: i for i, bib in enumerate(bibs)}
+    ranked = [indexes[bib] for bib, __ in ranking]
+
+    # Split times of the ranked riders, a row per rider.
+    splits = np.frombuffer(split_times, dtype=split_times.typecode).reshape(
+        len(bibs), race.laps)[ranked]
+    done = np.array(laps_done, dtype=np.int64)[ranked]
+    mask = np.arange(race.laps) < done[:, None]
+    previous = np.empty_like(splits)
+    previous[:, 0] = start if start is not None else 0
+    previous[:, 1:] = splits[:, :-1]
+
+    rows = np.empty(len(ranking), dtype(laps, lap_stats))
+    rows['bib'] = [bib for bib, __ in ranking]
+    rows['category_id'] = category_id
+    rows['state'] = [_STATE_CODES[state] for __, state in ranking]
+    rows['position'] = np.arange(1, len(ranking) + 1)
+    rows['laps_done'] = done
+    last = splits[np.arange(len(ranked)), np.maximum(done - 1, 0)]
+    rows['total_time_ms'] = np.where(done > 0, last - previous[:, 0], 0)
+    rows['lap_times_ms'] = -1
+    rows['lap_times_ms'][:, :race.laps] = np.where(mask, splits - previous, -1)
+    if lap_stats:
+        rider_stats = stats.compute(race)
+        for name in stats.LapStats._fields:
+            missing = NO_GAP if name == 'gap' else -1
+            values = [getattr(rider_stats[bib], name) for bib, __ in ranking]
+            rows[name + '_ms'] = [missing if v is None else v for v in values]
+    return rows
@@ -1,15 +1,68 @@
 import argparse
+# Not `from concurrent.futures import ...`, which imports the process pool
+# and multiprocessing on start even for a single job.
+from concurrent import futures
+from functools import partial
+import importlib
 import sys
 import os
+import time
 
-from csv_writer import write as write_csv
-from html_writer import write as write_html
-from race import Race
-from reglist import Reglist
+import checkpoint
+import profiler
+from event import Event
+from reglist import cache as reglist_cache
+from render_cache import RenderCache
 import splitfile
 
 
-def _main(input_path, output_format, output_path):
+def _main(input_path, output_format, output_path, engine=splitfile.FAST,
+          follow=False, interval=0.1, jobs=1, checkpoint_interval=None,
+          lazy_reglist=False, profile_path=None, cprofile_path=None, merge_paths=(),
+          reorder_window=None, extra_outputs=(), concurrent_writers=False, lap_stats=False,
+          top=None, profile_memory=False):
+    """
+    :param extra_outputs: (output_format, output_path) tuples of more
+                          outputs written from the same results. The
+                          first output may then be None, None.
+    :param profile_memory: add peak memory to the profile, measured in a
+                           second pass or, in follow mode, by tracing
+                           the whole run.
+    """
+    outputs = list(extra_outputs)
+    if output_format is not None:
+        outputs.insert(0, (output_format, output_path))
+    executor = futures.ProcessPoolExecutor(jobs) if jobs > 1 else None
+    profile = None
+    if profile_path is not None:
+        # A run in follow mode does not end, so there is no separate
+        # memory pass after it.
+        profile = profiler.Profile(cprofile_path, trace_memory=follow and profile_memory)
+        profile.start()
+    try:
+        if not follow:
+            return _process(
+                input_path, outputs, engine, executor,
+                checkpoint_interval is not None, lazy_reglist, profile, merge_paths,
+                reorder_window, concurrent_writers, lap_stats, top, profile_memory)
+        try:
+            _follow(
+                input_path, outputs, engine, interval, executor,
+                checkpoint_interval, lazy_reglist, profile, profile_path, reorder_window,
+                concurrent_writers, lap_stats, top)
+        except KeyboardInterrupt:
+            return 0
+    finally:
+        if executor is not None:
+            executor.shutdown()
+        if profile is not None:
+            profile.stop()
+            profiler.write_report(profile_path, profile.report())
+
+
+def _process(input_path, outputs, engine, executor, use_checkpoint, lazy_reglist=False,
+             profile=None, merge_paths=(), reorder_window=None, concurrent_writers=False,
+             lap_stats=False, top=None, profile_memory=False):
     global _error_count
     _error_count = 0
 
@@ -20,107 +73,270 @@ def _main(input_path, output_format, output_path):
         global _error_count
         print('ERROR: Line {}. {}'.format(line_number, message))
         _error_count += 1
+        if profile is not None:
+            profile.count_error()
         if _error_count == 5:
             raise TooManyErrors()
 
     try:
-        races, reglist, banner_url = _results(input_path, on_error=on_error)
+        if profile is not None:
+            # The same parsing as below, only done before applying so
+            # that the phases are timed apart.
+            with profile.phase('parse'):
+                if use_checkpoint:
+                    event, tail, expressions = _open_event(
+                        input_path, on_error, engine, True, lazy_reglist)
+                else:
+                    event = Event(input_path, on_error, lazy_reglist)
+                    expressions = list(_expressions(
+                        input_path, engine, merge_paths, reorder_window, on_error, executor))
+            profile.apply(event, expressions)
+            races, reglist, banner_url = event.races, event.reglist, event.banner_url
+        elif use_checkpoint:
+            event, tail, expressions = _open_event(
+                input_path, on_error, engine, True, lazy_reglist)
+            for expression in expressions:
+                event.apply(expression)
+            races, reglist, banner_url = event.races, event.reglist, event.banner_url
+        else:
+            races, reglist, banner_url = _results(
+                input_path, on_error=on_error, engine=engine, lazy_reglist=lazy_reglist,
+                merge_paths=merge_paths, reorder_window=reorder_window, executor=executor)
     except TooManyErrors:
         return 2
 
     if _error_count > 0:
         return 2
 
+    if use_checkpoint:
+        checkpoint.save(input_path, event, tail)
+
     if reglist is None:
         return 0
 
-    writers = {
-        'csv': write_csv,
-        'html': write_html
-    }
-
-    writers[output_format](output_path, races, reglist, banner_url)
-
-
-def _results(input_path, on_error):
-    reglist = None
-    banner_url = None
-    races = {}
-    for expression in splitfile.open_split(input_path):
-        line_number, etype, *params = expression
-
-        if etype == splitfile.expression.SYNTAX_ERROR:
-            on_error(line_number, 'Syntax error.')
-        elif etype == splitfile.expression.REGLIST:
-            path = params[0]
-            if not os.path.isabs(path):
-                path = os.path.abspath(
-                    os.path.join(
-                        os.path.abspath(
-                            os.path.dirname(input_path)),
-                        path))
-            if reglist is None:
-                reglist = Reglist.open(path)
-            else:
-                on_error(line_number, 'Duplicate reglist statement.')
-        elif etype == splitfile.expression.BANNER:
-            if banner_url is None:
-                banner_url = params[0]
-            else:
-                on_error(line_number, 'Duplicate banner statement.')
-        elif etype == splitfile.expression.LAPS:
-            if reglist is None:
-                on_error(line_number, 'Reglist is not specified.')
-            else:
-                category_ids, laps = params
-                for id in category_ids:
-                    if id in races:
-                        on_error(line_number, 'Duplicate laps statement.')
-                    elif reglist.participants(id) is None:
-                        on_error(line_number, 'Category not found.')
-                    else:
-                        bibs = [p.bib for p in reglist.participants(id) if p.bib is not None]
-                        races[id] = Race(laps=laps, bibs=bibs)
-        elif etype == splitfile.expression.START:
-            if reglist is None:
-                on_error(line_number, 'Reglist is not specified.')
-            else:
-                category_ids, time_tuple = params
-                for id in category_ids:
-                    if id not in races:
-                        on_error(line_number, 'Category not found or laps are not specified.')
-                    elif races[id].started:
-                        on_error(line_number, 'Duplicate start statement.')
-                    else:
-                        races[id].start(time_tuple)
-        elif etype == splitfile.expression.DNF:
-            if reglist is None:
-                on_error(line_number, 'Reglist is not specified.')
-            else:
-                bibs = params[0]
-                for bib in bibs:
-                    participant = reglist.participant(bib)
-                    if not participant:
-                        on_error(line_number, 'Participant not found.')
-                    if participant.category_id not in races:
-                        on_error(line_number, 'Laps are not specified.')
-                    else:
-                        races[participant.category_id].dnf(participant.bib)
-        elif etype == splitfile.expression.SPLIT:
-            if reglist is None:
-                on_error(line_number, 'Reglist is not specified.')
-            else:
-                bibs, time_tuple = params
-                for bib in bibs:
-                    participant = reglist.participant(bib)
-                    if not participant:
-                        on_error(line_number, 'Participant not found.')
-                    elif participant.category_id not in races:
-                        on_error(line_number, 'Laps are not specified.')
-                    else:
-                        races[participant.category_id].split(participant.bib, time_tuple)
-
-    return races, reglist, banner_url
+    with profiler.phase(profile, 'render'):
+        _write(outputs, races, reglist, banner_url, executor=executor,
+               concurrent=concurrent_writers, lap_stats=lap_stats, top=top)
+
+    if profile is not None and profile_memory:
+        profile.measure_memory(partial(
+            _memory_pass, input_path, engine, lazy_reglist, merge_paths, reorder_window,
+            executor))
+
+
+def _memory_pass(input_path, engine, lazy_reglist, merge_paths, reorder_window, executor):
+    # The profiled pass has left its reglist loaded, which a run of its
+    # own would read from the cache directory or parse.
+    reglist_cache.forget()
+    # Errors have been reported by the profiled pass already.
+    _results(
+        input_path, lambda *args: None, engine, lazy_reglist, merge_paths, reorder_window,
+        executor)
+
+
+def _write(outputs, races, reglist, banner_url, caches=None, executor=None, concurrent=False,
+           replace=False, lap_stats=False, top=None):
+    """
+    Writes several outputs from the same results.
+
+    The results of every category are computed here once and kept by
+    its Race for all the writers. Categories are rendered in executor
+    only for a single output, as its worker processes would compute
+    the results again for every writer.
+
+    :param caches: a RenderCache per output.
+    :param concurrent: run the writers in threads at the same time.
+    :param replace: write to a temporary file first and replace the
+                    output with it, so readers never see a partial file.
+    :param lap_stats: add the lap statistics columns, see lap_stats.
+    :param top: write only this many first rows of every category.
+    """
+    if caches is None:
+        caches = [None] * len(outputs)
+    if len(outputs) > 1:
+        for race in races.values():
+            # Computed and cached by the race.
+            race.results if top is None else race.top(top)
+        executor = None
+
+    def write(output, cache):
+        output_format, output_path = output
+        path = output_path + '.tmp' if replace else output_path
+        _writer(output_format)(
+            path, races, reglist, banner_url, cache, executor, lap_stats=lap_stats, top=top)
+        if replace:
+            os.replace(path, output_path)
+
+    if concurrent and len(outputs) > 1:
+        with futures.ThreadPoolExecutor(len(outputs)) as writers:
+            # Re-raises the first error of a writer.
+            list(writers.map(write, outputs, caches))
+    else:
+        for output, cache in zip(outputs, caches):
+            write(output, cache)
+
+
+def _results(input_path, on_error, engine=splitfile.FAST, lazy_reglist=False, merge_paths=(),
+             reorder_window=None, executor=None):
+    event = Event(input_path, on_error, lazy_reglist)
+    expressions = _expressions(
+        input_path, engine, merge_paths, reorder_window, on_error, executor)
+    for expression in expressions:
+        event.apply(expression)
+    return event.races, event.reglist, event.banner_url
+
+
+def _expressions(input_path, engine, merge_paths, reorder_window=None, on_error=None,
+                 executor=None):
+    if merge_paths:
+        # Relative reglist paths stay relative to the first split file.
+        expressions = splitfile.merge([input_path] + list(merge_paths), engine=engine)
+    else:
+        expressions = splitfile.open_split(input_path, engine=engine, executor=executor)
+    if reorder_window is not None:
+        expressions = splitfile.reorder(
+            expressions, reorder_window, partial(_on_late_split, on_error))
+    return expressions
+
+
+def _on_late_split(on_error, expression):
+    on_error(expression[0], 'Split is out of order by more than the reorder window.')
+
+
+def _open_event(input_path, on_error, engine, use_checkpoint, lazy_reglist=False):
+    if use_checkpoint:
+        restored = checkpoint.load(input_path, on_error, engine)
+        if restored is not None:
+            event, tail = restored
+            try:
+                return event, tail, tail.read()
+            except splitfile.SplitFileRewritten:
+                print('INFO: The split file has changed since the checkpoint, '
+                      'replaying it from the start.')
+    event = Event(input_path, on_error, lazy_reglist)
+    tail = splitfile.SplitTail(input_path, engine=engine)
+    return event, tail, tail.read()
+
+
+def _follow(input_path, outputs, engine, interval, executor, checkpoint_interval,
+            lazy_reglist=False, profile=None, profile_path=None, reorder_window=None,
+            concurrent_writers=False, lap_stats=False, top=None):
+    while True:
+        errors = []
+
+        def on_error(line_number, message):
+            print('ERROR: Line {}. {}'.format(line_number, message))
+            errors.append(line_number)
+            if profile is not None:
+                profile.count_error()
+
+        with profiler.phase(profile, 'parse'):
+            event, tail, expressions = _open_event(
+                input_path, on_error, engine, checkpoint_interval is not None, lazy_reglist)
+        caches = [RenderCache() for __ in outputs]
+        changed = True
+        saved_at = time.monotonic()
+        unsaved = False
+        buffer = None
+        if reorder_window is not None:
+            buffer = splitfile.ReorderBuffer(reorder_window, partial(_on_late_split, on_error))
+            arrived_at = time.monotonic()
+        try:
+            while True:
+                if buffer is not None:
+                    if expressions:
+                        arrived_at = time.monotonic()
+                    expressions = buffer.push(expressions)
+                    if len(buffer) and time.monotonic() - arrived_at >= reorder_window:
+                        # Nothing has arrived for a while, so there is
+                        # nothing left to reorder the held splits with.
+                        expressions += buffer.flush()
+                if profile is None:
+                    for expression in expressions:
+                        try:
+                            changed = event.apply(expression) or changed
+                        except ValueError as e:
+                            # A race rule violation, e.g. splits out of order,
+                            # is a typo to fix in the file, not a reason to stop.
+                            on_error(expression[0], '{}.'.format(type(e).__name__))
+                else:
+                    changed = profile.apply(event, expressions, on_error) or changed
+                if changed and not errors and event.reglist is not None:
+                    with profiler.phase(profile, 'render'):
+                        _write(
+                            outputs, event.races, event.reglist, event.banner_url,
+                            caches, executor, concurrent_writers, replace=True,
+                            lap_stats=lap_stats, top=top)
+                    changed = False
+                    unsaved = True
+                    if profile is not None:
+                        profiler.write_report(profile_path, profile.report())
+                if (checkpoint_interval is not None and unsaved and not errors and
+                        time.monotonic() - saved_at >= checkpoint_interval):
+                    checkpoint.save(input_path, event, tail)
+                    saved_at = time.monotonic()
+                    unsaved = False
+                time.sleep(interval)
+                with profiler.phase(profile, 'parse'):
+                    expressions = tail.read()
+        except splitfile.SplitFileRewritten:
+            print('INFO: The split file was rewritten, replaying it from the start.')
+
+
+# Writer modules by output format. They are imported on first use, as
+# jinja2 and numpy take longer to import than a small event to process.
+_writers = {
+    'csv': 'csv_writer',
+    'html': 'html_writer',
+    'npy': 'npy_writer',
+}
+
+
+def _writer(output_format):
+    """
+    :returns: the write function of the output format.
+    """
+    return importlib.import_module(_writers[output_format]).write
+
+
+def _output(value):
+    """
+    Parses a FORMAT:PATH output argument.
+    """
+    output_format, __, output_path = value.partition(':')
+    if output_format not in _writers or not output_path:
+        raise argparse.ArgumentTypeError(
+            'expected FORMAT:PATH with FORMAT one of {}'.format(', '.join(sorted(_writers))))
+    return output_format, output_path
+
+
+def _add_input_arguments(args_parser):
+    """
+    Adds the options of reading split files and reglists, shared by the
+    tools that process events.
+    """
+    args_parser.add_argument(
+        '--parser',
+        choices=[splitfile.FAST, splitfile.PARSLEY],
+        default=splitfile.FAST,
+        help='split file parser; parsley is the slower reference grammar')
+    args_parser.add_argument(
+        '--lazy-reglist',
+        action='store_true',
+        help='index the reglist by bib and read participant details only for the output')
+
+
+def _positive_int(value):
+    """
+    Parses an argument which must be a whole number of 1 or more.
+    """
+    try:
+        number = int(value)
+    except ValueError:
+        number = 0
+    if number < 1:
+        raise argparse.ArgumentTypeError('expected a whole number of 1 or more')
+    return number
 
 
 if __name__ == '__main__':
@@ -128,16 +344,112 @@ if __name__ == '__main__':
         description="""
             Helps you time cycling or other kinds of sporting events.
             Process a *.split file and outputs an event results
-            in HTML or bikeportal's CSV formats.
+            in HTML or bikeportal's CSV formats, or as a NumPy array.
             """
         )
     args_parser.add_argument('path_to_split_file')
-    args_parser.add_argument('output_format', choices=['csv', 'html'])
-    args_parser.add_argument('path_to_output_file')
+    args_parser.add_argument('output_format', nargs='?', choices=sorted(_writers))
+    args_parser.add_argument('path_to_output_file', nargs='?')
+    args_parser.add_argument(
+        '-o', '--output',
+        action='append',
+        default=[],
+        type=_output,
+        metavar='FORMAT:PATH',
+        help='one more output from the same results, e.g. html:results.html, can be repeated')
+    args_parser.add_argument(
+        '--lap-stats',
+        action='store_true',
+        help='add best and average lap, lap consistency and gap to the leader columns')
+    args_parser.add_argument(
+        '--top',
+        type=_positive_int,
+        metavar='N',
+        help='write only the first N riders of every category, e.g. for a leaderboard screen')
+    args_parser.add_argument(
+        '--concurrent-writers',
+        action='store_true',
+        help='write several outputs at the same time in threads')
+    _add_input_arguments(args_parser)
+    args_parser.add_argument(
+        '--follow',
+        action='store_true',
+        help='keep watching the split file and update the output as lines are appended')
+    args_parser.add_argument(
+        '--interval',
+        type=float,
+        default=0.1,
+        help='how often to check the split file in follow mode, seconds')
+    args_parser.add_argument(
+        '--jobs',
+        type=int,
+        default=1,
+        help='number of worker processes parsing large split files in chunks and '
+             'computing and rendering categories')
+    args_parser.add_argument(
+        '--checkpoint',
+        action='store_true',
+        help='resume from and save the race state to <path_to_split_file>.checkpoint')
+    args_parser.add_argument(
+        '--checkpoint-interval',
+        type=float,
+        default=10,
+        help='how often to save the checkpoint in follow mode, seconds')
+    args_parser.add_argument(
+        '--profile',
+        metavar='REPORT_FILE',
+        help='write per-phase times and counters as JSON, "-" for stdout')
+    args_parser.add_argument(
+        '--profile-memory',
+        action='store_true',
+        help='with --profile, also report peak memory, measured in a second pass that '
+             'takes as long as the first or, with --follow, by tracing the whole run')
+    args_parser.add_argument(
+        '--cprofile',
+        metavar='STATS_FILE',
+        help='with --profile, also save cProfile statistics for pstats')
+    args_parser.add_argument(
+        '--merge',
+        action='append',
+        default=[],
+        metavar='PATH_TO_SPLIT_FILE',
+        help='merge splits of another timekeeper by time, can be repeated')
+    args_parser.add_argument(
+        '--reorder-window',
+        type=float,
+        metavar='SECONDS',
+        help='put splits typed out of order back in order within this much race time')
 
     args = args_parser.parse_args()
+    if (args.output_format is None) != (args.path_to_output_file is None):
+        args_parser.error('output_format and path_to_output_file go together')
+    if args.output_format is None and not args.output:
+        args_parser.error('an output is required, output_format path_to_output_file or -o')
+    if args.cprofile and not args.profile:
+        args_parser.error('--cprofile requires --profile')
+    if args.profile_memory and not args.profile:
+        args_parser.error('--profile-memory requires --profile')
+    if args.merge and (args.follow or args.checkpoint):
+        args_parser.error('--merge does not work with --follow or --checkpoint')
+    if args.reorder_window is not None and args.checkpoint:
+        args_parser.error('--reorder-window does not work with --checkpoint')
 
     sys.exit(_main(
         args.path_to_split_file,
         args.output_format,
-        args.path_to_output_file))
+        args.path_to_output_file,
+        engine=args.parser,
+        follow=args.follow,
+        interval=args.interval,
+        jobs=args.jobs,
+        checkpoint_interval=args.checkpoint_interval if args.checkpoint else None,
+        lazy_reglist=args.lazy_reglist,
+        profile_path=args.profile,
+        cprofile_path=args.cprofile,
+        merge_paths=args.merge,
+        reorder_window=args.reorder_window,
+        extra_outputs=args.output,
+        concurrent_writers=args.concurrent_writers,
+        lap_stats=args.lap_stats,
+        top=args.top,
+        profile_memory=args.profile_memory))
@@ -0,0 +1,190 @@
+import contextlib
+import cProfile
+import json
+import sys
+import time
+import tracemalloc
+
+import splitfile
+
+
+class Profile(object):
+    """
+    Collects wall and CPU times of the processing phases, expression
+    counters and peak memory for the --profile report.
+
+    Phases are parse, reglist, race and render. Time spent applying
+    reglist statements is reported as the reglist phase and the rest of
+    the expressions as the race phase.
+
+    Peak memory is traced with tracemalloc, which slows down the traced
+    code. So it is measured only on request, in a separate pass, see
+    measure_memory, or, if trace_memory is True, for the whole run, and
+    then the report says that its times include the tracing.
+    """
+
+    def __init__(self, cprofile_path=None, trace_memory=False):
+        self._cprofile_path = cprofile_path
+        self._cprofile = None
+        self._trace_memory = trace_memory
+        self._peak_memory = None
+        # Time of the memory pass, not a part of the profiled run.
+        self._excluded = (0.0, 0.0)
+        self._phases = {}
+        self._expressions = {}
+        self._split_calls = 0
+        self._errors = 0
+        self._started = None
+        self._stopped = None
+
+    def start(self):
+        if self._trace_memory:
+            tracemalloc.start()
+        if self._cprofile_path is not None:
+            self._cprofile = cProfile.Profile()
+            self._cprofile.enable()
+        self._started = (time.perf_counter(), time.process_time())
+
+    def stop(self):
+        if self._cprofile is not None:
+            self._cprofile.disable()
+            self._cprofile.dump_stats(self._cprofile_path)
+        self._stopped = self._now()
+        if self._trace_memory:
+            tracemalloc.stop()
+
+    def measure_memory(self, fn):
+        """
+        Calls fn with tracemalloc on, recording its peak memory. Its time
+        is excluded from the total and from every phase.
+        """
+        if self._trace_memory:
+            raise ValueError('Memory is already traced for the whole run.')
+        wall, cpu = time.perf_counter(), time.process_time()
+        if self._cprofile is not None:
+            self._cprofile.disable()
+        tracemalloc.start()
+        try:
+            fn()
+            self._peak_memory = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+            if self._cprofile is not None:
+                self._cprofile.enable()
+            excluded_wall, excluded_cpu = self._excluded
+            self._excluded = (
+                excluded_wall + time.perf_counter() - wall,
+                excluded_cpu + time.process_time() - cpu)
+
+    def count_error(self):
+        self._errors += 1
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            self._add(name, time.perf_counter() - wall, time.process_time() - cpu)
+
+    def apply(self, event, expressions, on_error=None):
+        """
+        Applies expressions to an event like Event.apply does, timing
+        every expression type.
+
+        :param on_error: if given, race rule violations are reported to it
+                         instead of raised, as in follow mode.
+        :returns: True if any of the expressions changed the event state.
+        """
+        split_calls = event.split_calls
+        changed = False
+        reglist_wall = reglist_cpu = 0.0
+        counters = self._expressions
+        try:
+            with self.phase('race'):
+                for expression in expressions:
+                    etype = expression[1]
+                    counter = counters.setdefault(etype, [0, 0.0])
+                    counter[0] += 1
+                    wall, cpu = time.perf_counter(), time.process_time()
+                    try:
+                        changed = event.apply(expression) or changed
+                    except ValueError as e:
+                        if on_error is None:
+                            raise
+                        on_error(expression[0], '{}.'.format(type(e).__name__))
+                    finally:
+                        wall = time.perf_counter() - wall
+                        cpu = time.process_time() - cpu
+                        counter[1] += wall
+                        if etype == splitfile.expression.REGLIST:
+                            reglist_wall += wall
+                            reglist_cpu += cpu
+        finally:
+            self._add('reglist', reglist_wall, reglist_cpu)
+            self._add('race', -reglist_wall, -reglist_cpu)
+            self._split_calls += event.split_calls - split_calls
+        return changed
+
+    def report(self):
+        """
+        :returns: a JSON serializable dict, so far if it is not stopped yet.
+        """
+        now_wall, now_cpu, peak_memory = self._stopped or self._now()
+        excluded_wall, excluded_cpu = self._excluded
+        lines = sum(count for count, __ in self._expressions.values())
+        processing = sum(
+            self._phases.get(name, (0.0, 0.0))[0] for name in ('parse', 'reglist', 'race'))
+        return {
+            'phases': {
+                name: {'wall_s': wall, 'cpu_s': cpu}
+                for name, (wall, cpu) in self._phases.items()},
+            'total': {
+                'wall_s': now_wall - self._started[0] - excluded_wall,
+                'cpu_s': now_cpu - self._started[1] - excluded_cpu},
+            'lines': lines,
+            'lines_per_s': lines / processing if processing else None,
+            'expressions': {
+                etype: {
+                    'count': count,
+                    'wall_s': wall,
+                    'per_s': count / wall if wall else None}
+                for etype, (count, wall) in self._expressions.items()},
+            'errors': self._errors,
+            'race_split_calls': self._split_calls,
+            'peak_memory_bytes': peak_memory,
+            'times_include_tracemalloc': self._trace_memory,
+        }
+
+    def _now(self):
+        if self._trace_memory:
+            peak_memory = tracemalloc.get_traced_memory()[1]
+        else:
+            peak_memory = self._peak_memory
+        return time.perf_counter(), time.process_time(), peak_memory
+
+    def _add(self, name, wall, cpu):
+        total_wall, total_cpu = self._phases.get(name, (0.0, 0.0))
+        self._phases[name] = (total_wall + wall, total_cpu + cpu)
+
+
+def phase(profile, name):
+    """
+    Profile.phase or a no-op context if profiling is off.
+    """
+    if profile is None:
+        return contextlib.nullcontext()
+    return profile.phase(name)
+
+
+def write_report(path, report):
+    """
+    Writes a report as JSON, to stdout if path is '-'.
+    """
+    if path == '-':
+        json.dump(report, sys.stdout, indent=2)
+        sys.stdout.write('\n')
+    else:
+        with open(path, mode='wt', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+            f.write('\n')
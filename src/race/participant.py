@@ -1,17 +1,19 @@
 class Participant(object):
-    def __init__(self, bib, splits, state):
+    # Split times are not kept here. Race stores them for all participants
+    # in one array, `laps` slots per participant starting at `index * laps`.
+    __slots__ = ('_bib', '_state', 'index', 'laps_done', 'standing_key')
+
+    def __init__(self, bib, state, index):
         self._bib = bib
-        self._splits = splits
         self._state = state
+        self.index = index
+        self.laps_done = 0
+        self.standing_key = None
 
     @property
     def bib(self):
         return self._bib
 
-    @property
-    def splits(self):
-        return self._splits
-
     @property
     def state(self):
         return self._state
@@ -1,3 +1,6 @@
+from array import array
+from bisect import bisect_left, insort
+
 from .errors import (
     RaceHasNotStartedYet,
     BibIsNotRegistered,
@@ -10,8 +13,8 @@ from .participant import Participant
 from .participant_state import ParticipantState
 from .result_row import ResultRow
 from .time_str import (
-    time_str_to_datetime,
-    timedelta_to_time_str
+    time_str_to_ms,
+    ms_to_time_str
 )
 
 
@@ -21,33 +24,58 @@ class Race(object):
             raise InvalidNumberOfLaps()
 
         self._laps = laps
-        self._start_time_dt = None
+        self._start_time = None
         self._start_time_str = None
         self._leader_finished = False
-        self._leader_finish_time_dt = None
-        self._last_split_time_dt = None
+        self._leader_finish_time = None
+        self._last_split_time = None
+        self._version = 0
 
+        # Standings are kept sorted by _standing_key. The index of a
+        # participant breaks ties the same way a stable sort of
+        # self._participants would.
         self._participants = {}
-        for bib in set(bibs):
+        for index, bib in enumerate(set(bibs)):
             self._participants[bib] = Participant(
                 bib=bib,
-                splits=[],
                 state=ParticipantState.WARMING_UP,
+                index=index,
             )
+        # Split times in milliseconds since midnight, see Participant.
+        self._split_times = array('l', [0]) * (len(self._participants) * laps)
+
+        self._standings = []
+        self._rows = {}
+        self._results = None
+        self._riders_on_course = 0
+        self._rebuild_standings()
 
-        self._participants
-        self._splits = []
+    def __getstate__(self):
+        # Cached rows are cheaper to rebuild than to send to a worker process.
+        state = self.__dict__.copy()
+        state['_rows'] = {}
+        state['_results'] = None
+        return state
 
     @property
     def laps(self):
         return self._laps
 
+    @property
+    def version(self):
+        """Changes every time the race state changes."""
+        return self._version
+
     def start(self, start_time_str):
-        self._start_time_dt = time_str_to_datetime(start_time_str)
+        self._start_time = time_str_to_ms(start_time_str)
         self._start_time_str = start_time_str
-        self._last_split_time_dt = self._start_time_dt
+        self._last_split_time = self._start_time
         for participant in self._participants.values():
             participant.state = ParticipantState.RACING
+        self._riders_on_course = len(self._participants)
+        self._rows.clear()
+        self._rebuild_standings()
+        self._version += 1
 
     @property
     def start_time(self):
@@ -56,40 +84,70 @@ class Race(object):
 
     @property
     def started(self):
-        return self._start_time_dt is not None
+        return self._start_time is not None
+
+    @property
+    def split_count(self):
+        """
+        The number of splits recorded so far.
+        """
+        return sum(p.laps_done for p in self._participants.values())
+
+    def split_table(self):
+        """
+        The raw split times of all participants for bulk statistics.
+
+        :returns: (start time, bibs, laps done, split times). Times are in
+                  milliseconds since midnight. Split times is a flat array
+                  of len(bibs) * laps items, the splits of the i-th bib
+                  are the first laps done items from i * laps on. It is
+                  the state of the race, not a copy, and must not change.
+        """
+        participants = self._participants.values()
+        return (
+            self._start_time,
+            [p.bib for p in participants],
+            [p.laps_done for p in participants],
+            self._split_times)
 
     def split(self, bib, split_time_str):
         self._ensure_started()
         self._ensure_registered(bib)
 
-        split_time_dt = time_str_to_datetime(split_time_str)
+        split_time = time_str_to_ms(split_time_str)
 
-        if split_time_dt < self._start_time_dt:
+        if split_time < self._start_time:
             raise SplitTimeIsEarlierThanStartTime()
 
-        self._ensure_in_order(split_time_dt)
-        self._last_split_time_dt = split_time_dt
+        self._ensure_in_order(split_time)
+        self._last_split_time = split_time
 
         participant = self._participants[bib]
 
         self._ensure_racing(participant)
 
-        participant.splits.append(split_time_dt)
+        self._split_times[participant.index * self._laps + participant.laps_done] = split_time
+        participant.laps_done += 1
 
-        last_split = participant.splits[-1]
-        if len(participant.splits) == self._laps:
+        last_split = split_time
+        if participant.laps_done == self._laps:
             participant.state = ParticipantState.FINISHED
             if not self._leader_finished:
                 self._leader_finished = True
-                self._leader_finish_time_dt = last_split
-            elif last_split < self._leader_finish_time_dt:
-                self._leader_finish_time_dt = last_split
+                self._leader_finish_time = last_split
+            elif last_split < self._leader_finish_time:
+                self._leader_finish_time = last_split
         elif (self._leader_finished and
-              last_split >= self._leader_finish_time_dt):
+              last_split >= self._leader_finish_time):
             participant.state = ParticipantState.FINISHED
 
+        if participant.state != ParticipantState.RACING:
+            self._riders_on_course -= 1
+        self._update_standing(participant)
+        self._version += 1
+
     def _ensure_started(self):
-        if not self._start_time_dt:
+        if self._start_time is None:
             raise RaceHasNotStartedYet()
 
     def _ensure_registered(self, bib):
@@ -100,8 +158,8 @@ class Race(object):
         if participant.state != ParticipantState.RACING:
             raise BibHasAlreadyFinished()
 
-    def _ensure_in_order(self, split_time_dt):
-        if split_time_dt < self._last_split_time_dt:
+    def _ensure_in_order(self, split_time):
+        if split_time < self._last_split_time:
             raise SplitsAreOutOfOrder()
 
     def dnf(self, bib):
@@ -110,23 +168,93 @@ class Race(object):
         participant = self._participants[bib]
         self._ensure_racing(participant)
         participant.state = ParticipantState.DNF
+        self._riders_on_course -= 1
+        self._update_standing(participant)
+        self._version += 1
 
     @property
     def results(self):
-        participants = list(self._participants.values())
-        participants.sort(key=self._race_rules)
+        if self._results is None:
+            self._results = self._rows_at(0, len(self._standings))
+        return list(self._results)
+
+    def top(self, n):
+        """
+        :returns: the first n rows of the results, building only them.
+        """
+        if n < 0:
+            raise ValueError('The number of rows must not be negative.')
+        return self._rows_at(0, n)
+
+    def page(self, offset, limit):
+        """
+        :returns: at most limit rows of the results starting from the
+                  offset one, building only them.
+        """
+        if offset < 0 or limit < 0:
+            raise ValueError('Offset and limit must not be negative.')
+        return self._rows_at(offset, offset + limit)
+
+    def ranking(self, n=None):
+        """
+        The order of the results without building their rows, for the
+        writers which take the times from split_table.
+
+        :param n: the number of first results, all if None.
+        :returns: a list of (bib, state) in the order of the results.
+        """
+        if n is not None and n < 0:
+            raise ValueError('The number of results must not be negative.')
+        return [
+            (key[-1], self._participants[key[-1]].state)
+            for key in self._standings[:n]]
+
+    def position_of(self, bib):
+        self._ensure_registered(bib)
+        key = self._participants[bib].standing_key
+        return bisect_left(self._standings, key) + 1
+
+    def _rows_at(self, start, stop):
         return [
-            self._result_item(position + 1, participant)
-            for position, participant in enumerate(participants)]
+            self._row(position + 1, key[-1])
+            for position, key in enumerate(self._standings[start:stop], start)]
+
+    def _row(self, position, bib):
+        row = self._rows.get(bib)
+        if row is None:
+            row = self._result_item(position, self._participants[bib])
+            self._rows[bib] = row
+        elif row.position != position:
+            row = row._replace(position=position)
+            self._rows[bib] = row
+        return row
+
+    def _rebuild_standings(self):
+        for participant in self._participants.values():
+            participant.standing_key = self._standing_key(participant)
+        self._standings = sorted(
+            participant.standing_key
+            for participant in self._participants.values())
+        self._results = None
+
+    def _update_standing(self, participant):
+        del self._standings[bisect_left(self._standings, participant.standing_key)]
+        participant.standing_key = self._standing_key(participant)
+        insort(self._standings, participant.standing_key)
+        self._rows.pop(participant.bib, None)
+        self._results = None
+
+    def _standing_key(self, participant):
+        return self._race_rules(participant) + (participant.index, participant.bib)
 
     def _race_rules(self, participant):
         priority = self._priority_by_state[participant.state]
-        laps = len(participant.splits)
+        laps = participant.laps_done
         laps_left = self._laps - laps
         if laps == 0:
-            last_split = self._start_time_dt
+            last_split = self._start_time
         else:
-            last_split = participant.splits[-1]
+            last_split = self._split_times[participant.index * self._laps + laps - 1]
 
         return priority, laps_left, last_split
 
@@ -138,12 +266,11 @@ class Race(object):
     }
 
     def _result_item(self, position, participant):
-        splits = participant.splits
+        splits = self._splits(participant)
         laps_done = len(splits)
-        lap_times = list(map(timedelta_to_time_str, self._lap_times(splits)))
+        lap_times = list(map(ms_to_time_str, self._lap_times(splits)))
         if len(splits):
-            total_time = timedelta_to_time_str(
-                splits[-1] - self._start_time_dt)
+            total_time = ms_to_time_str(splits[-1] - self._start_time)
         else:
             total_time = '00:00:00'
         return ResultRow(
@@ -155,17 +282,18 @@ class Race(object):
             total_time=total_time
         )
 
+    def _splits(self, participant):
+        first = participant.index * self._laps
+        return self._split_times[first:first + participant.laps_done]
+
     def _lap_times(self, splits):
         laps = []
-        prev_time_dt = self._start_time_dt
-        for split_dt in splits:
-            laps.append(split_dt - prev_time_dt)
-            prev_time_dt = split_dt
+        prev_time = self._start_time
+        for split_time in splits:
+            laps.append(split_time - prev_time)
+            prev_time = split_time
         return laps
 
     @property
     def riders_on_course(self):
-        return sum((
-            1
-            for participant in self._participants.values()
-            if participant.state == ParticipantState.RACING))
+        return self._riders_on_course
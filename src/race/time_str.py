@@ -1,19 +1,54 @@
-from datetime import datetime
+from functools import lru_cache
+import re
 
 from .errors import MalformedTimeString
 
+_TIME = re.compile('([0-9]{1,2}):([0-9]{1,2}):([0-9]{1,2})(?:\\.([0-9]{1,3}))?')
 
-def time_str_to_datetime(time_str):
-    try:
-        return datetime.strptime(time_str, '%H:%M:%S')
-    except ValueError:
+
+def time_str_to_ms(time_str):
+    """
+    Converts a time of a day to milliseconds since midnight.
+
+    Accepts the hh:mm:ss format with an optional fraction of a second
+    of up to three digits, e.g. a photo-finish time 12:00:00.25.
+
+    >>> time_str_to_ms('01:02:03')
+    3723000
+    >>> time_str_to_ms('01:02:03.25')
+    3723250
+    """
+    m = _TIME.fullmatch(time_str)
+    if m is None:
         raise MalformedTimeString()
+    hours, minutes, seconds, fraction = m.groups()
+    hours, minutes, seconds = int(hours), int(minutes), int(seconds)
+    if hours > 23 or minutes > 59 or seconds > 59:
+        raise MalformedTimeString()
+    ms = ((hours * 60 + minutes) * 60 + seconds) * 1000
+    if fraction:
+        ms += int(fraction.ljust(3, '0'))
+    return ms
+
 
+@lru_cache(maxsize=65536)
+def ms_to_time_str(ms):
+    """
+    Formats a duration in milliseconds as hh:mm:ss, adding milliseconds
+    only if the duration has them.
 
-def timedelta_to_time_str(td):
-    if td.days < 0:
-        raise NotImplemented('Negative timedelta values are not supported.')
-    return '{:02}:{:02}:{:02}'.format(
-        td.days * 24 + td.seconds // 3600,
-        (td.seconds % 3600) // 60,
-        (td.seconds % 3600) % 60)
+    >>> ms_to_time_str(3723000)
+    '01:02:03'
+    >>> ms_to_time_str(3723250)
+    '01:02:03.250'
+    """
+    if ms < 0:
+        raise NotImplementedError('Negative durations are not supported.')
+    seconds, fraction = divmod(ms, 1000)
+    time_str = '{:02}:{:02}:{:02}'.format(
+        seconds // 3600,
+        (seconds % 3600) // 60,
+        seconds % 60)
+    if fraction:
+        time_str += '.{:03}'.format(fraction)
+    return time_str
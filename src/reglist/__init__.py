@@ -1,4 +1,5 @@
 from .reglist import Reglist
+from .lazy import LazyReglist, ReglistFileChanged
 from .participant import Participant
 
-__all__ = ['Reglist', 'Participant']
+__all__ = ['Reglist', 'LazyReglist', 'ReglistFileChanged', 'Participant']
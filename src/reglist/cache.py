@@ -0,0 +1,188 @@
+import hashlib
+import json
+import os
+import stat as st
+import tempfile
+import time
+
+# Stands for default_dir(), resolved when a reglist is opened.
+DEFAULT_DIR = object()
+
+# Bounds of the directory, pruned on every save. Least recently used
+# entries go first.
+_MAX_ENTRIES = 100
+_MAX_AGE_SECONDS = 30 * 24 * 3600
+
+# Bump whenever the layout of an entry changes.
+_FORMAT = 3
+
+# Reglists already loaded by this process, by (absolute path, cache_dir).
+# Lets a batch of events sharing a reglist skip even reading the entry.
+_loaded = {}
+
+
+def default_dir():
+    """
+    :returns: the per-user cache directory. A fixed one in the shared
+              temporary directory could be created, and filled with
+              entries, by any other local user.
+    """
+    return os.path.join(
+        os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache'),
+        'petro',
+        'reglist')
+
+
+def forget():
+    """
+    Drops the reglists loaded by this process, so that the next load
+    reads its entry again.
+    """
+    _loaded.clear()
+
+
+def load(file_path, cache_dir):
+    """
+    :returns: the cached Reglist of a file or None if there is no cache
+              entry or the file has changed since it was cached, or if
+              cache_dir is None.
+    """
+    if cache_dir is None:
+        return None
+    try:
+        stat = os.stat(file_path)
+        entry = _loaded.get(_key(file_path, cache_dir))
+        if entry is not None and _unchanged(entry, stat):
+            return entry['reglist']
+        _check_dir(cache_dir)
+        entry_path = _entry_path(file_path, cache_dir)
+        with open(entry_path, mode='rt', encoding='utf-8') as f:
+            entry = json.load(f)
+        if entry['format'] != _FORMAT:
+            return None
+        if entry['size'] != stat.st_size:
+            return None
+        if entry['mtime_ns'] != stat.st_mtime_ns:
+            # Touched or copied, but maybe not changed.
+            if entry['hash'] != _file_hash(file_path):
+                return None
+            entry['mtime_ns'] = stat.st_mtime_ns
+            _write(file_path, cache_dir, entry)
+        else:
+            # Marks the entry as recently used for _prune.
+            os.utime(entry_path)
+        entry['reglist'] = _reglist(entry)
+        _loaded[_key(file_path, cache_dir)] = entry
+        return entry['reglist']
+    except Exception:
+        # No entry, a damaged one or one of an older petro version.
+        return None
+
+
+def save(file_path, cache_dir, reglist, stat):
+    """
+    :param stat: os.stat() of the file taken before it was parsed. Nothing
+                 is saved if the file has changed since then, or if
+                 cache_dir is None.
+    """
+    if cache_dir is None:
+        return
+    entry = {
+        'format': _FORMAT,
+        'size': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns,
+        'hash': _file_hash(file_path),
+        'categories': [list(category) for category in reglist.categories],
+        'participants': [
+            list(p)
+            for category_id, __ in reglist.categories
+            for p in reglist.participants(category_id)],
+    }
+    current = os.stat(file_path)
+    if (current.st_size, current.st_mtime_ns) != (stat.st_size, stat.st_mtime_ns):
+        return
+    try:
+        _write(file_path, cache_dir, entry)
+        _prune(cache_dir)
+    except OSError:
+        # The cache is an optimization, a read-only disk should not stop us.
+        pass
+    entry['reglist'] = reglist
+    _loaded[_key(file_path, cache_dir)] = entry
+
+
+def _key(file_path, cache_dir):
+    return os.path.abspath(file_path), os.path.abspath(cache_dir)
+
+
+def _reglist(entry):
+    # Imported here as reglist imports this module.
+    from .participant import Participant
+    from .reglist import Reglist
+    return Reglist(
+        [tuple(category) for category in entry['categories']],
+        [Participant(*fields) for fields in entry['participants']])
+
+
+def _unchanged(entry, stat):
+    return entry['size'] == stat.st_size and entry['mtime_ns'] == stat.st_mtime_ns
+
+
+def _write(file_path, cache_dir, entry):
+    os.makedirs(cache_dir, mode=0o700, exist_ok=True)
+    _check_dir(cache_dir)
+    fd, tmp_path = tempfile.mkstemp(dir=cache_dir)
+    try:
+        with os.fdopen(fd, mode='wt', encoding='utf-8') as f:
+            json.dump(
+                {key: value for key, value in entry.items() if key != 'reglist'}, f,
+                ensure_ascii=False)
+        os.replace(tmp_path, _entry_path(file_path, cache_dir))
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+
+def _prune(cache_dir):
+    """
+    Removes the entries unused for _MAX_AGE_SECONDS and the least recently
+    used ones above _MAX_ENTRIES.
+    """
+    entries = []
+    for entry in os.scandir(cache_dir):
+        if entry.name.endswith('.json') and entry.is_file(follow_symlinks=False):
+            entries.append((entry.stat(follow_symlinks=False).st_mtime, entry.path))
+    entries.sort(reverse=True)
+    oldest = time.time() - _MAX_AGE_SECONDS
+    for i, (mtime, path) in enumerate(entries):
+        if i >= _MAX_ENTRIES or mtime < oldest:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                # Pruned by another petro process.
+                pass
+
+
+def _entry_path(file_path, cache_dir):
+    key = hashlib.sha256(os.path.abspath(file_path).encode('utf-8')).hexdigest()
+    return os.path.join(cache_dir, key + '.json')
+
+
+def _check_dir(cache_dir):
+    """
+    Raises OSError unless cache_dir is a directory, not a symbolic link,
+    of the current user that no one else can access, as the same checks
+    of jinja2.FileSystemBytecodeCache.
+    """
+    stat = os.lstat(cache_dir)
+    if not st.S_ISDIR(stat.st_mode):
+        raise OSError('{} is not a directory.'.format(cache_dir))
+    if hasattr(os, 'getuid') and stat.st_uid != os.getuid():
+        raise OSError('{} is owned by another user.'.format(cache_dir))
+    if st.S_IMODE(stat.st_mode) & 0o077:
+        raise OSError('{} is accessible by other users.'.format(cache_dir))
+
+
+def _file_hash(file_path):
+    with open(file_path, mode='rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
@@ -0,0 +1,180 @@
+from array import array
+import csv
+import io
+import os
+import threading
+
+from .participant import Participant, rfid_tags
+
+
+class ReglistFileChanged(Exception):
+    pass
+
+
+class LazyReglist(object):
+    """
+    A Reglist which keeps only the bib and category indexes in memory.
+
+    The first pass over the file records the byte offset of every row,
+    the participant records are decoded from the file when they are
+    asked for. The file must not change while the reglist is in use.
+
+    The file stays open until close(), lookups only seek in it.
+    """
+
+    def __init__(self, file_path):
+        self._file_path = file_path
+        self._names = {}
+        self._spans = {}
+        self._bibs = {}
+        self._rfids = {}
+        self._category_bibs = {}
+        self._offsets = array('q')
+        self._category_ids = array('l')
+        self._file = None
+        self._lock = threading.Lock()
+        stat = os.stat(file_path)
+        self._stat = (stat.st_size, stat.st_mtime_ns)
+        self._index()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_file'] = None
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def __del__(self):
+        self.close()
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    @property
+    def categories(self):
+        for cid, cname in self._names.items():
+            yield (cid, cname)
+
+    def participants(self, category_id):
+        if category_id not in self._spans:
+            return None
+        start, stop = self._spans[category_id]
+        with self._lock:
+            f = self._opened()
+            f.seek(start)
+            data = f.read(stop - start)
+        ps = [
+            _participant(category_id, row)
+            for row in _csv_reader(io.StringIO(data.decode('cp1251'), newline=None)) if row]
+        return (p for p in ps)
+
+    def participant(self, bib):
+        if bib not in self._bibs:
+            return None
+        i = self._bibs[bib]
+        with self._lock:
+            f = self._opened()
+            f.seek(self._offsets[i])
+            # The reader takes only the lines of the row, several if a
+            # quoted field has newlines.
+            row = next(_csv_reader(_text_lines(f)))
+        return _participant(self._category_ids[i], row)
+
+    def bibs(self, category_id):
+        if category_id in self._category_bibs:
+            return iter(self._category_bibs[category_id])
+        else:
+            return None
+
+    def category_of(self, bib):
+        if bib in self._bibs:
+            return self._category_ids[self._bibs[bib]]
+        else:
+            return None
+
+    def bib_of_rfid(self, tag):
+        return self._rfids.get(tag.upper())
+
+    def _index(self):
+        category_id = None
+        start = None
+        with self._lock:
+            f = self._opened()
+            for offset, end, row in _indexed_rows(f):
+                if not row:
+                    continue
+                if row[0] != '' and row[1] == '':
+                    if category_id is not None:
+                        self._spans[category_id] = (start, offset)
+                    category_id = category_id + 1 if category_id else 1
+                    self._names[category_id] = row[0]
+                    self._category_bibs[category_id] = array('l')
+                    start = end
+                elif category_id is not None and row[0] != '':
+                    bib = int(row[0])
+                    self._bibs[bib] = len(self._offsets)
+                    self._offsets.append(offset)
+                    self._category_ids.append(category_id)
+                    self._category_bibs[category_id].append(bib)
+                    if len(row) > 8:
+                        for tag in rfid_tags(row[8]):
+                            self._rfids[tag] = bib
+            if category_id is not None:
+                self._spans[category_id] = (start, f.tell())
+
+    def _opened(self):
+        """
+        :returns: the open file, opened again after unpickling.
+        """
+        if self._file is None:
+            self._file = open(self._file_path, mode='rb')
+        stat = os.fstat(self._file.fileno())
+        if (stat.st_size, stat.st_mtime_ns) != self._stat:
+            raise ReglistFileChanged(self._file_path)
+        return self._file
+
+
+def _indexed_rows(f):
+    """
+    Yields (start offset, end offset, row) for every row of a binary file.
+    """
+    position = [f.tell()]
+
+    def lines():
+        for line in f:
+            position[0] += len(line)
+            yield line.decode('cp1251')
+
+    start = position[0]
+    for row in csv.reader(lines(), delimiter=';', lineterminator='\r\n', strict=True):
+        yield start, position[0], row
+        start = position[0]
+
+
+def _text_lines(f):
+    # The universal newlines of the text mode the eager Reglist reads in.
+    for line in iter(f.readline, b''):
+        yield line.decode('cp1251').replace('\r\n', '\n').replace('\r', '\n')
+
+
+def _csv_reader(text):
+    return csv.reader(text, delimiter=';', lineterminator='\r\n', strict=True)
+
+
+def _participant(category_id, row):
+    # Номер;Имя;Ник;Команда;Откуда;Возраст;Велосипед;Ком;rfid;*
+    bib, name, nickname, team, city, age, *rest = row
+    return Participant(
+        bib=int(bib) if len(bib) else None,
+        category_id=category_id,
+        name=name,
+        nickname=nickname,
+        team=team,
+        city=city,
+        age=age,
+        rfid=rest[2] if len(rest) > 2 else '')
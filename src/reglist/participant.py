@@ -1,4 +1,5 @@
 from collections import namedtuple
+import re
 
 Participant = namedtuple('Participant', [
       'bib',
@@ -8,4 +9,19 @@ Participant = namedtuple('Participant', [
       'team',
       'city',
       'age',
-    ])
+      'rfid',
+    ], defaults=[''])
+
+_RFID_SEPARATORS = re.compile('[\\s,]+')
+
+
+def rfid_tags(rfid):
+    """
+    Splits the rfid column into tags, a rider may carry several of them.
+
+    >>> rfid_tags(' e2801160, E2801161 ')
+    ['E2801160', 'E2801161']
+    >>> rfid_tags('')
+    []
+    """
+    return [tag.upper() for tag in _RFID_SEPARATORS.split(rfid) if tag]
@@ -1,11 +1,15 @@
 import csv
+import os
 
-from .participant import Participant
+from . import cache
+from .lazy import LazyReglist
+from .participant import Participant, rfid_tags
 
 
 class Reglist:
     def __init__(self, categories, participants):
         self._bibs = {}
+        self._rfids = {}
         self._categories = {}
         for cid, cname in categories:
             self._categories[cid] = (cname, [])
@@ -15,6 +19,8 @@ class Reglist:
             ps.append(p)
             if p.bib is not None:
                 self._bibs[p.bib] = p
+                for tag in rfid_tags(p.rfid):
+                    self._rfids[tag] = p.bib
 
     @property
     def categories(self):
@@ -35,8 +41,58 @@ class Reglist:
         else:
             return None
 
+    def bibs(self, category_id):
+        if category_id in self._categories:
+            __, ps = self._categories[category_id]
+            return (p.bib for p in ps if p.bib is not None)
+        else:
+            return None
+
+    def category_of(self, bib):
+        if bib in self._bibs:
+            return self._bibs[bib].category_id
+        else:
+            return None
+
+    def bib_of_rfid(self, tag):
+        """
+        :param tag: an RFID tag as in the rfid column, in any letter case.
+        :returns: the bib of the participant carrying the tag, None if the
+                  tag is not registered.
+        """
+        return self._rfids.get(tag.upper())
+
+    @staticmethod
+    def open(file_path, cache_dir=cache.DEFAULT_DIR, lazy=False):
+        """
+        Reads a bikeportal reglist file.
+
+        Parsed files are cached in cache_dir, cache.default_dir() by
+        default, and reused while the file size, modification time or
+        content hash stay the same. Pass None to disable the cache.
+
+        If lazy is True, only the bib and category indexes are read and
+        participant records are decoded from the file on demand, see
+        LazyReglist. The cache is not used then.
+        """
+        if lazy:
+            return LazyReglist(file_path)
+
+        if cache_dir is cache.DEFAULT_DIR:
+            cache_dir = cache.default_dir()
+        if cache_dir is not None:
+            reglist = cache.load(file_path, cache_dir)
+            if reglist is not None:
+                return reglist
+            stat = os.stat(file_path)
+
+        reglist = Reglist._parse(file_path)
+        if cache_dir is not None:
+            cache.save(file_path, cache_dir, reglist, stat)
+        return reglist
+
     @staticmethod
-    def open(file_path):
+    def _parse(file_path):
         participants = []
         categories = []
         category_id = None
@@ -48,8 +104,8 @@ class Reglist:
                 category_id = category_id + 1 if category_id else 1
                 categories.append((category_id, category_name))
             elif category_id is not None:
-                # Номер;Имя;Ник;Команда;Откуда;Возраст;*
-                bib, name, nickname, team, city, age, *_ = row
+                # Номер;Имя;Ник;Команда;Откуда;Возраст;Велосипед;Ком;rfid;*
+                bib, name, nickname, team, city, age, *rest = row
                 p = Participant(
                     bib=int(bib) if len(bib) else None,
                     category_id=category_id,
@@ -57,7 +113,8 @@ class Reglist:
                     nickname=nickname,
                     team=team,
                     city=city,
-                    age=age)
+                    age=age,
+                    rfid=rest[2] if len(rest) > 2 else '')
                 participants.append(p)
         return Reglist(categories, participants)
 
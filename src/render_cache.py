@@ -0,0 +1,49 @@
+class RenderCache(object):
+    """
+    Keeps the rendered output of every category until its race changes.
+
+    A fragment is reused while it was rendered for the same Race object
+    at the same Race.version and with the same extra key, e.g. the
+    reglist and the category name.
+    """
+
+    def __init__(self):
+        self._entries = {}
+
+    def fragments(self, render, sections, executor=None):
+        """
+        Returns the fragments of several categories, rendering only the
+        stale ones.
+
+        :param render: a function rendering one fragment. It has to be a
+                       module level function if an executor is given.
+        :param sections: an iterable of (category_id, race, key, make_args)
+                         tuples, where make_args() returns the arguments of
+                         render. It is only called for stale fragments.
+        :param executor: an optional concurrent.futures executor to render
+                         the stale fragments in parallel.
+        :returns: a list of fragments in the order of sections.
+        """
+        fragments = []
+        stale = []
+        for category_id, race, key, make_args in sections:
+            entry = self._entries.get(category_id)
+            if entry is not None:
+                cached_race, version, cached_key, fragment = entry
+                if cached_race is race and version == race.version and cached_key == key:
+                    fragments.append(fragment)
+                    continue
+            stale.append((len(fragments), category_id, race, key, make_args()))
+            fragments.append(None)
+
+        if stale:
+            args = [s[-1] for s in stale]
+            if executor is None:
+                rendered = [render(*a) for a in args]
+            else:
+                rendered = executor.map(render, *zip(*args))
+            for (i, category_id, race, key, __), fragment in zip(stale, rendered):
+                fragments[i] = fragment
+                self._entries[category_id] = (race, race.version, key, fragment)
+
+        return fragments
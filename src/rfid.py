@@ -0,0 +1,297 @@
+import argparse
+from functools import partial
+import re
+import select
+import socket
+import sys
+import time
+
+from event import Event
+import petro
+from race import errors
+from race.time_str import time_str_to_ms
+from render_cache import RenderCache
+import splitfile
+
+_SEPARATORS = re.compile('[\\s,;]+')
+_FRACTION = re.compile('(\\.[0-9]{3})[0-9]+$')
+
+# Longer lines are not tag reads, they are cut to keep the memory bounded.
+_MAX_LINE = 1024
+_CHUNK_SIZE = 1 << 16
+
+# A rider crossing the mat while warming up or after the finish.
+_IGNORED = (
+    errors.RaceHasNotStartedYet,
+    errors.SplitTimeIsEarlierThanStartTime,
+    errors.BibHasAlreadyFinished,
+)
+
+
+def parse_read(line):
+    """
+    Parses a line of RFID reader output: a tag, optionally a date, and
+    the time of the read. Fields are separated by spaces, commas or
+    semicolons. Fractions of a second are cut to milliseconds.
+
+    :returns: (tag, time_str, milliseconds since midnight), None if the
+              line is not a tag read.
+
+    >>> parse_read('e2801160 2024-05-12 12:00:01.123456\\r\\n')
+    ('E2801160', '12:00:01.123', 43201123)
+    >>> parse_read('E2801160;12:00:01')
+    ('E2801160', '12:00:01', 43201000)
+    >>> parse_read('E2801160') is None
+    True
+    """
+    fields = _SEPARATORS.split(line.strip())
+    if len(fields) < 2:
+        return None
+    time_str = _FRACTION.sub('\\1', fields[-1])
+    try:
+        ms = time_str_to_ms(time_str)
+    except errors.MalformedTimeString:
+        return None
+    return fields[0].upper(), time_str, ms
+
+
+class TagReads(object):
+    """
+    Turns RFID reads into split expressions.
+
+    A tag is read many times while a rider passes the antenna. Reads of
+    a rider within min_lap_seconds of the previous accepted read are
+    collapsed into it, so a passage makes a single split at the time of
+    its first read. Before the first accepted read, the start of the race
+    takes its place, so the passage of a mat on the start line right
+    after the start is not a lap.
+
+    Reads of tags not in the reglist are skipped, those are the tags of
+    marshals or of riders from other events. Only the time of the last
+    accepted read of every registered bib is kept.
+    """
+
+    def __init__(self, reglist, min_lap_seconds, on_error, start_ms=None):
+        """
+        :param start_ms: a function returning the start time of the race
+                         of a bib in milliseconds since midnight, None if
+                         it has not started.
+        """
+        self._reglist = reglist
+        self._window = int(min_lap_seconds * 1000)
+        self._on_error = on_error
+        self._start_ms = start_ms
+        self._accepted = {}
+        self._line_number = 0
+
+    def splits(self, lines, apply=None):
+        """
+        :param lines: lines of reader output following the previous ones.
+        :param apply: called with every split in turn, returns True if the
+                      race has taken it. Only a split taken by the race
+                      is an accepted read. All are if apply is None.
+        :returns: a list of the split expressions taken, with the line
+                  numbers of the reads.
+        """
+        expressions = []
+        bib_of_rfid = self._reglist.bib_of_rfid
+        accepted = self._accepted
+        window = self._window
+        for line in lines:
+            self._line_number += 1
+            read = parse_read(line)
+            if read is None:
+                if line.strip():
+                    self._on_error(self._line_number, 'Malformed tag read.')
+                continue
+            tag, time_str, ms = read
+            bib = bib_of_rfid(tag)
+            if bib is None:
+                continue
+            last = accepted.get(bib)
+            if last is None and self._start_ms is not None:
+                last = self._start_ms(bib)
+            if last is not None and abs(ms - last) < window:
+                continue
+            e = (self._line_number, splitfile.expression.SPLIT, [bib], time_str)
+            if apply is None or apply(e):
+                accepted[bib] = ms
+                expressions.append(e)
+        return expressions
+
+
+def _open_source(source, interval):
+    """
+    Opens a file, a FIFO, 'unix:PATH' or 'tcp:HOST:PORT'.
+
+    :returns: (an object to close, a function returning the next bytes,
+              b'' at the end, None if nothing has arrived for interval
+              seconds).
+    """
+    if source.startswith('unix:') or source.startswith('tcp:'):
+        if source.startswith('unix:'):
+            connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            connection.connect(source[len('unix:'):])
+        else:
+            host, __, port = source[len('tcp:'):].rpartition(':')
+            connection = socket.create_connection((host, int(port)))
+        connection.settimeout(interval)
+
+        def read():
+            try:
+                return connection.recv(_CHUNK_SIZE)
+            except socket.timeout:
+                return None
+        return connection, read
+
+    # Unbuffered, so select sees all the bytes not read yet.
+    f = open(source, mode='rb', buffering=0)
+
+    def read():
+        # A FIFO blocks until the RFID reader writes more, select gives it the
+        # idle ticks of the socket timeout. A file is always readable.
+        if not select.select([f], [], [], interval)[0]:
+            return None
+        return f.read(_CHUNK_SIZE)
+    return f, read
+
+
+def _chunks(read):
+    """
+    Yields lists of complete lines, an empty list if nothing has arrived.
+    """
+    pending = b''
+    while True:
+        data = read()
+        if data is None:
+            yield []
+            continue
+        if not data:
+            break
+        lines = (pending + data).split(b'\n')
+        pending = lines.pop()
+        if len(pending) > _MAX_LINE:
+            lines.append(pending[:_MAX_LINE])
+            pending = b''
+        yield [line.decode('latin-1') for line in lines]
+    if pending:
+        yield [pending.decode('latin-1')]
+
+
+def _apply(event, on_error, expression):
+    """
+    :returns: True if the race of the bib has taken the split.
+    """
+    bib = expression[2][0]
+    if event.reglist.category_of(bib) not in event.races:
+        # A rider of a category which is not racing now.
+        return False
+    try:
+        return event.apply(expression)
+    except _IGNORED:
+        return False
+    except ValueError as e:
+        on_error(expression[0], '{}.'.format(type(e).__name__))
+        return False
+
+
+def _start_ms(event, bib):
+    race = event.races.get(event.reglist.category_of(bib))
+    if race is None or not race.started:
+        return None
+    return time_str_to_ms(race.start_time)
+
+
+def _render(event, output_format, output_path, cache):
+    petro._write(
+        [(output_format, output_path)], event.races, event.reglist, event.banner_url,
+        [cache], replace=True)
+
+
+def _main(input_path, source, output_format, output_path, min_lap_seconds,
+          engine=splitfile.FAST, interval=1.0, lazy_reglist=False):
+    split_file_errors = []
+
+    def on_split_file_error(line_number, message):
+        print('ERROR: Line {}. {}'.format(line_number, message))
+        split_file_errors.append(line_number)
+
+    read_errors = []
+
+    def on_read_error(line_number, message):
+        print('ERROR: Read {}. {}'.format(line_number, message))
+        read_errors.append(line_number)
+
+    event = Event(input_path, on_split_file_error, lazy_reglist)
+    for expression in splitfile.open_split(input_path, engine=engine):
+        event.apply(expression)
+    if split_file_errors:
+        return 2
+    if event.reglist is None:
+        print('ERROR: Reglist is not specified.')
+        return 2
+
+    reads = TagReads(
+        event.reglist, min_lap_seconds, on_read_error, partial(_start_ms, event))
+    apply = partial(_apply, event, on_read_error)
+    cache = RenderCache()
+    changed = True
+    rendered_at = time.monotonic()
+    closeable, read = _open_source(source, interval)
+    with closeable:
+        for lines in _chunks(read):
+            if reads.splits(lines, apply):
+                changed = True
+            if changed and (not lines or time.monotonic() - rendered_at >= interval):
+                _render(event, output_format, output_path, cache)
+                changed = False
+                rendered_at = time.monotonic()
+    if changed:
+        _render(event, output_format, output_path, cache)
+    if read_errors:
+        return 2
+    return 0
+
+
+if __name__ == '__main__':
+    args_parser = argparse.ArgumentParser(
+        description="""
+            Computes results from RFID reader output. The *.split file
+            tells the reglist, laps, starts and DNFs, the reader output has
+            a "tag [date] time" line per tag read. Tags are matched to bibs
+            by the rfid column of the reglist.
+            """
+        )
+    args_parser.add_argument('path_to_split_file')
+    args_parser.add_argument(
+        'reads',
+        help='a file or a FIFO with tag reads, unix:PATH or tcp:HOST:PORT of a reader')
+    args_parser.add_argument('output_format', choices=sorted(petro._writers))
+    args_parser.add_argument('path_to_output_file')
+    args_parser.add_argument(
+        '--min-lap',
+        type=float,
+        default=10.0,
+        help='reads of a rider closer than this many seconds, or to the start, make a '
+             'single split')
+    args_parser.add_argument(
+        '--interval',
+        type=float,
+        default=1.0,
+        help='how often to update the output while reads arrive, seconds')
+    petro._add_input_arguments(args_parser)
+
+    args = args_parser.parse_args()
+
+    try:
+        sys.exit(_main(
+            args.path_to_split_file,
+            args.reads,
+            args.output_format,
+            args.path_to_output_file,
+            args.min_lap,
+            args.parser,
+            args.interval,
+            args.lazy_reglist))
+    except KeyboardInterrupt:
+        sys.exit(0)
@@ -0,0 +1,277 @@
+import argparse
+from collections import namedtuple
+import csv
+import hashlib
+import json
+import os
+import sys
+
+import petro
+from race import ParticipantState
+import splitfile
+
+# Points for the 1st, 2nd, ... finisher of a category.
+DEFAULT_POINTS = [
+    100, 80, 65, 55, 50, 45, 40, 36, 32, 29,
+    26, 24, 22, 20, 18, 16, 14, 12, 10, 8,
+    6, 5, 4, 3, 2, 1,
+]
+
+# Bump whenever the saved series state changes its layout.
+_FORMAT = 1
+
+SeriesRow = namedtuple(
+    'SeriesRow',
+    ['position', 'name', 'team', 'city', 'points', 'event_points']
+)
+
+
+class Series(object):
+    """
+    Overall standings of a cup series.
+
+    Every event is reduced to the finishing positions of its riders once,
+    when it is added. Standings are computed from the stored positions,
+    so adding an event or changing the points table does not replay the
+    earlier events.
+
+    Riders are matched across events by their reglist name and nickname
+    within a category with the same name.
+    """
+
+    def __init__(self, points=DEFAULT_POINTS):
+        self._points = list(points)
+        self._events = {}
+
+    @property
+    def events(self):
+        return list(self._events.keys())
+
+    @property
+    def points(self):
+        return self._points
+
+    @points.setter
+    def points(self, points):
+        self._points = list(points)
+
+    def is_current(self, event_id, input_hash):
+        """
+        :returns: True if the event was added from the same input.
+        """
+        event = self._events.get(event_id)
+        return event is not None and event['hash'] == input_hash
+
+    def add_results(self, event_id, races, reglist, input_hash=None, on_error=None):
+        """
+        Adds or replaces the results of an event.
+
+        :param races: a dict of Race by category id, as Event.races.
+        :param input_hash: identifies the input the results came from, see
+                           is_current.
+        :param on_error: called with a message for every finisher who
+                         gets no points as they cannot be told apart from
+                         another one or have no name.
+        """
+        categories = {}
+        for category_id, category_name in reglist.categories:
+            if category_id not in races:
+                continue
+            riders = {}
+            bibs = {}
+            for result in races[category_id].results:
+                if result.state != ParticipantState.FINISHED:
+                    continue
+                participant = reglist.participant(result.bib)
+                key = _rider_key(participant.name, participant.nickname)
+                if not key.strip():
+                    _report(on_error, 'Bib {} in {} has no name to match it in other events.'
+                            .format(result.bib, category_name))
+                    continue
+                if key in riders:
+                    _report(on_error, 'Bibs {} and {} in {} have the same name and nickname, '
+                            'only bib {} gets points.'.format(
+                                bibs[key], result.bib, category_name, bibs[key]))
+                    continue
+                riders[key] = (
+                    result.position, participant.name, participant.team, participant.city)
+                bibs[key] = result.bib
+            categories[category_name] = riders
+        self._events[event_id] = {'hash': input_hash, 'categories': categories}
+
+    def remove_event(self, event_id):
+        del self._events[event_id]
+
+    def standings(self):
+        """
+        :returns: a dict of SeriesRow lists by category name. Every row has
+                  the points of each event in the order of Series.events.
+        """
+        event_count = len(self._events)
+        rows = {}
+        for i, event in enumerate(self._events.values()):
+            for category_name, riders in event['categories'].items():
+                category = rows.setdefault(category_name, {})
+                for key, (position, name, team, city) in riders.items():
+                    rider = category.get(key)
+                    if rider is None:
+                        rider = category[key] = [name, team, city, [0] * event_count, []]
+                    # The latest event tells the current team and city.
+                    rider[0:3] = name, team, city
+                    rider[3][i] = self._points_for(position)
+                    rider[4].append(position)
+
+        standings = {}
+        for category_name, category in rows.items():
+            ordered = sorted(
+                category.values(),
+                key=lambda r: (-sum(r[3]), min(r[4]), r[0]))
+            standings[category_name] = [
+                SeriesRow(
+                    position=position,
+                    name=name,
+                    team=team,
+                    city=city,
+                    points=sum(event_points),
+                    event_points=event_points)
+                for position, (name, team, city, event_points, __)
+                in enumerate(ordered, 1)]
+        return standings
+
+    def save(self, path):
+        state = {
+            'format': _FORMAT,
+            'points': self._points,
+            'events': self._events,
+        }
+        tmp_path = path + '.tmp'
+        with open(tmp_path, mode='wt', encoding='utf-8') as f:
+            json.dump(state, f, ensure_ascii=False, indent=1)
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def open(path):
+        with open(path, mode='rt', encoding='utf-8') as f:
+            state = json.load(f)
+        if state.get('format') != _FORMAT:
+            raise ValueError('Unsupported series state format.')
+        series = Series(state['points'])
+        for event_id, event in state['events'].items():
+            event['categories'] = {
+                category_name: {key: tuple(rider) for key, rider in riders.items()}
+                for category_name, riders in event['categories'].items()}
+            series._events[event_id] = event
+        return series
+
+    def _points_for(self, position):
+        if position <= len(self._points):
+            return self._points[position - 1]
+        return 0
+
+
+def write_csv(output_path, series):
+    events = series.events
+    with open(output_path, mode='wt', encoding='cp1251') as f:
+        writer = csv.writer(f, delimiter=';')
+        for category_name, rows in series.standings().items():
+            writer.writerow([category_name])
+            writer.writerow(
+                ['Место', 'Имя', 'Команда', 'Город'] +
+                [os.path.basename(e) for e in events] +
+                ['Очки'])
+            for row in rows:
+                writer.writerow(
+                    [row.position, row.name, row.team, row.city] +
+                    row.event_points +
+                    [row.points])
+
+
+def _rider_key(name, nickname):
+    # Namesakes are common, a nickname is a bikeportal user name.
+    return '\t'.join(' '.join(s.split()).casefold() for s in (name, nickname))
+
+
+def _report(on_error, message):
+    if on_error is not None:
+        on_error(message)
+
+
+def _input_hash(input_path, reglist_path):
+    h = hashlib.sha256()
+    for path in (input_path, reglist_path):
+        if path is not None:
+            with open(path, mode='rb') as f:
+                h.update(f.read())
+        h.update(b'\0')
+    return h.hexdigest()
+
+
+def _reglist_path(input_path):
+    # Only the reglist statement is needed to tell if an event has changed.
+    for __, etype, *params in splitfile.open_split(input_path):
+        if etype == splitfile.expression.REGLIST:
+            path = params[0]
+            return os.path.join(os.path.dirname(os.path.abspath(input_path)), path)
+    return None
+
+
+def _main(state_path, input_paths, output_path, points=None):
+    if os.path.exists(state_path):
+        series = Series.open(state_path)
+    else:
+        series = Series()
+    if points is not None:
+        series.points = points
+
+    exit_code = 0
+    for input_path in input_paths:
+        event_id = os.path.abspath(input_path)
+        input_hash = _input_hash(input_path, _reglist_path(input_path))
+        if series.is_current(event_id, input_hash):
+            continue
+
+        errors = []
+
+        def on_error(line_number, message):
+            print('ERROR: {}: Line {}. {}'.format(input_path, line_number, message))
+            errors.append(line_number)
+
+        races, reglist, __ = petro._results(input_path, on_error)
+        if errors or reglist is None:
+            exit_code = 2
+            continue
+        series.add_results(
+            event_id, races, reglist, input_hash,
+            lambda message: print('WARNING: {}: {}'.format(input_path, message)))
+        print('INFO: Added {}.'.format(input_path))
+
+    series.save(state_path)
+    write_csv(output_path, series)
+    return exit_code
+
+
+if __name__ == '__main__':
+    args_parser = argparse.ArgumentParser(
+        description="""
+            Computes overall standings of a cup series. Events are
+            remembered in the series state file, so only new or changed
+            *.split files are processed on every run.
+            """
+        )
+    args_parser.add_argument('path_to_series_state')
+    args_parser.add_argument('path_to_output_file')
+    args_parser.add_argument('path_to_split_file', nargs='+')
+    args_parser.add_argument(
+        '--points',
+        help='comma separated points for the 1st, 2nd, ... finisher')
+
+    args = args_parser.parse_args()
+    points = None
+    if args.points is not None:
+        points = [int(p) for p in args.points.split(',')]
+
+    sys.exit(_main(
+        args.path_to_series_state,
+        args.path_to_split_file,
+        args.path_to_output_file,
+        points))
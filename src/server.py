@@ -0,0 +1,400 @@
+import argparse
+import asyncio
+import io
+import json
+import secrets
+import sys
+import traceback
+import urllib.parse
+
+from event import Event
+import html_writer
+import petro
+from render_cache import RenderCache
+import splitfile
+
+_HEARTBEAT = 15
+_REASONS = {
+    200: 'OK',
+    304: 'Not Modified',
+    400: 'Bad Request',
+    404: 'Not Found',
+    405: 'Method Not Allowed',
+}
+
+
+class LiveResults(object):
+    """
+    Event state fed from a growing split file, with the rendered pages
+    and JSON standings cached until the state changes.
+    """
+
+    def __init__(self, input_path, engine=splitfile.FAST, lazy_reglist=False):
+        self._input_path = input_path
+        self._engine = engine
+        self._lazy_reglist = lazy_reglist
+        # Tells the ETags of this process from the ones of an earlier
+        # one, whose counters started from 0 too.
+        self._token = secrets.token_hex(8)
+        # Bumped on every change of the state, identifies the whole event.
+        self._revision = 0
+        # Bumped on every replay from the start, when races are recreated.
+        self._generation = 0
+        self._responses = {}
+        self._reset()
+
+    @property
+    def revision(self):
+        return self._revision
+
+    def ingest(self):
+        """
+        Applies the lines appended to the split file since the last call.
+
+        :returns: True if the state has changed.
+        """
+        try:
+            expressions = self._tail.read()
+        except splitfile.SplitFileRewritten:
+            print('INFO: The split file was rewritten, replaying it from the start.')
+            self._reset()
+            expressions = self._tail.read()
+            self._revision += 1
+
+        changed = False
+        for expression in expressions:
+            try:
+                changed = self._event.apply(expression) or changed
+            except ValueError as e:
+                # A race rule violation, e.g. splits out of order.
+                self._on_error(expression[0], '{}.'.format(type(e).__name__))
+            except OSError as e:
+                # E.g. a missing reglist file. The tail has moved past
+                # the whole batch, so the rest of it is applied still.
+                self._on_error(expression[0], 'Cannot read {}.'.format(e.filename))
+        if changed:
+            self._revision += 1
+        return changed
+
+    def categories(self):
+        """
+        :returns: (etag, body) of the JSON list of categories.
+        """
+        def make():
+            reglist = self._event.reglist
+            if reglist is None:
+                return []
+            return [
+                {
+                    'id': category_id,
+                    'name': category_name,
+                    'version': self._etag_of(category_id).strip('"'),
+                    'html': '/categories/{}'.format(category_id),
+                    'json': '/categories/{}.json'.format(category_id),
+                }
+                for category_id, category_name in reglist.categories
+                if category_id in self._event.races]
+        return self._response('categories', self._etag(), lambda: _json(make()))
+
+    def page(self, category_id=None):
+        """
+        :returns: (etag, body) of the HTML page of one or all categories,
+                  None if there is no such category.
+        """
+        races = self._event.races
+        if category_id is None:
+            etag = self._etag()
+        elif category_id in races and self._event.reglist is not None:
+            races = {category_id: races[category_id]}
+            etag = self._etag_of(category_id)
+        else:
+            return None
+
+        def make():
+            if self._event.reglist is None:
+                return b''
+            buffer = io.StringIO()
+            html_writer.render(
+                buffer, races, self._event.reglist, self._event.banner_url,
+                self._cache, live_url='/events')
+            return buffer.getvalue().encode('utf-8')
+        return self._response(('page', category_id), etag, make)
+
+    def standings(self, category_id):
+        """
+        :returns: (etag, body) of the JSON standings of a category, None
+                  if there is no such category.
+        """
+        if category_id not in self._event.races or self._event.reglist is None:
+            return None
+        return self._response(
+            ('standings', category_id), self._etag_of(category_id),
+            lambda: _json(self._standings(category_id)))
+
+    def _standings(self, category_id):
+        race = self._event.races[category_id]
+        reglist = self._event.reglist
+        name = dict(reglist.categories)[category_id]
+        results = []
+        for result in race.results:
+            participant = reglist.participant(result.bib)
+            results.append({
+                'position': result.position,
+                'state': result.state,
+                'bib': result.bib,
+                'name': participant.name,
+                'team': participant.team,
+                'city': participant.city,
+                'age': participant.age,
+                'laps_done': result.laps_done,
+                'total_time': result.total_time,
+                'lap_times': result.lap_times,
+            })
+        return {
+            'id': category_id,
+            'name': name,
+            'laps': race.laps,
+            'start_time': race.start_time if race.started else None,
+            'riders_on_course': race.riders_on_course,
+            'results': results,
+        }
+
+    def _response(self, key, etag, make):
+        cached = self._responses.get(key)
+        if cached is None or cached[0] != etag:
+            cached = (etag, make())
+            self._responses[key] = cached
+        return cached
+
+    def _etag(self):
+        return '"{}-{}.{}"'.format(self._token, self._generation, self._revision)
+
+    def _etag_of(self, category_id):
+        return '"{}-{}.{}"'.format(
+            self._token, self._generation, self._event.races[category_id].version)
+
+    def _reset(self):
+        self._event = Event(self._input_path, self._on_error, self._lazy_reglist)
+        self._tail = splitfile.SplitTail(self._input_path, engine=self._engine)
+        self._cache = RenderCache()
+        self._generation += 1
+
+    def _on_error(self, line_number, message):
+        print('ERROR: Line {}. {}'.format(line_number, message))
+
+
+class LiveServer(object):
+    """
+    Serves LiveResults over HTTP and pushes updates over Server-Sent
+    Events, checking the split file every interval seconds.
+
+        /                        all categories, HTML
+        /categories.json         list of categories
+        /categories/<id>         one category, HTML
+        /categories/<id>.json    standings of one category
+        /events                  update events
+    """
+
+    def __init__(self, results, interval=0.5):
+        self._results = results
+        self._interval = interval
+        self._update = None
+        self._closing = False
+
+    async def start(self, host, port):
+        self._update = asyncio.get_running_loop().create_future()
+        self._server = await asyncio.start_server(self._handle, host, port, backlog=1024)
+        self._ingestion = asyncio.ensure_future(self._ingest())
+        return self._server
+
+    async def close(self):
+        self._closing = True
+        self._ingestion.cancel()
+        self.notify()
+        self._server.close()
+        await self._server.wait_closed()
+
+    def notify(self):
+        """
+        Wakes up the event streams of all connected clients.
+        """
+        update, self._update = self._update, asyncio.get_running_loop().create_future()
+        update.set_result(self._results.revision)
+
+    async def _ingest(self):
+        while True:
+            try:
+                if self._results.ingest():
+                    self.notify()
+            except Exception:
+                # E.g. a missing reglist file. Keep serving what we have.
+                traceback.print_exc()
+            await asyncio.sleep(self._interval)
+
+    async def _handle(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, __, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+
+                try:
+                    method, target, version = request_line.decode('latin-1').split()
+                except ValueError:
+                    self._write(writer, 400, 'HEAD')
+                    break
+                path = urllib.parse.urlsplit(target).path
+                if method not in ('GET', 'HEAD'):
+                    # The request body is not read, so the connection
+                    # cannot be used for the next request.
+                    self._write(writer, 405, method)
+                    await writer.drain()
+                    break
+                elif path == '/events':
+                    await self._events(writer)
+                    break
+                else:
+                    self._respond(writer, method, path, headers)
+                await writer.drain()
+                if version == 'HTTP/1.0' or headers.get('connection') == 'close':
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+            pass
+        finally:
+            writer.close()
+
+    def _respond(self, writer, method, path, headers):
+        response = None
+        content_type = 'application/json'
+        if path == '/':
+            response = self._results.page()
+            content_type = 'text/html; charset=utf-8'
+        elif path == '/categories.json':
+            response = self._results.categories()
+        elif path.startswith('/categories/'):
+            name = path[len('/categories/'):]
+            as_json = name.endswith('.json')
+            if as_json:
+                name = name[:-len('.json')]
+            if name.isdigit():
+                if as_json:
+                    response = self._results.standings(int(name))
+                else:
+                    response = self._results.page(int(name))
+                    content_type = 'text/html; charset=utf-8'
+
+        if response is None:
+            self._write(writer, 404, method)
+            return
+        etag, body = response
+        if _matches(headers.get('if-none-match'), etag):
+            self._write(writer, 304, method, etag=etag)
+        else:
+            self._write(writer, 200, method, body, content_type, etag)
+
+    def _write(self, writer, status, method, body=b'', content_type=None, etag=None):
+        lines = ['HTTP/1.1 {} {}'.format(status, _REASONS[status])]
+        if content_type is not None:
+            lines.append('Content-Type: {}'.format(content_type))
+        if etag is not None:
+            lines.append('ETag: {}'.format(etag))
+            lines.append('Cache-Control: no-cache')
+        if status != 304:
+            lines.append('Content-Length: {}'.format(len(body)))
+        head = ('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1')
+        writer.write(head if method == 'HEAD' or status == 304 else head + body)
+
+    async def _events(self, writer):
+        writer.write(
+            b'HTTP/1.1 200 OK\r\n'
+            b'Content-Type: text/event-stream\r\n'
+            b'Cache-Control: no-cache\r\n'
+            b'\r\n'
+            b'retry: 3000\n\n')
+        await writer.drain()
+        while not self._closing:
+            try:
+                revision = await asyncio.wait_for(asyncio.shield(self._update), _HEARTBEAT)
+            except asyncio.TimeoutError:
+                writer.write(b': heartbeat\n\n')
+            else:
+                writer.write('event: update\ndata: {}\n\n'.format(revision).encode('utf-8'))
+            await writer.drain()
+
+
+def _matches(if_none_match, etag):
+    """
+    Compares the ETags of an If-None-Match header with etag the weak way,
+    as RFC 7232 asks for.
+
+    >>> _matches('"a-1.2"', '"a-1.2"')
+    True
+    >>> _matches('"a-1.1", W/"a-1.2"', '"a-1.2"')
+    True
+    >>> _matches('*', '"a-1.2"')
+    True
+    >>> _matches('"a-1.1"', '"a-1.2"')
+    False
+    >>> _matches(None, '"a-1.2"')
+    False
+    """
+    if if_none_match is None:
+        return False
+    for tag in if_none_match.split(','):
+        tag = tag.strip()
+        if tag == '*' or tag.replace('W/', '', 1) == etag:
+            return True
+    return False
+
+
+def _json(value):
+    return json.dumps(value, ensure_ascii=False).encode('utf-8')
+
+
+async def _serve(input_path, host, port, engine, interval, lazy_reglist):
+    results = LiveResults(input_path, engine, lazy_reglist)
+    server = LiveServer(results, interval)
+    await server.start(host, port)
+    print('INFO: Serving live results on http://{}:{}/'.format(host, port))
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await server.close()
+
+
+if __name__ == '__main__':
+    args_parser = argparse.ArgumentParser(
+        description="""
+            Serves live results of a *.split file over HTTP while it is
+            being written, as HTML and JSON, and pushes updates to browsers.
+            """
+        )
+    args_parser.add_argument('path_to_split_file')
+    args_parser.add_argument('--host', default='127.0.0.1')
+    args_parser.add_argument('--port', type=int, default=8000)
+    petro._add_input_arguments(args_parser)
+    args_parser.add_argument(
+        '--interval',
+        type=float,
+        default=0.5,
+        help='how often to check the split file, seconds')
+
+    args = args_parser.parse_args()
+
+    try:
+        asyncio.run(_serve(
+            args.path_to_split_file,
+            args.host,
+            args.port,
+            args.parser,
+            args.interval,
+            args.lazy_reglist))
+    except KeyboardInterrupt:
+        sys.exit(0)
@@ -1,5 +1,24 @@
+from .chunked import parse_chunks
 from .file import open_split
+from .merger import merge, merge_expressions, SourceLine
+from .parser import parse, FAST, PARSLEY
+from .reorder_buffer import ReorderBuffer, reorder
+from .tail import SplitTail, SplitFileRewritten
 from . import expression
 
 
-__all__ = ['open_split', 'expression']
+__all__ = [
+    'open_split',
+    'parse_chunks',
+    'merge',
+    'merge_expressions',
+    'SourceLine',
+    'ReorderBuffer',
+    'reorder',
+    'parse',
+    'expression',
+    'FAST',
+    'PARSLEY',
+    'SplitTail',
+    'SplitFileRewritten',
+]
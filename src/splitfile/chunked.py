@@ -0,0 +1,75 @@
+from collections import deque
+import io
+import os
+
+from .parser import parse, FAST
+
+DEFAULT_CHUNK_SIZE = 1 << 20
+
+# Chunks parsed ahead of the caller, bounds the memory taken by results.
+_AHEAD = 8
+
+
+def parse_chunks(file_path, executor, encoding='utf-8', engine=FAST,
+                 chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Parses a split file in line-aligned byte chunks in the worker
+    processes of executor, yielding the same expressions in the same
+    order as `open_split` does.
+
+    Chunks end right after a newline byte, so the encoding must encode
+    a newline as a single byte, as UTF-8 and single-byte encodings do.
+    Every chunk is parsed with its own line numbers, which are shifted
+    by the number of lines in the preceding chunks here.
+    """
+    bounds = _chunk_bounds(file_path, chunk_size)
+    pending = deque()
+    line_count = 0
+    for start, end in bounds:
+        pending.append(executor.submit(
+            _parse_chunk, file_path, start, end, encoding, engine))
+        if len(pending) >= _AHEAD:
+            line_count = yield from _shifted(pending.popleft().result(), line_count)
+    while pending:
+        line_count = yield from _shifted(pending.popleft().result(), line_count)
+
+
+def _shifted(parsed, line_count):
+    expressions, lines = parsed
+    for e in expressions:
+        yield (e[0] + line_count,) + e[1:]
+    return line_count + lines
+
+
+def _chunk_bounds(file_path, chunk_size):
+    """
+    :returns: a list of (start, end) byte offsets of the chunks.
+    """
+    size = os.path.getsize(file_path)
+    bounds = []
+    start = 0
+    with open(file_path, mode='rb') as f:
+        while start < size:
+            f.seek(min(start + chunk_size, size) - 1)
+            # Move the end past the newline finishing the line.
+            while True:
+                block = f.read(4096)
+                i = block.find(b'\n')
+                if i >= 0 or not block:
+                    end = f.tell() - len(block) + i + 1 if i >= 0 else size
+                    break
+            bounds.append((start, end))
+            start = end
+    return bounds
+
+
+def _parse_chunk(file_path, start, end, encoding, engine):
+    """
+    :returns: (expressions with line numbers from 1, number of lines).
+    """
+    with open(file_path, mode='rb') as f:
+        f.seek(start)
+        data = f.read(end - start)
+    # Same universal newlines as the text mode of `open_split`.
+    lines = io.StringIO(data.decode(encoding), newline=None).readlines()
+    return list(parse(lines, engine)), len(lines)
@@ -1,8 +1,19 @@
-from .parser import parse
+import os
 
+from .chunked import parse_chunks, DEFAULT_CHUNK_SIZE
+from .parser import parse, FAST
 
-def open_split(file_path, encoding='utf-8'):
-    return parse(_file_iter(file_path, encoding))
+
+def open_split(file_path, encoding='utf-8', engine=FAST, executor=None):
+    """
+    Parses a split file, see `parse`.
+
+    If executor is given, files larger than a chunk are parsed in its
+    worker processes, see `parse_chunks`.
+    """
+    if executor is not None and os.path.getsize(file_path) > DEFAULT_CHUNK_SIZE:
+        return parse_chunks(file_path, executor, encoding, engine)
+    return parse(_file_iter(file_path, encoding), engine)
 
 
 def _file_iter(file_path, encoding='utf-8'):
@@ -0,0 +1,66 @@
+from collections import namedtuple
+import heapq
+
+from . import expression
+from .file import open_split
+from .parser import FAST
+
+
+class SourceLine(namedtuple('SourceLine', ['file_path', 'line_number'])):
+    """
+    The line number of a merged expression, with the file it came from.
+    """
+
+    def __str__(self):
+        return '{}:{}'.format(self.file_path, self.line_number)
+
+
+def merge(file_paths, encoding='utf-8', engine=FAST):
+    """
+    Lazily merges several split files by time, see merge_expressions.
+    """
+    return merge_expressions([
+        (file_path, open_split(file_path, encoding, engine))
+        for file_path in file_paths])
+
+
+def merge_expressions(sources):
+    """
+    Lazily merges the expressions of several split files by time, e.g.
+    of two timekeepers, keeping one expression per file in memory.
+
+    Splits and starts are ordered by their time. Other expressions keep
+    the time of the previous timed expression of their file, so header
+    statements come first and a dnf stays after the splits it followed.
+    Ties are ordered by the position of the file in sources.
+
+    Line numbers of the merged expressions are SourceLine tuples.
+
+    :param sources: (file_path, expressions) pairs.
+
+    >>> from .parser import parse
+    >>> a = parse(['laps 1 2', '1 12:00:10', '1 12:00:30'])
+    >>> b = parse(['2 12:00:20', 'dnf 3', '4 12:00:40'])
+    >>> for e in merge_expressions([('a', a), ('b', b)]):
+    ...     print(e[0], e[1:])
+    a:1 ('laps', [1], 2)
+    a:2 ('split', [1], '12:00:10')
+    b:1 ('split', [2], '12:00:20')
+    b:2 ('dnf', [3])
+    a:3 ('split', [1], '12:00:30')
+    b:3 ('split', [4], '12:00:40')
+    """
+    timed = [
+        _timed(i, file_path, expressions)
+        for i, (file_path, expressions) in enumerate(sources)]
+    for __, __, __, e in heapq.merge(*timed):
+        yield e
+
+
+def _timed(index, file_path, expressions):
+    time = ''
+    for line_number, etype, *params in expressions:
+        if etype in (expression.SPLIT, expression.START):
+            # Zero padded, so time strings sort chronologically.
+            time = params[-1]
+        yield time, index, line_number, (SourceLine(file_path, line_number), etype, *params)
@@ -1,10 +1,13 @@
-from parsley import makeGrammar
-import ometa
+from functools import lru_cache
 
 from . import expression
+from .recognizer import recognize
 
+FAST = 'fast'
+PARSLEY = 'parsley'
 
-def parse(lines):
+
+def parse(lines, engine=FAST):
     """
     Parses a series of strings
 
@@ -31,6 +34,8 @@ def parse(lines):
       * Sequences of spaces or tabs have the same meaning as a one symbol.
 
     :param lines: iterable of strings.
+    :param engine: FAST for the hand-written recognizer or PARSLEY for the
+                   reference grammar below. Both return the same expressions.
     :returns: an iterator of expressions presented as tuples
               (line_number, expression, *expression_params).
 
@@ -50,8 +55,9 @@ def parse(lines):
 , (6, 'dnf', [7])\
 ]
     """
+    parse_line = _engines[engine]
     for line_number, line in enumerate(lines):
-        e = _parse(line)
+        e = parse_line(line)
         if e:
             yield (line_number + 1,) + e
 
@@ -150,12 +156,28 @@ def _parse(line):
     >>> _parse("banner 'foo baz bar.png'")
     ('banner', 'foo baz bar.png')
     """
+    return recognize(line)
+
+
+def _parsley_parse(line):
+    from ometa.runtime import ParseError
     try:
-        return _parser(line).specification()
-    except ometa.runtime.ParseError:
+        return _parser()(line).specification()
+    except ParseError:
         return (expression.SYNTAX_ERROR,)
 
 
+@lru_cache(maxsize=None)
+def _parser():
+    """
+    :returns: the grammar compiled on first use and kept for the process,
+              as compiling it takes longer than the FAST engine takes
+              to parse a whole split file.
+    """
+    from parsley import makeGrammar
+    return makeGrammar(_specification, _factories)
+
+
 _specification = """
 ws = ' ' | '\t' | '\n'
 space = ws+
@@ -242,4 +264,7 @@ _factories = {
         lambda url: (expression.BANNER, url)
 }
 
-_parser = makeGrammar(_specification, _factories)
+_engines = {
+    FAST: _parse,
+    PARSLEY: _parsley_parse,
+}
@@ -0,0 +1,148 @@
+import re
+
+from . import expression
+
+
+def recognize(line):
+    """
+    Hand-written equivalent of the Parsley grammar in `splitfile.parser`.
+
+    Returns exactly the same tuples as the grammar does, including its
+    quirks: the grammar is a PEG, so repetitions are greedy and never
+    give input back. For instance, a bib list eats the leading zero of
+    a `09:00:00` timestamp, which makes `1 09:00:00` a syntax error.
+
+    The line is split into whitespace separated tokens and the first
+    token selects the statement. Reglist and banner statements may
+    contain quoted strings and comment-like sequences, so they are
+    recognized character by character.
+
+    >>> recognize('10 12:00:00 -- comment')
+    ('split', [10], '12:00:00')
+    >>> recognize('1 09:00:00')
+    ('error',)
+    """
+    start = _skip_ws(line, 0)
+    if start == len(line):
+        return None
+
+    if line.startswith('reglist', start):
+        return _string_statement(line, start + 7, expression.REGLIST)
+    if line.startswith('banner', start):
+        return _string_statement(line, start + 6, expression.BANNER)
+
+    comment = line.find('--', start)
+    body = line[start:comment] if comment >= 0 else line[start:]
+    body = body.rstrip(_WS)
+    if not body:
+        return None
+
+    tokens = _WS_RUN.split(body)
+    statement = _statements.get(tokens[0])
+    if statement is None:
+        return _split(tokens)
+    return statement(tokens[1:])
+
+
+_WS = ' \t\n'
+_WS_RUN = re.compile('[ \t\n]+')
+_TIME = re.compile('(?:[01][0-9]|2[0-3]):[0-5][0-9]:[0-5][0-9]')
+_NATURAL = re.compile('0|[1-9][0-9]*')
+_POSITIVE = re.compile('[1-9][0-9]*')
+_STRING = re.compile('\'([^\'"]*)\'|"([^\'"]*)"|([^ \t\n\'"]*)')
+_TAIL = re.compile('[ \t\n]*(?:--.*)?', re.DOTALL)
+
+_ERROR = (expression.SYNTAX_ERROR,)
+
+
+def _skip_ws(line, pos):
+    end = len(line)
+    while pos < end and line[pos] in _WS:
+        pos += 1
+    return pos
+
+
+def _is_time(token):
+    return _TIME.fullmatch(token) is not None
+
+
+def _numbers(tokens, number):
+    if not all(number.fullmatch(t) for t in tokens):
+        return None
+    return [int(t) for t in tokens]
+
+
+def _split(tokens):
+    # bibs space time
+    if len(tokens) < 2:
+        return _ERROR
+    time = tokens[-1]
+    if not _is_time(time) or time[0] == '0':
+        return _ERROR
+    bibs = _numbers(tokens[:-1], _NATURAL)
+    if bibs is None:
+        return _ERROR
+    return (expression.SPLIT, bibs, time)
+
+
+def _dnf(params):
+    # 'dnf' space bibs optional_timestamp
+    if params and _is_time(params[-1]):
+        if params[-1][0] == '0':
+            return _ERROR
+        params = params[:-1]
+    if not params:
+        return _ERROR
+    bibs = _numbers(params, _NATURAL)
+    if bibs is None:
+        return _ERROR
+    return (expression.DNF, bibs)
+
+
+def _start(params):
+    # 'start' space categories space time
+    if len(params) < 2 or not _is_time(params[-1]):
+        return _ERROR
+    categories = _numbers(params[:-1], _POSITIVE)
+    if categories is None:
+        return _ERROR
+    return (expression.START, categories, params[-1])
+
+
+def _laps(params):
+    # 'laps' space category (space category)+ optional_timestamp
+    if params and _is_time(params[-1]):
+        params = params[:-1]
+    if len(params) < 2:
+        return _ERROR
+    numbers = _numbers(params, _POSITIVE)
+    if numbers is None:
+        return _ERROR
+    return (expression.LAPS, numbers[:-1], numbers[-1])
+
+
+_statements = {
+    'dnf': _dnf,
+    'start': _start,
+    'laps': _laps,
+}
+
+
+def _string_statement(line, pos, etype):
+    # <keyword> space string optional_timestamp optional_space comment?
+    m = _WS_RUN.match(line, pos)
+    if not m:
+        return _ERROR
+    m = _STRING.match(line, m.end())
+    value = m.group(m.lastindex)
+    pos = m.end()
+
+    m = _WS_RUN.match(line, pos)
+    if m:
+        t = _TIME.match(line, m.end())
+        if t:
+            pos = t.end()
+
+    if _TAIL.match(line, pos).end() != len(line):
+        return _ERROR
+    return (etype, value)
@@ -0,0 +1,104 @@
+import heapq
+
+from race.time_str import time_str_to_ms
+
+from . import expression
+
+
+class ReorderBuffer(object):
+    """
+    Holds expressions for a window of race time and releases them in
+    time order, so splits typed a few seconds out of order reach the
+    race in order.
+
+    Splits and starts are ordered by their time. Other expressions get
+    the latest time seen when they arrived, so they keep their place
+    relative to the splits typed before them.
+
+    A split older than an already released expression has missed the
+    window. It is passed to on_late instead of being released.
+
+    >>> from .parser import parse
+    >>> lines = list(parse([
+    ...     'laps 1 3', '1 12:00:05', '2 12:00:01', '3 12:00:12',
+    ...     '4 12:00:30', '5 12:00:04']))
+    >>> late = []
+    >>> buffer = ReorderBuffer(10, late.append)
+    >>> [e[0] for e in buffer.push(lines[:4])]
+    [1, 3]
+    >>> [e[0] for e in buffer.push(lines[4:5])]
+    [2, 4]
+    >>> [e[0] for e in buffer.push(lines[5:])]
+    []
+    >>> [e[0] for e in late]
+    [6]
+    >>> [e[0] for e in buffer.flush()]
+    [5]
+    """
+
+    def __init__(self, window, on_late):
+        """
+        :param window: seconds of race time.
+        :param on_late: called with every split which has missed the window.
+        """
+        self._window = int(window * 1000)
+        self._on_late = on_late
+        self._heap = []
+        self._sequence = 0
+        self._latest = None
+        self._released = None
+
+    def __len__(self):
+        return len(self._heap)
+
+    def push(self, expressions):
+        """
+        :returns: a list of the expressions released by these ones.
+        """
+        heap = self._heap
+        for e in expressions:
+            etype = e[1]
+            if etype in (expression.SPLIT, expression.START):
+                key = time_str_to_ms(e[-1])
+                if (etype == expression.SPLIT and
+                        self._released is not None and key < self._released):
+                    self._on_late(e)
+                    continue
+                if self._latest is None or key > self._latest:
+                    self._latest = key
+            else:
+                key = self._latest if self._latest is not None else -1
+            heapq.heappush(heap, (key, self._sequence, e))
+            self._sequence += 1
+
+        released = []
+        if self._latest is not None:
+            watermark = self._latest - self._window
+            while heap and heap[0][0] <= watermark:
+                key, __, e = heapq.heappop(heap)
+                self._released = key
+                released.append(e)
+        return released
+
+    def flush(self):
+        """
+        Releases everything held, e.g. at the end of the input.
+        """
+        released = []
+        while self._heap:
+            key, __, e = heapq.heappop(self._heap)
+            self._released = key
+            released.append(e)
+        return released
+
+
+def reorder(expressions, window, on_late):
+    """
+    Lazily passes expressions through a ReorderBuffer.
+    """
+    buffer = ReorderBuffer(window, on_late)
+    for e in expressions:
+        for released in buffer.push((e,)):
+            yield released
+    for released in buffer.flush():
+        yield released
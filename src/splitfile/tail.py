@@ -0,0 +1,129 @@
+import hashlib
+import io
+import os
+
+from .parser import parse, FAST
+
+
+class SplitFileRewritten(Exception):
+    pass
+
+
+class SplitTail(object):
+    """
+    Parses a growing split file by reading only the bytes appended since
+    the previous read.
+
+    An unterminated last line is parsed right away, the same way
+    `open_split` does it, and is expected to be completed unchanged by a
+    later write. If the line changes, or the bytes right before the read
+    offset do not match anymore (the file was edited or truncated),
+    `read` raises SplitFileRewritten and the caller has to start over.
+
+    A tail can resume reading from the `position` of another one. The
+    first read then makes sure that the content before the position
+    has the same hash as it had.
+    """
+
+    _CHECK_SIZE = 256
+    _HASH_CHUNK_SIZE = 1 << 20
+
+    def __init__(self, file_path, encoding='utf-8', engine=FAST, position=None):
+        self._file_path = file_path
+        self._encoding = encoding
+        self._engine = engine
+        self._stat = None
+        self._offset = 0
+        self._line_number = 0
+        self._tail = b''
+        self._pending = b''
+        self._hash = hashlib.sha256()
+        self._expected_digest = None
+        if position is not None:
+            (self._offset, self._line_number, self._tail, self._pending,
+             self._expected_digest) = position
+
+    @property
+    def offset(self):
+        return self._offset
+
+    @property
+    def line_number(self):
+        return self._line_number
+
+    @property
+    def position(self):
+        """
+        A picklable state to resume reading with a new SplitTail.
+        """
+        return (self._offset, self._line_number, self._tail, self._pending,
+                self._hash.hexdigest())
+
+    def read(self):
+        """
+        :returns: a list of expressions parsed from the appended lines.
+        :raises SplitFileRewritten: if already parsed content has changed.
+        """
+        stat = os.stat(self._file_path)
+        stat = (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+        if stat == self._stat:
+            return []
+        self._stat = stat
+
+        with open(self._file_path, mode='rb') as f:
+            if self._expected_digest is not None:
+                self._verify_read_content(f)
+            f.seek(self._offset - len(self._tail))
+            data = f.read()
+
+        if not data.startswith(self._tail + self._pending):
+            raise SplitFileRewritten()
+        data = data[len(self._tail):]
+
+        if self._pending:
+            rest = data[len(self._pending):]
+            if not rest:
+                return []
+            if rest.startswith(b'\n'):
+                completed = len(self._pending) + 1
+            elif self._pending.endswith(b'\r'):
+                completed = len(self._pending)
+            else:
+                raise SplitFileRewritten()
+            self._consume(data[:completed])
+            data = data[completed:]
+            self._pending = b''
+
+        end = data.rfind(b'\n') + 1
+        complete, pending = data[:end], data[end:]
+        expressions = self._parse(complete) + self._parse(pending)
+        self._consume(complete)
+        self._pending = pending
+        return expressions
+
+    def _verify_read_content(self, f):
+        left = self._offset
+        while left > 0:
+            chunk = f.read(min(left, self._HASH_CHUNK_SIZE))
+            if not chunk:
+                break
+            self._hash.update(chunk)
+            left -= len(chunk)
+        if left > 0 or self._hash.hexdigest() != self._expected_digest:
+            raise SplitFileRewritten()
+        self._expected_digest = None
+
+    def _consume(self, data):
+        self._hash.update(data)
+        self._offset += len(data)
+        self._tail = (self._tail + data)[-self._CHECK_SIZE:]
+
+    def _parse(self, data):
+        if not data:
+            return []
+        lines = list(io.TextIOWrapper(io.BytesIO(data), encoding=self._encoding))
+        expressions = [
+            (e[0] + self._line_number,) + e[1:]
+            for e in parse(lines, self._engine)]
+        self._line_number += len(lines)
+        return expressions
@@ -0,0 +1,90 @@
+import contextlib
+import io
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+import batch
+
+_ACCEPTANCE_DIR = os.path.join(os.path.dirname(__file__), '..', '..', 'acceptance_tests')
+
+
+def setUpModule():
+    # Keeps the reglists opened here out of the cache of the user.
+    cache_home = tempfile.TemporaryDirectory()
+    unittest.addModuleCleanup(cache_home.cleanup)
+    environ = mock.patch.dict(os.environ, XDG_CACHE_HOME=cache_home.name)
+    environ.start()
+    unittest.addModuleCleanup(environ.stop)
+
+
+class BatchTests(unittest.TestCase):
+    def setUp(self):
+        self._dir = tempfile.mkdtemp()
+        shutil.copy(os.path.join(_ACCEPTANCE_DIR, 'reglist.csv'), self._dir)
+        shutil.copy(os.path.join(_ACCEPTANCE_DIR, 'test.split'), self._dir)
+        shutil.copy(
+            os.path.join(_ACCEPTANCE_DIR, 'test.split'),
+            os.path.join(self._dir, 'copy.split'))
+        with open(os.path.join(_ACCEPTANCE_DIR, 'expected.csv'), mode='rb') as f:
+            self._expected = f.read()
+
+    def tearDown(self):
+        shutil.rmtree(self._dir)
+
+    def _main(self, *args, **kwargs):
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            code = batch._main(*args, **kwargs)
+        return code, output.getvalue()
+
+    def _output(self, name):
+        with open(os.path.join(self._dir, name), mode='rb') as f:
+            return f.read()
+
+    def _write(self, name, text):
+        with open(os.path.join(self._dir, name), mode='wt', encoding='utf-8') as f:
+            f.write(text)
+
+    def test_Directory_ProcessesEverySplitFile(self):
+        code, __ = self._main(self._dir, 'csv')
+        self.assertEqual(0, code)
+        self.assertEqual(self._expected, self._output('test.csv'))
+        self.assertEqual(self._expected, self._output('copy.csv'))
+
+    def test_Directory_WritesToOutputDir(self):
+        output_dir = os.path.join(self._dir, 'out')
+        code, __ = self._main(self._dir, 'csv', output_dir)
+        self.assertEqual(0, code)
+        self.assertEqual(self._expected, self._output(os.path.join('out', 'test.csv')))
+
+    def test_Manifest_ProcessesListedEvents(self):
+        self._write('events.txt', '# season\n\ntest.split csv result.csv\n')
+        code, output = self._main(os.path.join(self._dir, 'events.txt'))
+        self.assertEqual(0, code)
+        self.assertEqual(self._expected, self._output('result.csv'))
+        self.assertNotIn('copy.split', output)
+
+    def test_ErrorInOneEvent_IsReportedAndOthersProcessed(self):
+        self._write('broken.split', 'reglist reglist.csv\nbad line\n')
+        code, output = self._main(self._dir, 'csv')
+        self.assertEqual(2, code)
+        self.assertIn('broken.split: exit code 2', output)
+        self.assertIn('ERROR: Line 2. Syntax error.', output)
+        self.assertIn('test.split: exit code 0', output)
+        self.assertEqual(self._expected, self._output('test.csv'))
+
+    def test_ExceptionInOneEvent_IsReported(self):
+        self._write('broken.split', 'reglist missing.csv\n')
+        code, output = self._main(self._dir, 'csv')
+        self.assertEqual(1, code)
+        self.assertIn('broken.split: exit code 1', output)
+        self.assertIn('FileNotFoundError', output)
+        self.assertEqual(self._expected, self._output('test.csv'))
+
+    def test_BadManifestLine_Raises(self):
+        self._write('events.txt', 'test.split pdf result.pdf\n')
+        with self.assertRaises(ValueError):
+            batch._main(os.path.join(self._dir, 'events.txt'))
@@ -0,0 +1,74 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+import checkpoint
+from event import Event
+import splitfile
+
+_REGLIST_PATH = os.path.join(
+    os.path.dirname(__file__), '..', 'reglist_tests', 'test.csv')
+
+
+def setUpModule():
+    # Keeps the reglists opened here out of the cache of the user.
+    cache_home = tempfile.TemporaryDirectory()
+    unittest.addModuleCleanup(cache_home.cleanup)
+    environ = mock.patch.dict(os.environ, XDG_CACHE_HOME=cache_home.name)
+    environ.start()
+    unittest.addModuleCleanup(environ.stop)
+
+
+class CheckpointTests(unittest.TestCase):
+    def setUp(self):
+        self._dir = tempfile.mkdtemp()
+        self._reglist_path = os.path.join(self._dir, 'reglist.csv')
+        shutil.copy(_REGLIST_PATH, self._reglist_path)
+        self._split_path = os.path.join(self._dir, 'event.split')
+        self._append('reglist reglist.csv\nlaps 1 3\nstart 1 12:00:00\n20 12:10:00\n')
+        self._errors = []
+
+    def tearDown(self):
+        shutil.rmtree(self._dir)
+
+    def _append(self, text):
+        with open(self._split_path, mode='at', encoding='utf-8') as f:
+            f.write(text)
+
+    def _on_error(self, line_number, message):
+        self._errors.append((line_number, message))
+
+    def _save(self):
+        event = Event(self._split_path, self._on_error)
+        tail = splitfile.SplitTail(self._split_path)
+        for expression in tail.read():
+            event.apply(expression)
+        checkpoint.save(self._split_path, event, tail)
+        return event
+
+    def test_RestoresRaceStateAndPosition(self):
+        saved = self._save()
+        self._append('13 12:11:00\n')
+
+        event, tail = checkpoint.load(self._split_path, self._on_error)
+        self.assertEqual(saved.races[1].results, event.races[1].results)
+        self.assertEqual(
+            [(5, splitfile.expression.SPLIT, [13], '12:11:00')],
+            tail.read())
+        self.assertEqual([], self._errors)
+
+    def test_ReturnsNoneWithoutCheckpoint(self):
+        self.assertIsNone(checkpoint.load(self._split_path, self._on_error))
+
+    def test_ReturnsNoneForDamagedCheckpoint(self):
+        with open(checkpoint.checkpoint_path(self._split_path), mode='wb') as f:
+            f.write(b'garbage')
+        self.assertIsNone(checkpoint.load(self._split_path, self._on_error))
+
+    def test_ReturnsNoneIfReglistHasChanged(self):
+        self._save()
+        with open(self._reglist_path, mode='ab') as f:
+            f.write(b'\r\n')
+        self.assertIsNone(checkpoint.load(self._split_path, self._on_error))
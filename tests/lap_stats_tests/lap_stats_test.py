@@ -0,0 +1,69 @@
+import doctest
+import unittest
+
+import lap_stats
+from lap_stats import LapStats, LapStatsRow
+from race import Race
+
+
+def load_tests(loader, tests, ignore):
+    tests.addTests(doctest.DocTestSuite(lap_stats))
+    return tests
+
+
+class LapStatsTests(unittest.TestCase):
+    def setUp(self):
+        self._race = Race(laps=3, bibs=[1, 2, 3, 4])
+        self._race.start('12:00:00')
+        for bib, time in [
+                (1, '12:10:00'), (2, '12:10:30'), (3, '12:12:00'),
+                (1, '12:19:00'), (2, '12:20:30'),
+                (1, '12:29:30'), (2, '12:30:00')]:
+            self._race.split(bib, time)
+        self._race.dnf(3)
+
+    def test_Leader(self):
+        stats = lap_stats.compute(self._race)[1]
+        self.assertEqual(540000, stats.best_lap)
+        self.assertEqual(590000, stats.average_lap)
+        self.assertEqual(37417, stats.lap_stdev)
+        self.assertEqual(0, stats.gap)
+
+    def test_GapIsTakenOnTheSameLap(self):
+        self.assertEqual(30000, lap_stats.compute(self._race)[2].gap)
+        self.assertEqual(120000, lap_stats.compute(self._race)[3].gap)
+
+    def test_RiderWithoutLaps_HasNoStats(self):
+        self.assertEqual(LapStats(None, None, None, None), lap_stats.compute(self._race)[4])
+
+    def test_RaceNotStarted_HasNoStats(self):
+        race = Race(laps=3, bibs=[1, 2])
+        self.assertEqual(
+            {1: LapStats(None, None, None, None), 2: LapStats(None, None, None, None)},
+            lap_stats.compute(race))
+
+    def test_LeaderWithoutLaps_GivesNoGaps(self):
+        race = Race(laps=3, bibs=[1, 2])
+        race.start('12:00:00')
+        self.assertEqual(None, lap_stats.compute(race)[1].gap)
+
+    def test_Formatted(self):
+        rows = lap_stats.formatted(self._race)
+        self.assertEqual(
+            LapStatsRow('00:09:00', '00:09:50', '00:00:37.417', ''), rows[1])
+        self.assertEqual('+00:00:30', rows[2].gap)
+        self.assertEqual(LapStatsRow('', '', '', ''), rows[4])
+
+    def test_Rows_AreOfResultRiders(self):
+        rows = lap_stats.rows(self._race, self._race.top(2))
+        self.assertEqual({1, 2}, set(rows))
+        self.assertEqual('+00:00:30', rows[2].gap)
+
+    def test_SubSecondSplits(self):
+        race = Race(laps=2, bibs=[1])
+        race.start('12:00:00')
+        race.split(1, '12:10:00.250')
+        race.split(1, '12:20:00.750')
+        stats = lap_stats.compute(race)[1]
+        self.assertEqual(600250, stats.best_lap)
+        self.assertEqual(600375, stats.average_lap)
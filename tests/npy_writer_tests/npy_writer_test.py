@@ -0,0 +1,110 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+
+import npy_writer
+import petro
+from race import ParticipantState, Race
+from race.time_str import time_str_to_ms
+from render_cache import RenderCache
+
+_ACCEPTANCE_DIR = os.path.join(os.path.dirname(__file__), '..', '..', 'acceptance_tests')
+
+
+def setUpModule():
+    # Keeps the reglists opened here out of the cache of the user.
+    cache_home = tempfile.TemporaryDirectory()
+    unittest.addModuleCleanup(cache_home.cleanup)
+    environ = mock.patch.dict(os.environ, XDG_CACHE_HOME=cache_home.name)
+    environ.start()
+    unittest.addModuleCleanup(environ.stop)
+
+
+class NpyWriterTests(unittest.TestCase):
+    def setUp(self):
+        self._dir = tempfile.mkdtemp()
+        self._path = os.path.join(self._dir, 'results.npy')
+        self._races, self._reglist, __ = petro._results(
+            os.path.join(_ACCEPTANCE_DIR, 'test.split'), on_error=self.fail)
+
+    def tearDown(self):
+        shutil.rmtree(self._dir)
+
+    def _write(self, cache=None):
+        npy_writer.write(self._path, self._races, self._reglist, None, cache)
+        return np.load(self._path, mmap_mode='r')
+
+    def test_Rows_MatchResults(self):
+        rows = self._write()
+        expected = [
+            (category_id, result)
+            for category_id, __ in self._reglist.categories
+            for result in self._races[category_id].results]
+        self.assertEqual(len(expected), len(rows))
+        for row, (category_id, result) in zip(rows, expected):
+            self.assertEqual(category_id, row['category_id'])
+            self.assertEqual(result.bib, row['bib'])
+            self.assertEqual(result.position, row['position'])
+            self.assertEqual(result.state, npy_writer.STATES[row['state']])
+            self.assertEqual(result.laps_done, row['laps_done'])
+            self.assertEqual(time_str_to_ms(result.total_time), row['total_time_ms'])
+            lap_times = [time_str_to_ms(t) for t in result.lap_times]
+            self.assertEqual(lap_times, list(row['lap_times_ms'][:result.laps_done]))
+            self.assertTrue(np.all(row['lap_times_ms'][result.laps_done:] == -1))
+
+    def test_File_IsMemoryMapped(self):
+        self.assertIsInstance(self._write(), np.memmap)
+
+    def test_Dnf_IsState(self):
+        rows = self._write()
+        dnf = rows[rows['state'] == npy_writer.STATES.index(ParticipantState.DNF)]
+        self.assertEqual(
+            sum(1 for race in self._races.values() for r in race.results
+                if r.state == ParticipantState.DNF),
+            len(dnf))
+
+    def test_Cache_GivesSameFile(self):
+        cache = RenderCache()
+        first = np.array(self._write(cache))
+        second = np.array(self._write(cache))
+        self.assertTrue(np.array_equal(first, second))
+
+    def test_LapStats_AreFields(self):
+        npy_writer.write(self._path, self._races, self._reglist, None, lap_stats=True)
+        rows = np.load(self._path)
+        leader = rows[0]
+        self.assertEqual(min(leader['lap_times_ms']), leader['best_lap_ms'])
+        self.assertEqual(0, leader['gap_ms'])
+        self.assertEqual(
+            rows[1]['total_time_ms'] - leader['total_time_ms'], rows[1]['gap_ms'])
+
+    def test_Top_WritesFirstRows(self):
+        npy_writer.write(self._path, self._races, self._reglist, None, top=2)
+        rows = np.load(self._path)
+        expected = [
+            result.bib
+            for category_id, __ in self._reglist.categories
+            for result in self._races[category_id].top(2)]
+        self.assertEqual(expected, list(rows['bib']))
+
+    def test_NotStartedRace_HasNoTimes(self):
+        races = {1: Race(laps=3, bibs=[1, 2])}
+        npy_writer.write(self._path, races, self._reglist, None)
+        rows = np.load(self._path)
+        self.assertEqual([0, 0], list(rows['total_time_ms']))
+        self.assertTrue(np.all(rows['lap_times_ms'] == -1))
+        self.assertTrue(np.all(rows['state'] == npy_writer.STATES.index(
+            ParticipantState.WARMING_UP)))
+
+    def test_RaceWithoutRiders_HasNoRows(self):
+        races = {1: Race(laps=3, bibs=[])}
+        npy_writer.write(self._path, races, self._reglist, None)
+        self.assertEqual(0, len(np.load(self._path)))
+
+    def test_NoRaces_WritesEmptyArray(self):
+        npy_writer.write(self._path, {}, self._reglist, None)
+        self.assertEqual(0, len(np.load(self._path)))
@@ -0,0 +1,58 @@
+import contextlib
+import io
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+import petro
+
+_ACCEPTANCE_DIR = os.path.join(os.path.dirname(__file__), '..', '..', 'acceptance_tests')
+
+
+def setUpModule():
+    # Keeps the reglists opened here out of the cache of the user.
+    cache_home = tempfile.TemporaryDirectory()
+    unittest.addModuleCleanup(cache_home.cleanup)
+    environ = mock.patch.dict(os.environ, XDG_CACHE_HOME=cache_home.name)
+    environ.start()
+    unittest.addModuleCleanup(environ.stop)
+
+
+class FollowTests(unittest.TestCase):
+    def setUp(self):
+        self._dir = tempfile.mkdtemp()
+        shutil.copy(os.path.join(_ACCEPTANCE_DIR, 'reglist.csv'), self._dir)
+        self._split_path = os.path.join(self._dir, 'test.split')
+        self._output_path = os.path.join(self._dir, 'out.csv')
+        with open(self._split_path, mode='wt', encoding='utf-8') as f:
+            f.write('reglist reglist.csv\nlaps 1 3\nstart 1 12:00:00\n2 12:00:10\n')
+
+    def tearDown(self):
+        shutil.rmtree(self._dir)
+
+    def _follow(self, *appended):
+        """
+        Follows the split file, appending a line on every poll and
+        stopping after the last one.
+        """
+        lines = list(appended)
+
+        def sleep(seconds):
+            if not lines:
+                raise KeyboardInterrupt()
+            with open(self._split_path, mode='at', encoding='utf-8') as f:
+                f.write(lines.pop(0))
+
+        output = io.StringIO()
+        with mock.patch('time.sleep', side_effect=sleep), contextlib.redirect_stdout(output):
+            code = petro._main(
+                self._split_path, 'csv', self._output_path, follow=True, interval=0)
+        return code, output.getvalue()
+
+    def test_RaceRuleViolation_IsReportedAndFollowingGoesOn(self):
+        code, output = self._follow('2 12:00:05\n', '-- still followed\n')
+        self.assertEqual(0, code)
+        self.assertEqual('ERROR: Line 5. SplitsAreOutOfOrder.\n', output)
+        self.assertTrue(os.path.exists(self._output_path))
@@ -0,0 +1,41 @@
+import os
+import subprocess
+import sys
+import unittest
+
+_SRC_DIR = os.path.join(os.path.dirname(__file__), '..', '..', 'src')
+
+_CHECK = """
+import sys
+{}
+print(' '.join(sorted(m for m in {!r} if m in sys.modules)))
+"""
+
+
+def _imported(code, modules):
+    env = dict(os.environ, PYTHONPATH=os.path.abspath(_SRC_DIR))
+    out = subprocess.run(
+        [sys.executable, '-c', _CHECK.format(code, modules)],
+        env=env, check=True, stdout=subprocess.PIPE, universal_newlines=True).stdout
+    return out.split()
+
+
+class DeferredImportsTests(unittest.TestCase):
+    def test_Start_DoesNotImportWriterOrGrammarDependencies(self):
+        self.assertEqual(
+            [], _imported('import petro', ('jinja2', 'multiprocessing', 'numpy', 'parsley')))
+
+    def test_CsvWriter_DoesNotImportOtherWriters(self):
+        self.assertEqual(
+            [], _imported('import petro; petro._writer("csv")', ('jinja2', 'numpy')))
+
+    def test_HtmlWriter_ImportsJinja(self):
+        self.assertEqual(
+            ['jinja2'], _imported('import petro; petro._writer("html")', ('jinja2', 'numpy')))
+
+    def test_ParsleyEngine_CompilesGrammarOnce(self):
+        code = (
+            'from splitfile import parser\n'
+            'list(parser.parse(["1 12:00:00", "2 12:00:01"], parser.PARSLEY))\n'
+            'assert parser._parser.cache_info().misses == 1')
+        self.assertEqual(['parsley'], _imported(code, ('parsley',)))
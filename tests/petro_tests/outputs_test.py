@@ -0,0 +1,94 @@
+import argparse
+import contextlib
+import io
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+import petro
+from race import Race
+
+_ACCEPTANCE_DIR = os.path.join(os.path.dirname(__file__), '..', '..', 'acceptance_tests')
+
+
+def setUpModule():
+    # Keeps the reglists opened here out of the cache of the user.
+    cache_home = tempfile.TemporaryDirectory()
+    unittest.addModuleCleanup(cache_home.cleanup)
+    environ = mock.patch.dict(os.environ, XDG_CACHE_HOME=cache_home.name)
+    environ.start()
+    unittest.addModuleCleanup(environ.stop)
+
+
+class SeveralOutputsTests(unittest.TestCase):
+    def setUp(self):
+        self._dir = tempfile.mkdtemp()
+        self._split_path = os.path.join(_ACCEPTANCE_DIR, 'test.split')
+        with open(os.path.join(_ACCEPTANCE_DIR, 'expected.csv'), mode='rb') as f:
+            self._expected = f.read()
+
+    def tearDown(self):
+        shutil.rmtree(self._dir)
+
+    def _path(self, name):
+        return os.path.join(self._dir, name)
+
+    def _read(self, name):
+        with open(self._path(name), mode='rb') as f:
+            return f.read()
+
+    def _main(self, *args, **kwargs):
+        with contextlib.redirect_stdout(io.StringIO()):
+            return petro._main(self._split_path, *args, **kwargs)
+
+    def test_AllOutputs_AreWritten(self):
+        self._main('html', self._path('single.html'))
+        code = self._main(
+            'csv', self._path('a.csv'),
+            extra_outputs=[('html', self._path('b.html')), ('csv', self._path('c.csv'))],
+            jobs=2, concurrent_writers=True)
+        self.assertFalse(code)
+        self.assertEqual(self._expected, self._read('a.csv'))
+        self.assertEqual(self._expected, self._read('c.csv'))
+        self.assertEqual(
+            _without_time(self._read('single.html')), _without_time(self._read('b.html')))
+
+    def test_Results_AreComputedOncePerCategory(self):
+        with mock.patch.object(Race, '_rows_at', autospec=True,
+                               side_effect=Race._rows_at) as rows_at:
+            self._main(
+                None, None,
+                extra_outputs=[('csv', self._path('a.csv')), ('html', self._path('b.html'))])
+        races = set(call.args[0] for call in rows_at.call_args_list)
+        self.assertEqual(len(races), rows_at.call_count)
+
+    def test_Top_WritesFirstRowsOfEveryCategory(self):
+        self._main('csv', self._path('top.csv'), top=1)
+        races, reglist, __ = petro._results(self._split_path, on_error=self.fail)
+        rows = self._read('top.csv').decode('cp1251').splitlines()[1:]
+        expected = [
+            str(races[category_id].results[0].bib)
+            for category_id, __ in reglist.categories
+            if category_id in races and races[category_id].results]
+        self.assertEqual(expected, [row.split(';')[1] for row in rows])
+
+    def test_Top_DoesNotBuildOtherRows(self):
+        with mock.patch.object(Race, '_rows_at', autospec=True,
+                               side_effect=Race._rows_at) as rows_at:
+            self._main('html', self._path('top.html'), top=2)
+        for call in rows_at.call_args_list:
+            self.assertEqual((0, 2), call.args[1:])
+
+    def test_Top_MustBePositive(self):
+        for value in ('0', '-1', 'x'):
+            with self.assertRaises(argparse.ArgumentTypeError):
+                petro._positive_int(value)
+        self.assertEqual(3, petro._positive_int('3'))
+
+
+def _without_time(html):
+    return [
+        line for line in html.splitlines()
+        if 'Час створення протоколу'.encode('utf-8') not in line]
@@ -0,0 +1,142 @@
+import contextlib
+import io
+import json
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+from event import Event
+import petro
+from profiler import Profile
+import splitfile
+
+_SPLIT_PATH = os.path.join(
+    os.path.dirname(__file__), '..', '..', 'acceptance_tests', 'test.split')
+
+
+def setUpModule():
+    # Keeps the reglists opened here out of the cache of the user.
+    cache_home = tempfile.TemporaryDirectory()
+    unittest.addModuleCleanup(cache_home.cleanup)
+    environ = mock.patch.dict(os.environ, XDG_CACHE_HOME=cache_home.name)
+    environ.start()
+    unittest.addModuleCleanup(environ.stop)
+
+
+class ProfileTests(unittest.TestCase):
+    def setUp(self):
+        self._sut = Profile()
+        self._sut.start()
+        self._event = Event(_SPLIT_PATH, lambda *args: self._sut.count_error())
+        with self._sut.phase('parse'):
+            self._expressions = list(splitfile.open_split(_SPLIT_PATH))
+        self._sut.apply(self._event, self._expressions)
+        self._sut.stop()
+        self._report = self._sut.report()
+
+    def test_ReportsPhases(self):
+        self.assertEqual(
+            {'parse', 'reglist', 'race'}, set(self._report['phases']))
+        for phase in self._report['phases'].values():
+            self.assertGreaterEqual(phase['wall_s'], 0)
+
+    def test_CountsExpressionsByType(self):
+        self.assertEqual(len(self._expressions), self._report['lines'])
+        split_count = sum(
+            1 for e in self._expressions if e[1] == splitfile.expression.SPLIT)
+        self.assertEqual(split_count, self._report['expressions']['split']['count'])
+        self.assertEqual(1, self._report['expressions']['reglist']['count'])
+
+    def test_CountsRaceSplitCalls(self):
+        self.assertEqual(
+            sum(len(e[2]) for e in self._expressions if e[1] == splitfile.expression.SPLIT),
+            self._report['race_split_calls'])
+        self.assertGreater(self._report['race_split_calls'], 0)
+
+    def test_RejectedSplit_IsCountedAsCall(self):
+        sut = Profile()
+        sut.start()
+        sut.apply(self._event, [(1000, splitfile.expression.SPLIT, [2], '00:00:01')],
+                  on_error=lambda *args: None)
+        sut.stop()
+        self.assertEqual(1, sut.report()['race_split_calls'])
+
+    def test_DoesNotTraceMemoryOfRun(self):
+        self.assertIsNone(self._report['peak_memory_bytes'])
+        self.assertFalse(self._report['times_include_tracemalloc'])
+
+    def test_CountsErrors(self):
+        self.assertEqual(0, self._report['errors'])
+
+
+class ProfileMemoryTests(unittest.TestCase):
+    def _run(self, sut):
+        event = Event(_SPLIT_PATH, lambda *args: None)
+        with sut.phase('parse'):
+            expressions = list(splitfile.open_split(_SPLIT_PATH))
+        sut.apply(event, expressions)
+
+    def test_MemoryPass_ReportsPeakMemory(self):
+        sut = Profile()
+        sut.start()
+        self._run(sut)
+        sut.measure_memory(lambda: self._run(Profile()))
+        sut.stop()
+        report = sut.report()
+        self.assertGreater(report['peak_memory_bytes'], 0)
+        self.assertFalse(report['times_include_tracemalloc'])
+
+    def test_MemoryPass_IsExcludedFromTotal(self):
+        sut = Profile()
+        sut.start()
+        sut.measure_memory(lambda: time.sleep(0.2))
+        sut.stop()
+        self.assertLess(sut.report()['total']['wall_s'], 0.1)
+
+    def test_TracedRun_SaysTimesIncludeTracing(self):
+        sut = Profile(trace_memory=True)
+        sut.start()
+        self._run(sut)
+        sut.stop()
+        report = sut.report()
+        self.assertGreater(report['peak_memory_bytes'], 0)
+        self.assertTrue(report['times_include_tracemalloc'])
+
+
+class PetroProfileTests(unittest.TestCase):
+    def setUp(self):
+        self._dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self._dir)
+
+    def _main(self, **kwargs):
+        report_path = os.path.join(self._dir, 'report.json')
+        with contextlib.redirect_stdout(io.StringIO()):
+            petro._main(
+                _SPLIT_PATH, 'csv', os.path.join(self._dir, 'out.csv'),
+                profile_path=report_path, **kwargs)
+        with open(report_path, mode='rt', encoding='utf-8') as f:
+            return json.load(f)
+
+    def test_Profile_ParsesLikeNormalRun(self):
+        with mock.patch.object(petro, '_expressions', wraps=petro._expressions) as expressions, \
+                mock.patch.object(petro, '_open_event') as open_event:
+            report = self._main()
+        open_event.assert_not_called()
+        self.assertEqual(1, expressions.call_count)
+        self.assertIsNone(report['peak_memory_bytes'])
+
+    def test_ProfileMemory_MeasuresSecondPassWithoutLoadedReglist(self):
+        with mock.patch.object(petro, '_expressions', wraps=petro._expressions) as expressions, \
+                mock.patch.object(petro.reglist_cache, 'forget',
+                                  wraps=petro.reglist_cache.forget) as forget:
+            report = self._main(profile_memory=True)
+        # The profiled pass and the memory pass.
+        self.assertEqual(2, expressions.call_count)
+        forget.assert_called_once_with()
+        self.assertGreater(report['peak_memory_bytes'], 0)
+        self.assertFalse(report['times_include_tracemalloc'])
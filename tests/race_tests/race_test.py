@@ -1,3 +1,4 @@
+import pickle
 import unittest
 
 from race import Race, ParticipantState
@@ -323,3 +324,134 @@ class RaceTests(unittest.TestCase):
 
         sut.dnf(3)
         self.assertEqual(0, sut.riders_on_course)
+
+    def test_ReturnsPositionOfRider(self):
+        sut = Race(laps=3, bibs=[7, 9, 11])
+        sut.start('12:00:00')
+        sut.split(9, '12:14:00')
+        sut.split(7, '12:15:00')
+        sut.dnf(11)
+        self.assertEqual(1, sut.position_of(9))
+        self.assertEqual(2, sut.position_of(7))
+        self.assertEqual(3, sut.position_of(11))
+
+    def test_DoesNotReturnPositionOfNotRegisteredBib(self):
+        sut = Race(laps=3, bibs=[7])
+        with self.assertRaises(BibIsNotRegistered):
+            sut.position_of(13)
+
+    def test_ReturnsTopRows(self):
+        sut = Race(laps=3, bibs=[7, 9, 11])
+        sut.start('12:00:00')
+        sut.split(11, '12:13:00')
+        sut.split(9, '12:14:00')
+        self.assertSequenceEqual(sut.results[:2], sut.top(2))
+        self.assertSequenceEqual(sut.results, sut.top(10))
+        self.assertSequenceEqual([], sut.top(0))
+
+    def test_ReturnsPageOfRows(self):
+        sut = Race(laps=3, bibs=[7, 9, 11, 13])
+        sut.start('12:00:00')
+        sut.split(11, '12:13:00')
+        sut.split(9, '12:14:00')
+        self.assertSequenceEqual(sut.results[1:3], sut.page(1, 2))
+        self.assertSequenceEqual(sut.results[3:], sut.page(3, 10))
+        self.assertSequenceEqual([], sut.page(4, 10))
+        with self.assertRaises(ValueError):
+            sut.page(-1, 2)
+
+    def test_Ranking_IsOrderOfResults(self):
+        sut = Race(laps=3, bibs=[7, 9, 11, 13])
+        sut.start('12:00:00')
+        sut.split(11, '12:13:00')
+        sut.dnf(7)
+        ranking = sut.ranking()
+        self.assertEqual({}, sut._rows)
+        self.assertEqual([(r.bib, r.state) for r in sut.results], ranking)
+        self.assertEqual(ranking[:2], sut.ranking(2))
+        with self.assertRaises(ValueError):
+            sut.ranking(-1)
+
+    def test_NegativeTop_Raises(self):
+        sut = Race(laps=3, bibs=[7, 9])
+        with self.assertRaises(ValueError):
+            sut.top(-1)
+
+    def test_PageDoesNotBuildOtherRows(self):
+        sut = Race(laps=3, bibs=range(1000))
+        sut.start('12:00:00')
+        sut.split(500, '12:13:00')
+        self.assertEqual(500, sut.page(0, 1)[0].bib)
+        self.assertEqual(1, len(sut._rows))
+
+    def test_ResultsFollowSplits(self):
+        sut = Race(laps=3, bibs=[7, 9])
+        sut.start('12:00:00')
+        sut.split(7, '12:14:00')
+        self.assertEqual([7, 9], [result.bib for result in sut.results])
+        sut.split(9, '12:15:00')
+        sut.split(9, '12:20:00')
+        self.assertEqual(
+            [(1, 9, 2), (2, 7, 1)],
+            [(r.position, r.bib, r.laps_done) for r in sut.results])
+
+    def test_AcceptsFractionsOfSecond(self):
+        sut = Race(laps=1, bibs=[7, 9])
+        sut.start('12:00:00')
+        sut.split(9, '12:15:00.250')
+        sut.split(7, '12:15:00.750')
+        self.assertSequenceEqual(
+            [(9, '00:15:00.250'), (7, '00:15:00.750')],
+            [(result.bib, result.total_time) for result in sut.results])
+
+    def test_VersionChangesWithState(self):
+        sut = Race(laps=3, bibs=[7, 9])
+        versions = [sut.version]
+        sut.start('12:00:00')
+        versions.append(sut.version)
+        sut.split(7, '12:10:00')
+        versions.append(sut.version)
+        sut.dnf(9)
+        versions.append(sut.version)
+        self.assertEqual(len(versions), len(set(versions)))
+
+    def test_VersionDoesNotChangeOnRejectedSplit(self):
+        sut = Race(laps=3, bibs=[7])
+        sut.start('12:00:00')
+        version = sut.version
+        with self.assertRaises(BibIsNotRegistered):
+            sut.split(13, '12:10:00')
+        self.assertEqual(version, sut.version)
+
+    def test_CountsSplits(self):
+        sut = Race(laps=3, bibs=[7, 9])
+        sut.start('12:00:00')
+        self.assertEqual(0, sut.split_count)
+        sut.split(7, '12:10:00')
+        sut.split(9, '12:11:00')
+        sut.split(7, '12:20:00')
+        sut.dnf(9)
+        self.assertEqual(3, sut.split_count)
+
+    def test_SplitTable(self):
+        sut = Race(laps=2, bibs=[7])
+        sut.start('12:00:00')
+        sut.split(7, '12:10:00')
+        start, bibs, laps_done, split_times = sut.split_table()
+        self.assertEqual(12 * 3600 * 1000, start)
+        self.assertEqual([7], bibs)
+        self.assertEqual([1], laps_done)
+        self.assertEqual([start + 600000], list(split_times[:laps_done[0]]))
+
+    def test_SurvivesPickling(self):
+        sut = Race(laps=3, bibs=[7, 9, 11])
+        sut.start('12:00:00')
+        sut.split(9, '12:14:00')
+        sut.dnf(11)
+        expected = sut.results
+
+        copy = pickle.loads(pickle.dumps(sut))
+        self.assertEqual(expected, copy.results)
+        self.assertEqual(sut.version, copy.version)
+        copy.split(7, '12:15:00')
+        self.assertEqual(2, copy.position_of(7))
@@ -0,0 +1,43 @@
+import doctest
+import unittest
+
+import race.time_str
+from race.errors import MalformedTimeString
+from race.time_str import time_str_to_ms, ms_to_time_str
+
+
+# noinspection PyUnusedLocal
+def load_tests(loader, tests, ignore):
+    tests.addTests(doctest.DocTestSuite(race.time_str))
+    return tests
+
+
+class TimeStrTests(unittest.TestCase):
+    def test_ParsesTimeOfDay(self):
+        self.assertEqual(0, time_str_to_ms('00:00:00'))
+        self.assertEqual(86399000, time_str_to_ms('23:59:59'))
+        self.assertEqual(3723000, time_str_to_ms('1:2:3'))
+
+    def test_ParsesFractionsOfSecond(self):
+        self.assertEqual(43200500, time_str_to_ms('12:00:00.5'))
+        self.assertEqual(43200050, time_str_to_ms('12:00:00.05'))
+        self.assertEqual(43200005, time_str_to_ms('12:00:00.005'))
+
+    def test_DoesNotAcceptMalformedTimeStrings(self):
+        malformed_time_strings = [
+            '24:00:00', '12:60:00', '12:00:60', '12:00:00.',
+            '12:00:00.1234', '123:00:00', '12:00', '',
+            '+1:00:00', ' 12:00:00', '١٢:00:00',
+        ]
+        for time_str in malformed_time_strings:
+            with self.assertRaises(MalformedTimeString):
+                time_str_to_ms(time_str)
+
+    def test_FormatsDurations(self):
+        self.assertEqual('00:00:00', ms_to_time_str(0))
+        self.assertEqual('25:00:00', ms_to_time_str(25 * 3600 * 1000))
+        self.assertEqual('00:00:01.001', ms_to_time_str(1001))
+
+    def test_DoesNotFormatNegativeDurations(self):
+        with self.assertRaises(NotImplementedError):
+            ms_to_time_str(-1000)
@@ -0,0 +1,147 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from reglist import Reglist
+from reglist import cache
+
+_REGLIST_PATH = os.path.join(os.path.dirname(__file__), 'test.csv')
+
+
+class ReglistCacheTests(unittest.TestCase):
+    def setUp(self):
+        self._dir = tempfile.mkdtemp()
+        self._cache_dir = os.path.join(self._dir, 'cache')
+        self._path = os.path.join(self._dir, 'reglist.csv')
+        shutil.copy(_REGLIST_PATH, self._path)
+
+    def tearDown(self):
+        cache._loaded.clear()
+        shutil.rmtree(self._dir)
+
+    def _entries(self):
+        return os.listdir(self._cache_dir)
+
+    def test_FirstOpen_SavesEntry(self):
+        Reglist.open(self._path, cache_dir=self._cache_dir)
+        self.assertEqual(1, len(self._entries()))
+
+    def test_SecondOpen_ReturnsCachedReglist(self):
+        parsed = Reglist.open(self._path, cache_dir=self._cache_dir)
+        cached = cache.load(self._path, self._cache_dir)
+        self.assertIsNotNone(cached)
+        self.assertEqual(list(parsed.categories), list(cached.categories))
+        self.assertEqual(list(parsed.participants(1)), list(cached.participants(1)))
+        self.assertEqual(parsed.participant(13), cached.participant(13))
+
+    def test_ModifiedFile_IsParsedAgain(self):
+        Reglist.open(self._path, cache_dir=self._cache_dir)
+        with open(self._path, mode='at', encoding='cp1251', newline='') as f:
+            f.write('99;Новий Учасник;;;;;\r\n')
+        self.assertIsNone(cache.load(self._path, self._cache_dir))
+        reglist = Reglist.open(self._path, cache_dir=self._cache_dir)
+        self.assertEqual('Новий Учасник', reglist.participant(99).name)
+
+    def test_TouchedFile_IsStillCached(self):
+        Reglist.open(self._path, cache_dir=self._cache_dir)
+        stat = os.stat(self._path)
+        os.utime(self._path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        self.assertIsNotNone(cache.load(self._path, self._cache_dir))
+
+    def test_DamagedEntry_IsIgnored(self):
+        Reglist.open(self._path, cache_dir=self._cache_dir)
+        entry_path = os.path.join(self._cache_dir, self._entries()[0])
+        with open(entry_path, mode='wb') as f:
+            f.write(b'garbage')
+        # As if in another process.
+        cache._loaded.clear()
+        self.assertIsNone(cache.load(self._path, self._cache_dir))
+        reglist = Reglist.open(self._path, cache_dir=self._cache_dir)
+        self.assertEqual('Просто Илья', reglist.participant(13).name)
+
+    def test_SameProcess_SharesReglist(self):
+        first = Reglist.open(self._path, cache_dir=self._cache_dir)
+        self.assertIs(first, Reglist.open(self._path, cache_dir=self._cache_dir))
+
+    def test_NoCacheDir_DoesNotLoad(self):
+        Reglist.open(self._path, cache_dir=self._cache_dir)
+        self.assertIsNone(cache.load(self._path, None))
+
+    def test_OtherCacheDir_DoesNotShareReglist(self):
+        Reglist.open(self._path, cache_dir=self._cache_dir)
+        other_dir = os.path.join(self._dir, 'other')
+        self.assertIsNone(cache.load(self._path, other_dir))
+
+    def test_NoCacheDir_DoesNotSave(self):
+        Reglist.open(self._path, cache_dir=None)
+        self.assertFalse(os.path.exists(self._cache_dir))
+
+    def test_Entry_IsJson(self):
+        Reglist.open(self._path, cache_dir=self._cache_dir)
+        entry_path = os.path.join(self._cache_dir, self._entries()[0])
+        with open(entry_path, mode='rt', encoding='utf-8') as f:
+            self.assertEqual(cache._FORMAT, json.load(f)['format'])
+
+    def test_DirAccessibleByOthers_IsNotUsed(self):
+        Reglist.open(self._path, cache_dir=self._cache_dir)
+        cache._loaded.clear()
+        os.chmod(self._cache_dir, 0o777)
+        self.assertIsNone(cache.load(self._path, self._cache_dir))
+        entries = self._entries()
+        Reglist.open(self._path, cache_dir=self._cache_dir)
+        self.assertEqual(entries, self._entries())
+
+    def test_SymlinkDir_IsNotUsed(self):
+        target = os.path.join(self._dir, 'target')
+        os.mkdir(target, mode=0o700)
+        os.symlink(target, self._cache_dir)
+        Reglist.open(self._path, cache_dir=self._cache_dir)
+        self.assertEqual([], os.listdir(target))
+
+    def test_DefaultDir_IsPerUser(self):
+        with mock.patch.dict(os.environ, XDG_CACHE_HOME=''):
+            self.assertTrue(cache.default_dir().startswith(os.path.expanduser('~')))
+
+    def test_DefaultDir_FollowsXdgCacheHome(self):
+        with mock.patch.dict(os.environ, XDG_CACHE_HOME=self._dir):
+            Reglist.open(self._path)
+        self.assertEqual(1, len(os.listdir(os.path.join(self._dir, 'petro', 'reglist'))))
+
+    def _copies(self, count):
+        paths = []
+        for i in range(count):
+            path = os.path.join(self._dir, 'reglist{}.csv'.format(i))
+            shutil.copy(_REGLIST_PATH, path)
+            paths.append(path)
+        return paths
+
+    def test_TooManyEntries_LeastRecentlyUsedArePruned(self):
+        first, second, third = self._copies(3)
+        with mock.patch.object(cache, '_MAX_ENTRIES', 2):
+            Reglist.open(first, cache_dir=self._cache_dir)
+            Reglist.open(second, cache_dir=self._cache_dir)
+            entry_path = cache._entry_path(first, self._cache_dir)
+            os.utime(entry_path, (0, 0))
+            Reglist.open(third, cache_dir=self._cache_dir)
+        self.assertFalse(os.path.exists(entry_path))
+        self.assertEqual(2, len(self._entries()))
+
+    def test_OldEntries_ArePruned(self):
+        first, second = self._copies(2)
+        Reglist.open(first, cache_dir=self._cache_dir)
+        entry_path = cache._entry_path(first, self._cache_dir)
+        os.utime(entry_path, (0, 0))
+        Reglist.open(second, cache_dir=self._cache_dir)
+        self.assertEqual([os.path.basename(cache._entry_path(second, self._cache_dir))],
+                         self._entries())
+
+    def test_Load_MarksEntryAsUsed(self):
+        Reglist.open(self._path, cache_dir=self._cache_dir)
+        entry_path = cache._entry_path(self._path, self._cache_dir)
+        os.utime(entry_path, (0, 0))
+        cache._loaded.clear()
+        self.assertIsNotNone(cache.load(self._path, self._cache_dir))
+        self.assertGreater(os.stat(entry_path).st_mtime, 0)
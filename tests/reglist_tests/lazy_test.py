@@ -0,0 +1,100 @@
+import os
+import pickle
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from reglist import Reglist, ReglistFileChanged
+
+_REGLIST_PATH = os.path.join(os.path.dirname(__file__), 'test.csv')
+
+
+class LazyReglistTests(unittest.TestCase):
+    def setUp(self):
+        self._eager = Reglist.open(_REGLIST_PATH, cache_dir=None)
+        self._lazy = Reglist.open(_REGLIST_PATH, lazy=True)
+
+    def tearDown(self):
+        self._lazy.close()
+
+    def test_Categories_AreSameAsEager(self):
+        self.assertEqual(list(self._eager.categories), list(self._lazy.categories))
+
+    def test_Participants_AreSameAsEager(self):
+        for category_id, __ in self._eager.categories:
+            self.assertEqual(
+                list(self._eager.participants(category_id)),
+                list(self._lazy.participants(category_id)))
+
+    def test_ParticipantByBib_IsSameAsEager(self):
+        for category_id, __ in self._eager.categories:
+            for p in self._eager.participants(category_id):
+                if p.bib is not None:
+                    self.assertEqual(p, self._lazy.participant(p.bib))
+
+    def test_Bibs_AreSameAsEager(self):
+        for category_id, __ in self._eager.categories:
+            self.assertEqual(
+                list(self._eager.bibs(category_id)),
+                list(self._lazy.bibs(category_id)))
+
+    def test_CategoryOf_IsSameAsEager(self):
+        self.assertEqual(self._eager.category_of(13), self._lazy.category_of(13))
+
+    def test_Lookups_DoNotOpenFile(self):
+        with mock.patch('builtins.open', wraps=open) as opened:
+            for category_id, __ in self._eager.categories:
+                for bib in self._eager.bibs(category_id):
+                    self._lazy.participant(bib)
+                list(self._lazy.participants(category_id))
+        self.assertEqual(0, opened.call_count)
+
+    def test_Unpickled_OpensFileAgain(self):
+        self._lazy.participant(13)
+        copy = pickle.loads(pickle.dumps(self._lazy))
+        self.assertEqual(self._eager.participant(13), copy.participant(13))
+        copy.close()
+
+    def test_NotExisting_ReturnsNone(self):
+        self.assertEqual(None, self._lazy.participants(3))
+        self.assertEqual(None, self._lazy.bibs(3))
+        self.assertEqual(None, self._lazy.participant(1000))
+        self.assertEqual(None, self._lazy.category_of(1000))
+
+
+class LazyReglistFileTests(unittest.TestCase):
+    def setUp(self):
+        self._dir = tempfile.mkdtemp()
+        self._path = os.path.join(self._dir, 'reglist.csv')
+        shutil.copy(_REGLIST_PATH, self._path)
+
+    def tearDown(self):
+        shutil.rmtree(self._dir)
+
+    def test_ChangedFile_Raises(self):
+        reglist = Reglist.open(self._path, lazy=True)
+        with open(self._path, mode='ab') as f:
+            f.write(b'99;X;;;;;\r\n')
+        with self.assertRaises(ReglistFileChanged):
+            reglist.participant(13)
+
+    def test_QuotedMultilineField_IsDecoded(self):
+        with open(self._path, mode='ab') as f:
+            f.write('77;"Два\r\nрядки";;;;;\r\n78;Після;;;;;\r\n'.encode('cp1251'))
+        eager = Reglist.open(self._path, cache_dir=None)
+        lazy = Reglist.open(self._path, lazy=True)
+        self.assertEqual(eager.participant(77), lazy.participant(77))
+        self.assertEqual(eager.participant(78), lazy.participant(78))
+        self.assertEqual(list(eager.participants(2)), list(lazy.participants(2)))
+
+    def test_RfidIndex_IsSameAsEager(self):
+        with open(self._path, mode='ab') as f:
+            f.write('77;Мітка;;;;;;1;e2801160, E2801161;1990\r\n'.encode('cp1251'))
+        eager = Reglist.open(self._path, cache_dir=None)
+        lazy = Reglist.open(self._path, lazy=True)
+        for tag in ('E2801160', 'e2801161'):
+            self.assertEqual(77, eager.bib_of_rfid(tag))
+            self.assertEqual(77, lazy.bib_of_rfid(tag))
+        self.assertEqual(None, lazy.bib_of_rfid('E2801162'))
+        self.assertEqual(eager.participant(77), lazy.participant(77))
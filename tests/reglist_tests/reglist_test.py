@@ -1,15 +1,22 @@
+import doctest
 import unittest
 import os
 
+import reglist
 from reglist import Reglist
 
 
+def load_tests(loader, tests, ignore):
+    tests.addTests(doctest.DocTestSuite(reglist.participant))
+    return tests
+
+
 class ReglistTests(unittest.TestCase):
     def setUp(self):
         test_file_path = os.path.join(
             os.path.dirname(__file__),
             'test.csv')
-        self._reglist = Reglist.open(test_file_path)
+        self._reglist = Reglist.open(test_file_path, cache_dir=None)
 
     def test_category_count(self):
         count = sum(1 for _ in self._reglist.categories)
@@ -43,6 +50,10 @@ class ReglistTests(unittest.TestCase):
         self.assertEqual(59, p.bib)
         self.assertEqual('Чудо Яна', p.name)
 
+    def test_empty_rfid(self):
+        self.assertEqual('', self._reglist.participant(13).rfid)
+        self.assertEqual(None, self._reglist.bib_of_rfid(''))
+
     def test_not_existing_bib(self):
         p = self._reglist.participant('100')
         self.assertEqual(None, p)
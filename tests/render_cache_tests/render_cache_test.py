@@ -0,0 +1,69 @@
+from concurrent.futures import ThreadPoolExecutor
+import unittest
+
+from race import Race
+from render_cache import RenderCache
+
+
+class RenderCacheTests(unittest.TestCase):
+    def setUp(self):
+        self._renders = 0
+        self._race = Race(laps=3, bibs=[7, 9])
+        self._race.start('12:00:00')
+        self._sut = RenderCache()
+
+    def _render(self, *args):
+        self._renders += 1
+        return 'fragment {}'.format(self._renders)
+
+    def _fragment(self, category_id=1, race=None, key='key'):
+        return self._sut.fragments(
+            self._render,
+            [(category_id, race or self._race, key, tuple)])[0]
+
+    def test_ReusesFragmentOfUnchangedRace(self):
+        self.assertEqual('fragment 1', self._fragment())
+        self.assertEqual('fragment 1', self._fragment())
+        self.assertEqual(1, self._renders)
+
+    def test_RendersAgainWhenRaceChanges(self):
+        self._fragment()
+        self._race.split(7, '12:10:00')
+        self.assertEqual('fragment 2', self._fragment())
+
+    def test_RendersAgainWhenKeyChanges(self):
+        self._fragment()
+        self.assertEqual('fragment 2', self._fragment(key='other key'))
+
+    def test_RendersAgainForAnotherRace(self):
+        self._fragment()
+        other_race = Race(laps=3, bibs=[7, 9])
+        other_race.start('12:00:00')
+        self.assertEqual('fragment 2', self._fragment(race=other_race))
+
+    def test_KeepsCategoriesApart(self):
+        self._fragment(category_id=1)
+        self._fragment(category_id=2)
+        self._race.split(7, '12:10:00')
+        self.assertEqual('fragment 3', self._fragment(category_id=1))
+        self.assertEqual('fragment 4', self._fragment(category_id=2))
+
+    def test_RendersOnlyStaleFragmentsInOrder(self):
+        other_race = Race(laps=3, bibs=[7, 9])
+        self._fragment(category_id=2, race=other_race)
+        fragments = self._sut.fragments(
+            lambda category_id: 'category {}'.format(category_id),
+            [
+                (1, self._race, 'key', lambda: (1,)),
+                (2, other_race, 'key', lambda: self.fail('Not stale.')),
+                (3, self._race, 'key', lambda: (3,)),
+            ])
+        self.assertEqual(['category 1', 'fragment 1', 'category 3'], fragments)
+
+    def test_RendersWithExecutor(self):
+        with ThreadPoolExecutor(2) as executor:
+            fragments = self._sut.fragments(
+                str,
+                [(i, self._race, 'key', lambda i=i: (i,)) for i in range(5)],
+                executor)
+        self.assertEqual(['0', '1', '2', '3', '4'], fragments)
@@ -0,0 +1,211 @@
+import contextlib
+import doctest
+import io
+import os
+import shutil
+import socket
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+import petro
+import rfid
+from reglist import Reglist
+
+_REGLIST = (
+    'Номер;Имя;Ник;Команда;Откуда;Возраст;Велосипед;Ком;rfid;Год рождения\r\n'
+    '\r\n'
+    '1. М;;;;;;;;;\r\n'
+    '1;Один;;;Київ;30;;1;A1;1994\r\n'
+    '2;Два;;;Київ;31;;1;a2, B2;1993\r\n'
+    '\r\n'
+    '2. Ж;;;;;;;;;\r\n'
+    '3;Три;;;Київ;32;;1;A3;1992\r\n'
+)
+
+
+def setUpModule():
+    # Keeps the reglists opened here out of the cache of the user.
+    cache_home = tempfile.TemporaryDirectory()
+    unittest.addModuleCleanup(cache_home.cleanup)
+    environ = mock.patch.dict(os.environ, XDG_CACHE_HOME=cache_home.name)
+    environ.start()
+    unittest.addModuleCleanup(environ.stop)
+
+
+def load_tests(loader, tests, ignore):
+    tests.addTests(doctest.DocTestSuite(rfid))
+    return tests
+
+
+class TagReadsTests(unittest.TestCase):
+    def setUp(self):
+        self._dir = tempfile.mkdtemp()
+        path = os.path.join(self._dir, 'reglist.csv')
+        with open(path, mode='wb') as f:
+            f.write(_REGLIST.encode('cp1251'))
+        self._errors = []
+        self._sut = rfid.TagReads(
+            Reglist.open(path, cache_dir=None), 10, lambda *e: self._errors.append(e))
+
+    def tearDown(self):
+        shutil.rmtree(self._dir)
+
+    def test_RepeatedReads_MakeOneSplit(self):
+        splits = self._sut.splits(['A1 12:00:00.100', 'A1 12:00:00.300', 'A1 12:00:09.999'])
+        self.assertEqual([(1, 'split', [1], '12:00:00.100')], splits)
+
+    def test_ReadAfterMinLap_MakesAnotherSplit(self):
+        self._sut.splits(['A1 12:00:00'])
+        splits = self._sut.splits(['A1 12:00:10'])
+        self.assertEqual([(2, 'split', [1], '12:00:10')], splits)
+
+    def test_TagsOfOneRider_AreDebouncedTogether(self):
+        splits = self._sut.splits(['A2 12:00:00', 'b2 12:00:01'])
+        self.assertEqual([(1, 'split', [2], '12:00:00')], splits)
+
+    def test_ReadsRightAfterStart_AreStartPassage(self):
+        sut = rfid.TagReads(self._sut._reglist, 10, None, start_ms=lambda bib: 43200000)
+        self.assertEqual([], sut.splits(['A1 12:00:02', 'A1 12:00:09']))
+        self.assertEqual([(3, 'split', [1], '12:00:10')], sut.splits(['A1 12:00:10']))
+
+    def test_SplitNotTakenByRace_IsNotAcceptedRead(self):
+        taken = []
+
+        def apply(e):
+            taken.append(e[-1])
+            return e[-1] != '12:00:00'
+
+        splits = self._sut.splits(['A1 12:00:00', 'A1 12:00:05'], apply)
+        self.assertEqual([(2, 'split', [1], '12:00:05')], splits)
+        self.assertEqual(['12:00:00', '12:00:05'], taken)
+
+    def test_UnknownTag_IsSkipped(self):
+        self.assertEqual([], self._sut.splits(['FF 12:00:00']))
+        self.assertEqual([], self._errors)
+
+    def test_MalformedRead_IsReported(self):
+        self.assertEqual([], self._sut.splits(['A1 12:60:00', '']))
+        self.assertEqual([(1, 'Malformed tag read.')], self._errors)
+
+
+class RfidMainTests(unittest.TestCase):
+    def setUp(self):
+        self._dir = tempfile.mkdtemp()
+        with open(self._path('reglist.csv'), mode='wb') as f:
+            f.write(_REGLIST.encode('cp1251'))
+        self._write(
+            'rfid.split',
+            'reglist reglist.csv\nlaps 1 2\nlaps 2 1\nstart 1 12:00:00\n')
+        self._write(
+            'manual.split',
+            'reglist reglist.csv\nlaps 1 2\nlaps 2 1\nstart 1 12:00:00\n'
+            '2 12:05:00\n1 12:05:01\n1 12:10:00\n2 12:10:30\n')
+        self._reads = (
+            'A1 11:59:00\n'
+            'a2 12:05:00.000\nA2 12:05:00.200\nA1 12:05:01\nB2 12:05:02\nA1 12:05:03\n'
+            'FF 12:06:00\nA3 12:06:00\n'
+            'A1 12:10:00\nA1 12:10:01\nB2 12:10:30\n'
+            'A1 12:11:00\n')
+
+    def tearDown(self):
+        shutil.rmtree(self._dir)
+
+    def _path(self, name):
+        return os.path.join(self._dir, name)
+
+    def _write(self, name, text):
+        with open(self._path(name), mode='wt', encoding='utf-8') as f:
+            f.write(text)
+
+    def _read(self, name):
+        with open(self._path(name), mode='rb') as f:
+            return f.read()
+
+    def _main(self, source):
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            code = rfid._main(
+                self._path('rfid.split'), source, 'csv', self._path('rfid.csv'), 10)
+        return code, output.getvalue()
+
+    def _expected(self):
+        with contextlib.redirect_stdout(io.StringIO()):
+            petro._main(self._path('manual.split'), 'csv', self._path('manual.csv'))
+        return self._read('manual.csv')
+
+    def test_ReadsFile_GiveSameResultsAsManualSplits(self):
+        self._write('reads.txt', self._reads)
+        code, output = self._main(self._path('reads.txt'))
+        self.assertEqual(0, code)
+        self.assertEqual('', output)
+        self.assertEqual(self._expected(), self._read('rfid.csv'))
+
+    def test_MatOnStartLine_DoesNotMakeFirstLap(self):
+        self._write('reads.txt', 'A1 12:00:02\nA1 12:20:00\nA1 12:40:00\n')
+        self._write(
+            'manual.split',
+            'reglist reglist.csv\nlaps 1 2\nlaps 2 1\nstart 1 12:00:00\n'
+            '1 12:20:00\n1 12:40:00\n')
+        code, output = self._main(self._path('reads.txt'))
+        self.assertEqual(0, code)
+        self.assertEqual(self._expected(), self._read('rfid.csv'))
+
+    def test_ReadErrors_ReturnTwo(self):
+        self._write('reads.txt', self._reads + 'A1 25:00:00\n')
+        code, output = self._main(self._path('reads.txt'))
+        self.assertEqual(2, code)
+        self.assertIn('Malformed tag read.', output)
+
+    @unittest.skipUnless(hasattr(os, 'mkfifo'), 'FIFOs are not supported')
+    def test_IdleFifo_GivesIdleTicks(self):
+        path = self._path('reads.fifo')
+        os.mkfifo(path)
+        written = threading.Event()
+        done = threading.Event()
+
+        def reader():
+            with open(path, mode='wb') as f:
+                f.write(b'A1 12:05:01\n')
+                f.flush()
+                written.set()
+                done.wait(10)
+
+        thread = threading.Thread(target=reader)
+        thread.start()
+        try:
+            closeable, read = rfid._open_source(path, 0.01)
+            with closeable:
+                written.wait(10)
+                self.assertEqual(b'A1 12:05:01\n', read())
+                self.assertIsNone(read())
+                done.set()
+                thread.join()
+                self.assertEqual(b'', read())
+        finally:
+            done.set()
+            thread.join()
+
+    def test_ReadsSocket_GiveSameResultsAsManualSplits(self):
+        listener = socket.create_server(('127.0.0.1', 0))
+        listener.settimeout(10)
+        port = listener.getsockname()[1]
+
+        def reader():
+            connection, __ = listener.accept()
+            with connection:
+                data = self._reads.encode('ascii')
+                # Lines split across packets are put together.
+                connection.sendall(data[:7])
+                connection.sendall(data[7:])
+
+        thread = threading.Thread(target=reader)
+        thread.start()
+        try:
+            code, __ = self._main('tcp:127.0.0.1:{}'.format(port))
+        finally:
+            thread.join()
+            listener.close()
+        self.assertEqual(0, code)
+        self.assertEqual(self._expected(), self._read('rfid.csv'))
@@ -0,0 +1,159 @@
+import contextlib
+import io
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from race import Race
+from reglist import Reglist, Participant
+import series
+from series import Series
+
+_ACCEPTANCE_DIR = os.path.join(os.path.dirname(__file__), '..', '..', 'acceptance_tests')
+
+
+def setUpModule():
+    # Keeps the reglists opened here out of the cache of the user.
+    cache_home = tempfile.TemporaryDirectory()
+    unittest.addModuleCleanup(cache_home.cleanup)
+    environ = mock.patch.dict(os.environ, XDG_CACHE_HOME=cache_home.name)
+    environ.start()
+    unittest.addModuleCleanup(environ.stop)
+
+
+def _event(finish_order, dnf=(), laps=1):
+    """
+    :param finish_order: (bib, name[, nickname]) of one category in
+                         finishing order.
+    """
+    participants = [
+        Participant(bib, 1, name, nickname[0] if nickname else '', 'Team', 'City', '30')
+        for bib, name, *nickname in list(finish_order) + list(dnf)]
+    reglist = Reglist([(1, '1. М')], participants)
+    race = Race(laps=laps, bibs=[p.bib for p in participants])
+    race.start('12:00:00')
+    for i, (bib, *__) in enumerate(finish_order):
+        race.split(bib, '12:10:{:02}'.format(i))
+    for bib, *__ in dnf:
+        race.dnf(bib)
+    return {1: race}, reglist
+
+
+class SeriesTests(unittest.TestCase):
+    def setUp(self):
+        self._sut = Series(points=[10, 6, 3])
+
+    def _standings(self):
+        return [
+            (r.position, r.name, r.points, r.event_points)
+            for r in self._sut.standings()['1. М']]
+
+    def test_SumsPointsOfEvents(self):
+        self._sut.add_results('a', *_event([(1, 'Ann'), (2, 'Bob')]))
+        self._sut.add_results('b', *_event([(2, 'Bob'), (1, 'Ann')]))
+        self._sut.add_results('c', *_event([(1, 'Ann'), (2, 'Bob')]))
+        self.assertEqual(
+            [(1, 'Ann', 26, [10, 6, 10]), (2, 'Bob', 22, [6, 10, 6])],
+            self._standings())
+
+    def test_MatchesRidersByNameNotBib(self):
+        self._sut.add_results('a', *_event([(1, 'Ann')]))
+        self._sut.add_results('b', *_event([(7, ' ann ')]))
+        self.assertEqual([(1, ' ann ', 20, [10, 10])], self._standings())
+
+    def test_NamesakesWithOtherNicknames_AreOtherRiders(self):
+        self._sut.add_results('a', *_event([(1, 'Ann', 'ann1'), (2, 'Ann', 'ann2')]))
+        self._sut.add_results('b', *_event([(5, 'Ann', 'ann2'), (6, 'Ann', 'ann1')]))
+        self.assertEqual(
+            [(1, 'Ann', 16, [10, 6]), (2, 'Ann', 16, [6, 10])], self._standings())
+
+    def test_SameNameAndNickname_IsReported(self):
+        errors = []
+        self._sut.add_results(
+            'a', *_event([(1, 'Ann'), (2, 'Bob'), (3, ' ann ')]), on_error=errors.append)
+        self.assertEqual(
+            ['Bibs 1 and 3 in 1. М have the same name and nickname, only bib 1 gets points.'],
+            errors)
+        self.assertEqual([(1, 'Ann', 10, [10]), (2, 'Bob', 6, [6])], self._standings())
+
+    def test_NoName_IsReportedAndGetsNothing(self):
+        errors = []
+        self._sut.add_results('a', *_event([(1, ''), (2, 'Bob'), (3, ' ')]), on_error=errors.append)
+        self.assertEqual(2, len(errors))
+        self.assertIn('Bib 1 in 1. М has no name', errors[0])
+        self.assertEqual([(1, 'Bob', 6, [6])], self._standings())
+
+    def test_BeyondPointsTable_GetsNothing(self):
+        self._sut.add_results('a', *_event(
+            [(1, 'Ann'), (2, 'Bob'), (3, 'Cid'), (4, 'Dan')]))
+        self.assertEqual(0, self._standings()[-1][2])
+
+    def test_DnfAndMissedEvents_GetNothing(self):
+        self._sut.add_results('a', *_event([(1, 'Ann')], dnf=[(2, 'Bob')]))
+        self._sut.add_results('b', *_event([(2, 'Bob')]))
+        self.assertEqual(
+            [(1, 'Ann', 10, [10, 0]), (2, 'Bob', 10, [0, 10])],
+            self._standings())
+
+    def test_ReplacedEvent_ReplacesItsPoints(self):
+        self._sut.add_results('a', *_event([(1, 'Ann'), (2, 'Bob')]))
+        self._sut.add_results('a', *_event([(2, 'Bob'), (1, 'Ann')]))
+        self.assertEqual(['a'], self._sut.events)
+        self.assertEqual(
+            [(1, 'Bob', 10, [10]), (2, 'Ann', 6, [6])], self._standings())
+
+    def test_NewPointsTable_AppliesToEarlierEvents(self):
+        self._sut.add_results('a', *_event([(1, 'Ann'), (2, 'Bob')]))
+        self._sut.points = [1, 1]
+        self.assertEqual(
+            [(1, 'Ann', 1, [1]), (2, 'Bob', 1, [1])], self._standings())
+
+    def test_SurvivesSaveAndOpen(self):
+        self._sut.add_results('a', *_event([(1, 'Ann'), (2, 'Bob')]), input_hash='h')
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            path = os.path.join(tmp_dir, 'series.json')
+            self._sut.save(path)
+            copy = Series.open(path)
+        finally:
+            shutil.rmtree(tmp_dir)
+        self.assertEqual(self._sut.standings(), copy.standings())
+        self.assertTrue(copy.is_current('a', 'h'))
+        self.assertEqual([10, 6, 3], copy.points)
+
+
+class SeriesMainTests(unittest.TestCase):
+    def setUp(self):
+        self._dir = tempfile.mkdtemp()
+        shutil.copy(os.path.join(_ACCEPTANCE_DIR, 'reglist.csv'), self._dir)
+        shutil.copy(os.path.join(_ACCEPTANCE_DIR, 'test.split'), self._dir)
+        self._split_path = os.path.join(self._dir, 'test.split')
+        self._state_path = os.path.join(self._dir, 'series.json')
+        self._output_path = os.path.join(self._dir, 'series.csv')
+
+    def tearDown(self):
+        shutil.rmtree(self._dir)
+
+    def _main(self):
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            code = series._main(self._state_path, [self._split_path], self._output_path)
+        return code, output.getvalue()
+
+    def test_UnchangedEvent_IsNotProcessedAgain(self):
+        code, output = self._main()
+        self.assertEqual(0, code)
+        self.assertIn('Added', output)
+        code, output = self._main()
+        self.assertEqual(0, code)
+        self.assertNotIn('Added', output)
+        self.assertTrue(os.path.exists(self._output_path))
+
+    def test_ChangedEvent_IsProcessedAgain(self):
+        self._main()
+        with open(self._split_path, mode='at', encoding='utf-8') as f:
+            f.write('-- corrected\n')
+        code, output = self._main()
+        self.assertIn('Added', output)
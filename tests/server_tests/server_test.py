@@ -0,0 +1,177 @@
+import asyncio
+import contextlib
+import doctest
+import io
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+import server
+from server import LiveResults, LiveServer
+
+_ACCEPTANCE_DIR = os.path.join(os.path.dirname(__file__), '..', '..', 'acceptance_tests')
+
+
+def setUpModule():
+    # Keeps the reglists opened here out of the cache of the user.
+    cache_home = tempfile.TemporaryDirectory()
+    unittest.addModuleCleanup(cache_home.cleanup)
+    environ = mock.patch.dict(os.environ, XDG_CACHE_HOME=cache_home.name)
+    environ.start()
+    unittest.addModuleCleanup(environ.stop)
+
+
+def load_tests(loader, tests, ignore):
+    tests.addTests(doctest.DocTestSuite(server))
+    return tests
+
+
+class LiveServerTests(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self._dir = tempfile.mkdtemp()
+        shutil.copy(os.path.join(_ACCEPTANCE_DIR, 'reglist.csv'), self._dir)
+        self._split_path = os.path.join(self._dir, 'test.split')
+        with open(self._split_path, mode='wt', encoding='utf-8') as f:
+            f.write(
+                'reglist reglist.csv\n'
+                'laps 1 3\nlaps 2 3\n'
+                'start 1 2 12:00:00\n'
+                '2 12:10:00\n')
+
+        self._results = LiveResults(self._split_path)
+        self._sut = LiveServer(self._results, interval=3600)
+        server = await self._sut.start('127.0.0.1', 0)
+        self._port = server.sockets[0].getsockname()[1]
+        await asyncio.sleep(0)
+
+    async def asyncTearDown(self):
+        await self._sut.close()
+        shutil.rmtree(self._dir)
+
+    async def _get(self, path, headers=()):
+        reader, writer = await asyncio.open_connection('127.0.0.1', self._port)
+        request = 'GET {} HTTP/1.1\r\nHost: localhost\r\nConnection: close\r\n'.format(path)
+        for header in headers:
+            request += header + '\r\n'
+        writer.write((request + '\r\n').encode('latin-1'))
+        response = await reader.read()
+        writer.close()
+        head, __, body = response.partition(b'\r\n\r\n')
+        status_line, *header_lines = head.decode('latin-1').split('\r\n')
+        response_headers = dict(
+            (name.lower(), value.strip())
+            for name, __, value in (h.partition(':') for h in header_lines))
+        return int(status_line.split()[1]), response_headers, body
+
+    def _append_split(self):
+        with open(self._split_path, mode='at', encoding='utf-8') as f:
+            f.write('6 12:11:00\n')
+        with contextlib.redirect_stdout(io.StringIO()):
+            changed = self._results.ingest()
+        self.assertTrue(changed)
+        self._sut.notify()
+
+    async def test_ServesCategoryList(self):
+        status, headers, body = await self._get('/categories.json')
+        self.assertEqual(200, status)
+        categories = json.loads(body)
+        self.assertEqual([1, 2], [c['id'] for c in categories])
+        self.assertEqual('1. Чоловіки', categories[0]['name'])
+
+    async def test_ServesStandings(self):
+        status, headers, body = await self._get('/categories/1.json')
+        self.assertEqual(200, status)
+        standings = json.loads(body)
+        self.assertEqual(3, standings['laps'])
+        self.assertEqual(1, standings['results'][0]['position'])
+
+    async def test_ServesHtml(self):
+        status, headers, body = await self._get('/')
+        self.assertEqual(200, status)
+        self.assertTrue(headers['content-type'].startswith('text/html'))
+        self.assertIn('EventSource', body.decode('utf-8'))
+        status, __, body = await self._get('/categories/2')
+        self.assertEqual(200, status)
+        self.assertIn('<h1>2.', body.decode('utf-8'))
+
+    async def test_UnknownCategory_IsNotFound(self):
+        status, __, __ = await self._get('/categories/99.json')
+        self.assertEqual(404, status)
+        status, __, __ = await self._get('/nothing')
+        self.assertEqual(404, status)
+
+    async def test_MatchingETag_IsNotModified(self):
+        __, headers, __ = await self._get('/categories/1.json')
+        status, __, body = await self._get(
+            '/categories/1.json', ['If-None-Match: ' + headers['etag']])
+        self.assertEqual(304, status)
+        self.assertEqual(b'', body)
+
+    async def test_ETagInList_IsNotModified(self):
+        __, headers, __ = await self._get('/categories/1.json')
+        status, __, __ = await self._get(
+            '/categories/1.json', ['If-None-Match: "other", W/' + headers['etag']])
+        self.assertEqual(304, status)
+
+    async def test_Restart_ChangesETags(self):
+        __, headers, __ = await self._get('/categories/1.json')
+        __, page_headers, __ = await self._get('/')
+        restarted = LiveResults(self._split_path)
+        restarted.ingest()
+        self.assertNotEqual(headers['etag'], restarted.standings(1)[0])
+        self.assertNotEqual(page_headers['etag'], restarted.page(None)[0])
+
+    async def test_ChangedRace_ChangesETag(self):
+        __, headers, __ = await self._get('/categories/1.json')
+        self._append_split()
+        status, new_headers, __ = await self._get(
+            '/categories/1.json', ['If-None-Match: ' + headers['etag']])
+        self.assertEqual(200, status)
+        self.assertNotEqual(headers['etag'], new_headers['etag'])
+
+    async def test_OtherMethod_IsNotAllowedAndClosesConnection(self):
+        reader, writer = await asyncio.open_connection('127.0.0.1', self._port)
+        writer.write(
+            b'POST / HTTP/1.1\r\nHost: localhost\r\nContent-Length: 16\r\n\r\n'
+            b'GET / HTTP/1.1\r\n')
+        response = await asyncio.wait_for(reader.read(), 5)
+        writer.close()
+        self.assertTrue(response.startswith(b'HTTP/1.1 405 '))
+        self.assertEqual(1, response.count(b'HTTP/1.1'))
+
+    async def test_PushesUpdateEvents(self):
+        reader, writer = await asyncio.open_connection('127.0.0.1', self._port)
+        writer.write(b'GET /events HTTP/1.1\r\nHost: localhost\r\n\r\n')
+        head = await reader.readuntil(b'\r\n\r\n')
+        self.assertIn(b'text/event-stream', head)
+        self.assertEqual(b'retry: 3000\n\n', await reader.readuntil(b'\n\n'))
+        self._append_split()
+        message = await asyncio.wait_for(reader.readuntil(b'\n\n'), 5)
+        self.assertEqual(
+            'event: update\ndata: {}\n\n'.format(self._results.revision).encode('utf-8'),
+            message)
+        writer.close()
+
+
+class LiveResultsTests(unittest.TestCase):
+    def setUp(self):
+        self._dir = tempfile.mkdtemp()
+        self._split_path = os.path.join(self._dir, 'test.split')
+
+    def tearDown(self):
+        shutil.rmtree(self._dir)
+
+    def test_MissingReglist_IsReportedAndRestOfBatchApplied(self):
+        with open(self._split_path, mode='wt', encoding='utf-8') as f:
+            f.write('reglist missing.csv\nbanner banner.png\n')
+        sut = LiveResults(self._split_path)
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            # The banner statement after it.
+            self.assertTrue(sut.ingest())
+        self.assertEqual(
+            'ERROR: Line 1. Cannot read {}.\n'.format(os.path.join(self._dir, 'missing.csv')),
+            output.getvalue())
@@ -0,0 +1,59 @@
+from concurrent.futures import ProcessPoolExecutor
+import os
+import shutil
+import tempfile
+import unittest
+
+import splitfile
+
+_ACCEPTANCE_DIR = os.path.join(os.path.dirname(__file__), '..', '..', 'acceptance_tests')
+
+
+class ParseChunksTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls._executor = ProcessPoolExecutor(2)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls._executor.shutdown()
+
+    def setUp(self):
+        self._dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self._dir)
+
+    def _write(self, data):
+        path = os.path.join(self._dir, 'test.split')
+        with open(path, mode='wb') as f:
+            f.write(data)
+        return path
+
+    def _assertSameAsSequential(self, path, chunk_size, engine=splitfile.FAST):
+        expected = list(splitfile.open_split(path, engine=engine))
+        actual = list(splitfile.parse_chunks(
+            path, self._executor, engine=engine, chunk_size=chunk_size))
+        self.assertEqual(expected, actual)
+
+    def test_AcceptanceFile_IsSameAsSequential(self):
+        path = os.path.join(_ACCEPTANCE_DIR, 'test.split')
+        for chunk_size in (1, 7, 100, 1 << 20):
+            self._assertSameAsSequential(path, chunk_size)
+
+    def test_Parsley_IsSameAsSequential(self):
+        path = os.path.join(_ACCEPTANCE_DIR, 'test.split')
+        self._assertSameAsSequential(path, 100, splitfile.PARSLEY)
+
+    def test_Newlines_AreCountedAsInTextMode(self):
+        path = self._write(
+            'laps 1 5\r\nstart 1 12:00:00\r\n\r\n1 12:10:00\r2 12:11:00\n'
+            '-- коментар\n\nfoo\n3 12:12:00'.encode('utf-8'))
+        for chunk_size in (1, 5, 20):
+            self._assertSameAsSequential(path, chunk_size)
+
+    def test_OpenSplit_WithExecutor_IsSameAsSequential(self):
+        path = self._write(b'1 12:00:00\n' * 100000)
+        self.assertEqual(
+            list(splitfile.open_split(path)),
+            list(splitfile.open_split(path, executor=self._executor)))
@@ -0,0 +1,70 @@
+import doctest
+import os
+import unittest
+
+import splitfile.parser
+from splitfile.parser import parse, FAST, PARSLEY
+
+
+class EnginesTests(unittest.TestCase):
+    def test_doctest_examples(self):
+        tests = doctest.DocTestFinder().find(splitfile.parser)
+        examples = [
+            example.source
+            for test in tests
+            for example in test.examples]
+        self.assertGreater(len(examples), 40)
+        for source in examples:
+            with self.subTest(source=source):
+                self.assertEqual(
+                    self._eval(source, PARSLEY),
+                    self._eval(source, FAST))
+
+    def test_acceptance_split_file(self):
+        path = os.path.join(
+            os.path.dirname(__file__),
+            '..', '..', 'acceptance_tests', 'test.split')
+        with open(path, encoding='utf-8') as f:
+            lines = f.readlines()
+        self.assertEqual(
+            list(parse(lines, PARSLEY)),
+            list(parse(lines, FAST)))
+
+    def test_grammar_corner_cases(self):
+        lines = [
+            '1 09:00:00',
+            'dnf 1 09:00:00',
+            'laps 1 2 09:00:00',
+            'start 1 09:00:00',
+            '00 10:00:00',
+            '0 10:00:00',
+            '1 12:00:00--comment',
+            '1 12:00:00\r\n',
+            'laps 1 5-- comment',
+            'start 1 2 3',
+            'reglist ',
+            'reglist \n',
+            'reglist --foo',
+            'reglist foo--bar',
+            'reglist foo 12:00:001',
+            'reglist a--\'b',
+            'reglist \'a "b\'',
+            'reglist "a" 12:00:00 -- comment',
+            'banner\t"a b"\t12:00:00\t',
+            'reglistfoo',
+            'dnf1 12:00:00',
+            ' \t-- comment',
+            ' 1 12:00:00',
+        ]
+        for line in lines:
+            with self.subTest(line=line):
+                self.assertEqual(
+                    list(parse([line], PARSLEY)),
+                    list(parse([line], FAST)))
+
+    @staticmethod
+    def _eval(source, engine):
+        return eval(source, {
+            'parse': lambda lines: parse(lines, engine),
+            '_parse': splitfile.parser._engines[engine],
+        })
@@ -0,0 +1,78 @@
+import contextlib
+import doctest
+import io
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+import petro
+import splitfile
+import splitfile.merger
+
+_ACCEPTANCE_DIR = os.path.join(os.path.dirname(__file__), '..', '..', 'acceptance_tests')
+
+
+def setUpModule():
+    # Keeps the reglists opened here out of the cache of the user.
+    cache_home = tempfile.TemporaryDirectory()
+    unittest.addModuleCleanup(cache_home.cleanup)
+    environ = mock.patch.dict(os.environ, XDG_CACHE_HOME=cache_home.name)
+    environ.start()
+    unittest.addModuleCleanup(environ.stop)
+
+
+# noinspection PyUnusedLocal
+def load_tests(loader, tests, ignore):
+    tests.addTests(doctest.DocTestSuite(splitfile.merger))
+    return tests
+
+
+class MergeTests(unittest.TestCase):
+    def setUp(self):
+        self._dir = tempfile.mkdtemp()
+        shutil.copy(os.path.join(_ACCEPTANCE_DIR, 'reglist.csv'), self._dir)
+        with open(os.path.join(_ACCEPTANCE_DIR, 'test.split'), encoding='utf-8') as f:
+            self._lines = f.readlines()
+
+    def tearDown(self):
+        shutil.rmtree(self._dir)
+
+    def _write(self, name, lines):
+        path = os.path.join(self._dir, name)
+        with open(path, mode='wt', encoding='utf-8') as f:
+            f.writelines(lines)
+        return path
+
+    def _csv(self, input_path, merge_paths=()):
+        output_path = os.path.join(self._dir, 'output.csv')
+        with contextlib.redirect_stdout(io.StringIO()) as output:
+            code = petro._main(input_path, 'csv', output_path, merge_paths=merge_paths)
+        if not os.path.exists(output_path):
+            return code, output.getvalue(), None
+        with open(output_path, mode='rb') as f:
+            return code, output.getvalue(), f.read()
+
+    def test_SplitsOfTwoTimekeepers_GiveSameResults(self):
+        header = self._lines[:10]
+        body = self._lines[10:]
+        first = self._write('first.split', header + body[0::2])
+        second = self._write('second.split', body[1::2])
+
+        expected = self._csv(self._write('all.split', self._lines))
+        actual = self._csv(first, [second])
+        self.assertEqual(expected, actual)
+
+    def test_Merge_IsLazy(self):
+        first = self._write('first.split', self._lines[:10])
+        second = self._write('second.split', self._lines[10:])
+        merged = splitfile.merge([first, second])
+        self.assertEqual(1, next(merged)[0].line_number)
+
+    def test_Errors_ReferToOriginatingFile(self):
+        first = self._write('first.split', self._lines[:10])
+        second = self._write('second.split', ['bad line\n'])
+        code, output, __ = self._csv(first, [second])
+        self.assertEqual(2, code)
+        self.assertIn('ERROR: Line {}:1. Syntax error.'.format(second), output)
@@ -1,9 +1,11 @@
 import doctest
 
 import splitfile.parser
+import splitfile.recognizer
 
 
 # noinspection PyUnusedLocal
 def load_tests(loader, tests, ignore):
     tests.addTests(doctest.DocTestSuite(splitfile.parser))
+    tests.addTests(doctest.DocTestSuite(splitfile.recognizer))
     return tests
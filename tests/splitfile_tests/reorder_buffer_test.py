@@ -0,0 +1,125 @@
+import contextlib
+import doctest
+import io
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+import petro
+import splitfile
+import splitfile.reorder_buffer
+
+_ACCEPTANCE_DIR = os.path.join(os.path.dirname(__file__), '..', '..', 'acceptance_tests')
+
+
+def setUpModule():
+    # Keeps the reglists opened here out of the cache of the user.
+    cache_home = tempfile.TemporaryDirectory()
+    unittest.addModuleCleanup(cache_home.cleanup)
+    environ = mock.patch.dict(os.environ, XDG_CACHE_HOME=cache_home.name)
+    environ.start()
+    unittest.addModuleCleanup(environ.stop)
+
+
+# noinspection PyUnusedLocal
+def load_tests(loader, tests, ignore):
+    tests.addTests(doctest.DocTestSuite(splitfile.reorder_buffer))
+    return tests
+
+
+class ReorderBufferTests(unittest.TestCase):
+    def setUp(self):
+        self._late = []
+
+    def _reorder(self, lines, window):
+        return [e[0] for e in splitfile.reorder(
+            splitfile.parse(lines), window, self._late.append)]
+
+    def test_InOrder_PassesThrough(self):
+        lines = ['laps 1 2', '1 12:00:00', '2 12:00:01', 'dnf 3', '4 12:00:02']
+        self.assertEqual([1, 2, 3, 4, 5], self._reorder(lines, 5))
+        self.assertEqual([1, 2, 3, 4, 5], self._reorder(lines, 0))
+
+    def test_WithinWindow_IsReordered(self):
+        lines = ['1 12:00:03', '2 12:00:01', '3 12:00:02', '4 12:00:10']
+        self.assertEqual([2, 3, 1, 4], self._reorder(lines, 5))
+        self.assertEqual([], self._late)
+
+    def test_UntimedExpression_StaysAfterEarlierSplits(self):
+        lines = ['1 12:00:03', 'dnf 1', '2 12:00:01']
+        self.assertEqual([3, 1, 2], self._reorder(lines, 5))
+
+    def test_BeyondWindow_IsReportedLate(self):
+        lines = ['1 12:00:10', '2 12:00:30', '3 12:00:01', '4 12:00:31']
+        self.assertEqual([1, 2, 4], self._reorder(lines, 5))
+        self.assertEqual([3], [e[0] for e in self._late])
+
+    def test_Buffer_HoldsAtMostTheWindow(self):
+        buffer = splitfile.ReorderBuffer(5, self._late.append)
+        lines = ['1 12:00:{:02}'.format(s) for s in range(60)]
+        for e in splitfile.parse(lines):
+            buffer.push((e,))
+            self.assertLessEqual(len(buffer), 6)
+
+
+class ReorderWindowTests(unittest.TestCase):
+    def setUp(self):
+        self._dir = tempfile.mkdtemp()
+        shutil.copy(os.path.join(_ACCEPTANCE_DIR, 'reglist.csv'), self._dir)
+        with open(os.path.join(_ACCEPTANCE_DIR, 'test.split'), encoding='utf-8') as f:
+            self._lines = f.readlines()
+        with open(os.path.join(_ACCEPTANCE_DIR, 'expected.csv'), mode='rb') as f:
+            self._expected = f.read()
+
+    def tearDown(self):
+        shutil.rmtree(self._dir)
+
+    def _csv(self, lines, reorder_window):
+        input_path = os.path.join(self._dir, 'test.split')
+        output_path = os.path.join(self._dir, 'output.csv')
+        with open(input_path, mode='wt', encoding='utf-8') as f:
+            f.writelines(lines)
+        with contextlib.redirect_stdout(io.StringIO()) as output:
+            code = petro._main(
+                input_path, 'csv', output_path, reorder_window=reorder_window)
+        if not os.path.exists(output_path):
+            return code, output.getvalue(), None
+        with open(output_path, mode='rb') as f:
+            return code, output.getvalue(), f.read()
+
+    def _swapped(self):
+        # Swaps neighbouring splits typed a few seconds apart.
+        lines = list(self._lines)
+        i = 11
+        while i + 1 < len(lines):
+            a, b = lines[i].split(), lines[i + 1].split()
+            if len(a) == 2 and len(b) == 2 and a[1][:5] == b[1][:5] and a[1] != b[1]:
+                lines[i], lines[i + 1] = lines[i + 1], lines[i]
+                i += 2
+            else:
+                i += 1
+        self.assertNotEqual(self._lines, lines)
+        return lines
+
+    def test_SwappedSplits_GiveSameResults(self):
+        code, output, actual = self._csv(self._swapped(), 60)
+        self.assertEqual('', output)
+        self.assertEqual(self._expected, actual)
+
+    def test_StartTypedAfterLaterSplit_IsOrderedByItsTime(self):
+        lines = self._lines[:5] + [
+            'start 1 12:00:00\n', '2 12:00:10\n', 'start 2 12:00:08\n', '103 12:00:09\n']
+        code, output, actual = self._csv(lines, 5)
+        self.assertEqual('', output)
+        self.assertIsNotNone(actual)
+
+    def test_LateSplit_IsReported(self):
+        lines = self._lines[:12] + self._lines[40:] + self._lines[12:13]
+        code, output, __ = self._csv(lines, 60)
+        self.assertEqual(2, code)
+        self.assertIn(
+            'ERROR: Line {}. Split is out of order by more than the reorder window.'.format(
+                len(lines)),
+            output)
@@ -0,0 +1,113 @@
+import os
+import tempfile
+import unittest
+
+from splitfile import SplitTail, SplitFileRewritten, open_split
+
+
+class SplitTailTests(unittest.TestCase):
+    def setUp(self):
+        fd, self._path = tempfile.mkstemp(suffix='.split')
+        os.close(fd)
+        self._sut = SplitTail(self._path)
+
+    def tearDown(self):
+        os.remove(self._path)
+
+    def _append(self, data):
+        with open(self._path, mode='ab') as f:
+            f.write(data)
+        self._touch()
+
+    def _rewrite(self, data):
+        with open(self._path, mode='wb') as f:
+            f.write(data)
+        self._touch()
+
+    def _touch(self):
+        # Makes sure the change is visible even on coarse mtime file systems.
+        stat = os.stat(self._path)
+        os.utime(self._path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+
+    def test_ReadsOnlyAppendedLines(self):
+        self._append(b'laps 1 5\nstart 1 12:00:00\n')
+        self.assertEqual(
+            [(1, 'laps', [1], 5), (2, 'start', [1], '12:00:00')],
+            self._sut.read())
+
+        self._append(b'10 12:10:00\n')
+        self.assertEqual([(3, 'split', [10], '12:10:00')], self._sut.read())
+        self.assertEqual(3, self._sut.line_number)
+        self.assertEqual(os.path.getsize(self._path), self._sut.offset)
+
+    def test_ReturnsNothingIfFileHasNotChanged(self):
+        self._append(b'laps 1 5\n')
+        self._sut.read()
+        self.assertEqual([], self._sut.read())
+
+    def test_ParsesUnterminatedLineOnce(self):
+        self._append(b'10 12:10:00')
+        self.assertEqual([(1, 'split', [10], '12:10:00')], self._sut.read())
+
+        self._append(b'\n11 12:11:00\n')
+        self.assertEqual([(2, 'split', [11], '12:11:00')], self._sut.read())
+
+    def test_HandlesWindowsLineEndings(self):
+        self._append(b'10 12:10:00\r')
+        self.assertEqual([(1, 'split', [10], '12:10:00')], self._sut.read())
+
+        self._append(b'\n11 12:11:00\r\n')
+        self.assertEqual([(2, 'split', [11], '12:11:00')], self._sut.read())
+
+    def test_DetectsChangedUnterminatedLine(self):
+        self._append(b'10 12:10:0')
+        self._sut.read()
+        self._append(b'1\n')
+        with self.assertRaises(SplitFileRewritten):
+            self._sut.read()
+
+    def test_DetectsTruncatedFile(self):
+        self._append(b'10 12:10:00\n11 12:11:00\n')
+        self._sut.read()
+        self._rewrite(b'10 12:10:00\n')
+        with self.assertRaises(SplitFileRewritten):
+            self._sut.read()
+
+    def test_DetectsEditedLastLine(self):
+        self._append(b'10 12:10:00\n11 12:11:00\n')
+        self._sut.read()
+        self._rewrite(b'10 12:10:00\n12 12:11:00\n13 12:12:00\n')
+        with self.assertRaises(SplitFileRewritten):
+            self._sut.read()
+
+    def test_MatchesOpenSplit(self):
+        data = b'laps 1 5\n\nfoo\n-- comment\r\n10 12:10:00\n11 12:11:00'
+        for chunk in range(0, len(data), 7):
+            self._append(data[chunk:chunk + 7])
+        expected = list(open_split(self._path))
+
+        self._rewrite(b'')
+        self._sut = SplitTail(self._path)
+        actual = []
+        for line in data.splitlines(keepends=True):
+            self._append(line)
+            actual += self._sut.read()
+        self.assertEqual(expected, actual)
+
+    def test_ResumesFromPosition(self):
+        self._append(b'laps 1 5\nstart 1 12:00:00\n10 12:10:00')
+        self._sut.read()
+        self._append(b'\n11 12:11:00\n')
+        resumed = SplitTail(self._path, position=self._sut.position)
+        self.assertEqual(
+            [(4, 'split', [11], '12:11:00')],
+            resumed.read())
+
+    def test_DetectsContentChangedBeforeResumePosition(self):
+        self._append(b'laps 1 5\nstart 1 12:00:00\n10 12:10:00\n')
+        self._sut.read()
+        position = self._sut.position
+        self._rewrite(b'laps 1 3\nstart 1 12:00:00\n10 12:10:00\n11 12:11:00\n')
+        resumed = SplitTail(self._path, position=position)
+        with self.assertRaises(SplitFileRewritten):
+            resumed.read()